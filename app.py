@@ -1,14 +1,26 @@
 from routes.stubs import stubs_bp
 from routes.dashboard import dash_bp
 from routes.instances import instances_bp
+from routes.benchmarks import bench_bp
+from routes.metrics import metrics_bp
+import os
 from flask import Flask
-from config import FLASK_SECRET_KEY
+from config import FLASK_SECRET_KEY, METRICS_ENABLED, PROXY_PORT
+from utils.request_metrics import request_metrics
+from utils.front_proxy import start_front_proxy
 
 app = Flask(__name__)
 app.register_blueprint(stubs_bp)
 app.register_blueprint(dash_bp)
 app.register_blueprint(instances_bp)
+app.register_blueprint(bench_bp)
+app.register_blueprint(metrics_bp)
 app.secret_key = FLASK_SECRET_KEY
+if METRICS_ENABLED:
+    request_metrics.init_app(app)
 
 if __name__ == '__main__':
+    # With the reloader on, only the child process that serves requests runs the proxy.
+    if PROXY_PORT and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_front_proxy()
     app.run(debug=True, host='0.0.0.0')
@@ -0,0 +1,193 @@
+"""
+Benchmarks the manager's own hot paths against synthetic instances.
+
+Builds ports with many mappings and large logs in a temp directory, then
+times routes through Flask's test client and a few manager methods, and
+prints the results as JSON:
+
+    python bench/manager_bench.py --mappings 10000 100000 --log-mb 1024 -o bench_output.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+_LOG_LINE = (b'2024-01-01 00:00:00.000 Request received: 127.0.0.1 - GET /api/orders/12345\n'
+             b'Matched response definition: {"status": 200, "bodyFileName": "orders-res.json"}\n')
+
+
+def build_port(port: str, mappings: int, log_bytes: int) -> None:
+    """
+    Creates wiremock_instances/<port> with synthetic mappings, bodies and a log.
+    """
+    mappings_dir = f"wiremock_instances/{port}/mappings"
+    files_dir = f"wiremock_instances/{port}/__files"
+    os.makedirs(mappings_dir, exist_ok=True)
+    os.makedirs(files_dir, exist_ok=True)
+    methods = ('GET', 'POST', 'PUT', 'DELETE')
+    for i in range(mappings):
+        name = f"stub{i:06d}"
+        stub = {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "request": {"method": methods[i % len(methods)], "urlPath": f"/api/resource{i % 500}/{i}"},
+            "response": {"status": 200, "bodyFileName": f"{name}-res.json"},
+        }
+        with open(os.path.join(mappings_dir, f"{name}-req.json"), 'w') as f:
+            json.dump(stub, f)
+        with open(os.path.join(files_dir, f"{name}-res.json"), 'w') as f:
+            json.dump({"id": i, "name": f"resource {i}", "tags": ["a", "b", "c"]}, f)
+
+    block = _LOG_LINE * (1024 * 1024 // len(_LOG_LINE))
+    with open(f"wiremock_instances/{port}/wiremock.log", 'wb') as f:
+        written = 0
+        while written < log_bytes:
+            chunk = block[:log_bytes - written]
+            f.write(chunk)
+            written += len(chunk)
+
+
+def measure(fn, repeat: int) -> dict:
+    """
+    Runs fn repeat times and returns timing statistics in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'runs': repeat,
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'max_ms': round(max(timings), 3),
+    }
+
+
+def bench_port(client, manager, port: str, mappings: int, log_bytes: int, args) -> list[dict]:
+    from utils.pid_registry import PidRegistry
+    import psutil
+
+    with client.session_transaction() as session:
+        session['current_port'] = port
+
+    def get(path):
+        def run():
+            response = client.get(path)
+            # Consume streamed bodies so the whole response is measured.
+            for _ in response.response:
+                pass
+            response.close()
+            if response.status_code >= 400:
+                raise RuntimeError(f"GET {path} returned HTTP {response.status_code}")
+        return run
+
+    cases = [
+        # The first call builds the stub index; the rest hit the warm index.
+        ('api_stubs_cold', get('/api/stubs'), 1),
+        ('api_stubs', get('/api/stubs'), args.repeat),
+        ('api_stubs_filtered', get('/api/stubs?method=GET&url_prefix=/api/resource1'), args.repeat),
+        ('api_stubs_max_page_asc', get('/api/stubs?limit=500&order=asc'), args.repeat),
+        ('list_stubs', get('/list_stubs'), args.repeat),
+        ('view_stub', get('/view_stub/stub000000-req.json'), args.repeat),
+        ('get_instance_logs_tail', get('/get_instance_logs'), args.repeat),
+        ('instances_status', get('/instances/status'), args.repeat),
+        ('generate_zip', get('/generate_zip'), args.zip_repeat),
+        ('read_log_chunk', lambda: manager.read_log_chunk(port), args.repeat),
+    ]
+    if log_bytes <= args.full_log_max_mb * 1024 * 1024:
+        cases.append(('get_log_output', lambda: manager.get_log_output(port), args.zip_repeat))
+
+    registry = PidRegistry(f"pids-{port}.json")
+    me = psutil.Process()
+    registry.add(port, me, ['java'])
+    cases += [
+        ('pid_registry_add', lambda: registry.add(port, me, ['java']), args.repeat),
+        ('pid_registry_entries_reload', lambda: (setattr(registry, '_stat_key', None), registry.entries()),
+         args.repeat),
+        ('pid_registry_resolve', lambda: PidRegistry.resolve(registry.get(port)), args.repeat),
+    ]
+
+    results = []
+    for name, fn, repeat in cases:
+        if args.only and name not in args.only:
+            continue
+        result = {'name': name, 'mappings': mappings, 'log_bytes': log_bytes, **measure(fn, repeat)}
+        results.append(result)
+        print(f"{name:<30} {mappings:>7} mappings  median {result['median_ms']:>10.2f} ms", file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the manager's routes and hot paths.")
+    parser.add_argument('--mappings', type=int, nargs='+', default=[10000],
+                        help="mapping counts to generate, one synthetic port each")
+    parser.add_argument('--log-mb', type=int, default=256, help="size of each synthetic wiremock.log")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--zip-repeat', type=int, default=2, help="repeats for the full ZIP export and log read")
+    parser.add_argument('--full-log-max-mb', type=int, default=1024,
+                        help="skip get_log_output (reads the whole log into memory) above this log size")
+    parser.add_argument('--only', nargs='+', help="run only these cases")
+    parser.add_argument('--keep', action='store_true', help="keep the temp directory")
+    parser.add_argument('-o', '--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                                  text=True).stdout.strip() or None
+    except OSError:
+        revision = None
+
+    work_dir = tempfile.mkdtemp(prefix='mockwiz-bench-')
+    os.chdir(work_dir)
+    # Keep background threads quiet during timing.
+    os.environ.setdefault('JOURNAL_COLLECT_SECONDS', '0')
+    try:
+        from app import app
+        from utils.wiremock_manager import get_wiremock_manager
+
+        manager = get_wiremock_manager()
+        client = app.test_client()
+        results = []
+        for i, mappings in enumerate(args.mappings):
+            port = str(20000 + i)
+            log_bytes = args.log_mb * 1024 * 1024
+            started = time.perf_counter()
+            build_port(port, mappings, log_bytes)
+            print(f"built port {port}: {mappings} mappings, {args.log_mb} MB log "
+                  f"in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            results += bench_port(client, manager, port, mappings, log_bytes, args)
+    finally:
+        os.chdir(REPO_DIR)
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'timestamp': time.time(),
+            'revision': revision,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'work_dir': work_dir if args.keep else None,
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,155 @@
 import os
 
 WIREMOCK_JAR_NAME = "wiremock-jre8-standalone-2.35.0.jar"
-FLASK_SECRET_KEY = os.environ.get('FLASK_SECRET_KEY', 'wiremock-secret-key')
+DEFAULT_FLASK_SECRET_KEY = 'wiremock-secret-key'
+FLASK_SECRET_KEY = os.environ.get('FLASK_SECRET_KEY', DEFAULT_FLASK_SECRET_KEY)
+
+# Upper bound on how many log bytes a single /get_instance_logs call returns.
+LOG_READ_CHUNK_BYTES = int(os.environ.get('LOG_READ_CHUNK_BYTES', 256 * 1024))
+
+# Live log streaming (server-sent events) fed by the stdout pump.
+LOG_STREAM_BUFFER_LINES = int(os.environ.get('LOG_STREAM_BUFFER_LINES', 2000))
+LOG_STREAM_HEARTBEAT_SECONDS = 15
+# Each open stream holds a server thread: streams end after LOG_STREAM_MAX_SECONDS (the browser
+# reconnects from its Last-Event-ID) and past LOG_STREAM_MAX_CLIENTS per process get a 503.
+LOG_STREAM_MAX_SECONDS = 300
+LOG_STREAM_MAX_CLIENTS = int(os.environ.get('LOG_STREAM_MAX_CLIENTS', 8))
+
+# wiremock.log writer: batch writes by time/size, rotate and gzip old segments.
+LOG_FLUSH_INTERVAL_SECONDS = float(os.environ.get('LOG_FLUSH_INTERVAL_SECONDS', 0.5))
+LOG_FLUSH_BYTES = int(os.environ.get('LOG_FLUSH_BYTES', 64 * 1024))
+LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', 50 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', 5))
+
+# Content-addressed body store (__files/_cas): gc keeps unreferenced blobs younger than
+# this, so a body stored just before its mapping is written isn't collected.
+BODY_STORE_GC_GRACE_SECONDS = 300
+# Uploaded response bodies are copied into the store in chunks of this size.
+BODY_UPLOAD_CHUNK_BYTES = 64 * 1024
+# How much of a response body view_stub shows; the rest is fetched with range requests.
+BODY_PREVIEW_BYTES = int(os.environ.get('BODY_PREVIEW_BYTES', 64 * 1024))
+
+# How often the in-memory stub index re-stats mapping files to catch in-place edits.
+STUB_INDEX_RECHECK_SECONDS = float(os.environ.get('STUB_INDEX_RECHECK_SECONDS', 5))
+# Full-text search index over the mappings and bodies of every port (SQLite FTS5).
+STUB_SEARCH_DB_PATH = os.environ.get('STUB_SEARCH_DB_PATH', 'stub_search.db')
+# How often a background thread re-stats every mapping to catch edits made in place; 0 disables it.
+STUB_SEARCH_RECHECK_SECONDS = float(os.environ.get('STUB_SEARCH_RECHECK_SECONDS', 30))
+# Only the first part of a large response body is indexed.
+STUB_SEARCH_BODY_MAX_BYTES = 1024 * 1024
+# Searches matching more mappings than this skip relevance ranking and list the most recently
+# indexed mappings first.
+STUB_SEARCH_RANK_MAX_MATCHES = 10000
+
+# Page sizes for the /api/stubs listing.
+STUBS_PAGE_SIZE = 50
+STUBS_PAGE_SIZE_MAX = 500
+
+# WireMock admin API (/__admin) used to hot-reload stubs into running instances.
+WIREMOCK_ADMIN_HOST = os.environ.get('WIREMOCK_ADMIN_HOST', '127.0.0.1')
+WIREMOCK_ADMIN_TIMEOUT = float(os.environ.get('WIREMOCK_ADMIN_TIMEOUT', 5))
+WIREMOCK_ADMIN_POOL_SIZE = 4
+
+# Streaming ZIP export: cache of compressed entries, keyed by content hash.
+ZIP_CACHE_MAX_BYTES = int(os.environ.get('ZIP_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+ZIP_CACHE_ENTRY_MAX_BYTES = 8 * 1024 * 1024
+
+# Background start/stop jobs and readiness probing.
+JOB_WORKERS = 8
+# Threads for jobs that don't start or stop instances (benchmarks), kept apart from JOB_WORKERS.
+JOB_SIDE_WORKERS = 2
+JOB_HISTORY = 200
+READINESS_TIMEOUT_SECONDS = float(os.environ.get('READINESS_TIMEOUT_SECONDS', 60))
+READINESS_POLL_INTERVAL_SECONDS = 0.25
+STOP_GRACE_SECONDS = float(os.environ.get('STOP_GRACE_SECONDS', 10))
+
+# How often the status monitor re-probes tracked instance processes.
+STATUS_REFRESH_SECONDS = float(os.environ.get('STATUS_REFRESH_SECONDS', 2))
+
+# Threads used to validate tracked PIDs and adopt running instances at startup.
+RECOVERY_WORKERS = 8
+
+# Optional pool of pre-started WireMock JVMs on spare ports (0 disables it). Leased instances
+# keep their pool port and are reachable only through the front proxy, so it needs PROXY_PORT.
+# The pool runs in the process that owns the instances: serve.py or supervisor.py.
+WARM_POOL_SIZE = int(os.environ.get('WARM_POOL_SIZE', 0))
+WARM_POOL_PORT_START = int(os.environ.get('WARM_POOL_PORT_START', 19000))
+WARM_POOL_PORT_END = int(os.environ.get('WARM_POOL_PORT_END', 19100))
+WARM_POOL_IDLE_SECONDS = float(os.environ.get('WARM_POOL_IDLE_SECONDS', 1800))
+WARM_POOL_IMPORT_BATCH = 500
+
+# Named JVM/WireMock tuning profiles, selectable per instance from the dashboard.
+# jvm_args go before -jar, wiremock_args after the port and root-dir options.
+DEFAULT_JVM_PROFILE = 'default'
+JVM_PROFILES = {
+    'default': {
+        'description': 'JVM and WireMock defaults',
+        'jvm_args': [],
+        'wiremock_args': [],
+    },
+    'low-memory': {
+        'description': 'Small heap, serial GC, bounded request journal',
+        'jvm_args': ['-Xms32m', '-Xmx128m', '-XX:+UseSerialGC', '-Xss512k'],
+        'wiremock_args': ['--container-threads', '10', '--jetty-acceptor-threads', '1',
+                          '--max-request-journal-entries', '100'],
+    },
+    'high-throughput': {
+        'description': 'Large heap, G1, more Jetty threads, no request journal',
+        'jvm_args': ['-Xms1g', '-Xmx1g', '-XX:+UseG1GC', '-XX:+AlwaysPreTouch'],
+        'wiremock_args': ['--container-threads', '200', '--jetty-acceptor-threads', '4',
+                          '--async-response-enabled', 'true', '--no-request-journal'],
+    },
+}
+
+# Request journal harvesting (opt-in): how often running instances are drained (0 disables it;
+# draining empties the journal, which breaks WireMock verify). The journal is read a page at a
+# time, up to JOURNAL_MAX_PAGES pages per round.
+JOURNAL_COLLECT_SECONDS = float(os.environ.get('JOURNAL_COLLECT_SECONDS', 0))
+JOURNAL_PAGE_SIZE = 500
+JOURNAL_MAX_PAGES = 20
+
+# Load benchmark defaults (dashboard and `python -m utils.load_benchmark`).
+BENCHMARK_CONCURRENCY = 10
+BENCHMARK_REQUESTS = 1000
+BENCHMARK_MAX_REQUESTS = 1_000_000
+BENCHMARK_TIMEOUT_SECONDS = 10
+
+# Opt-in request instrumentation (latency histograms, fs/psutil op counts, /metrics).
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '0') == '1'
+# Requests slower than this (ms) keep their cProfile dump; 0 disables profiling.
+METRICS_SLOW_REQUEST_MS = float(os.environ.get('METRICS_SLOW_REQUEST_MS', 0))
+# Share of requests run under cProfile (profiling adds overhead to every sampled request).
+METRICS_PROFILE_SAMPLE_RATE = float(os.environ.get('METRICS_PROFILE_SAMPLE_RATE', 0.1))
+METRICS_PROFILE_DIR = 'profiles'
+METRICS_PROFILE_KEEP = 50
+
+# Where instance and job state lives: 'file' (wiremock_pids.json, jobs in memory) for a
+# single server process, or 'sqlite' so several worker processes share it.
+STATE_BACKEND = os.environ.get('STATE_BACKEND', 'file')
+STATE_DB_PATH = os.environ.get('STATE_DB_PATH', 'wiremock_state.db')
+# Log streams of instances owned by another worker tail the log file at this interval.
+LOG_TAIL_POLL_SECONDS = 1
+
+# Optional supervisor daemon (supervisor.py) that owns the WireMock JVMs. When set, the
+# web app forwards instance calls to it: "host:port" or a Unix socket path.
+SUPERVISOR_ADDRESS = os.environ.get('SUPERVISOR_ADDRESS', '')
+# RPC messages are pickled, so anyone holding the key can run code in the supervisor: it must be
+# set explicitly (never the default Flask secret) and TCP addresses must be loopback.
+SUPERVISOR_AUTHKEY = os.environ.get('SUPERVISOR_AUTHKEY', '').encode()
+# Restart policy for instances that exit without being stopped: never, on-failure or always.
+SUPERVISOR_RESTART_POLICY = os.environ.get('SUPERVISOR_RESTART_POLICY', 'on-failure')
+SUPERVISOR_MAX_RESTARTS = 5
+SUPERVISOR_RESTART_BACKOFF_SECONDS = 2
+
+# Optional asyncio front proxy: one port routing to every running instance by Host header
+# (<port>.host) or first path segment (/<port>/...). Started with the app when PROXY_PORT is set.
+PROXY_PORT = int(os.environ.get('PROXY_PORT', 0))
+PROXY_HOST = os.environ.get('PROXY_HOST', '0.0.0.0')
+PROXY_BACKLOG = 2048
+# Idle keep-alive connections kept per instance, and the cap on connections in use per instance.
+PROXY_UPSTREAM_POOL_SIZE = 256
+PROXY_UPSTREAM_MAX_CONNECTIONS = 512
+PROXY_UPSTREAM_TIMEOUT_SECONDS = float(os.environ.get('PROXY_UPSTREAM_TIMEOUT_SECONDS', 60))
+PROXY_CLIENT_IDLE_SECONDS = 75
+# How long a port's running state and served port are cached by the proxy.
+PROXY_ROUTE_TTL_SECONDS = 2
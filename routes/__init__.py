@@ -1,3 +1,5 @@
 from .stubs import stubs_bp
 from .dashboard import dash_bp
-from .instances import instances_bp
\ No newline at end of file
+from .instances import instances_bp
+from .benchmarks import bench_bp
+from .metrics import metrics_bp
\ No newline at end of file
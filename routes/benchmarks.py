@@ -0,0 +1,50 @@
+from flask import Blueprint, request, session, jsonify
+from config import BENCHMARK_CONCURRENCY, BENCHMARK_REQUESTS
+from routes.stubs import stub_index
+from utils.load_benchmark import benchmark_port, list_runs, load_run, compare_runs
+from utils.wiremock_manager import get_wiremock_manager
+
+bench_bp = Blueprint('benchmarks', __name__)
+
+@bench_bp.route('/benchmarks', methods=['GET'])
+def get_benchmarks():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'})
+
+    return jsonify({'success': True, 'runs': list_runs(port)})
+
+@bench_bp.route('/benchmarks', methods=['POST'])
+def run_benchmark():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'})
+
+    data = request.get_json(silent=True) or request.form
+    try:
+        requests = int(data.get('requests') or BENCHMARK_REQUESTS)
+        concurrency = int(data.get('concurrency') or BENCHMARK_CONCURRENCY)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Requests and concurrency must be numbers.'})
+
+    wiremock_manager = get_wiremock_manager()
+
+    def run():
+        result = benchmark_port(wiremock_manager, stub_index, port, requests, concurrency)
+        return True, (f"Benchmark {result['id']}: {result['throughput_rps']} req/s, "
+                      f"p99 {result['latency_ms']['p99'] or 0:.1f} ms, {result['error_rate']:.1%} errors.")
+
+    job = wiremock_manager.jobs.submit('benchmark', port, run)
+    return jsonify({'success': True, 'message': job['message'], 'job': job})
+
+@bench_bp.route('/benchmarks/compare', methods=['GET'])
+def compare_benchmarks():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'})
+
+    baseline = load_run(port, request.args.get('baseline'))
+    candidate = load_run(port, request.args.get('candidate'))
+    if not baseline or not candidate:
+        return jsonify({'success': False, 'message': 'Benchmark run not found.'}), 404
+    return jsonify({'success': True, 'comparison': compare_runs(baseline, candidate)})
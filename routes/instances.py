@@ -1,9 +1,16 @@
 import os
-from flask import Blueprint, session, jsonify
-from utils.wiremock_manager import WiremockManager
+from flask import Blueprint, Response, request, session, jsonify
+import time
+import threading
+from config import (LOG_STREAM_HEARTBEAT_SECONDS, LOG_STREAM_MAX_SECONDS, LOG_STREAM_MAX_CLIENTS,
+                    LOG_TAIL_POLL_SECONDS, JVM_PROFILES)
+from utils.admin_client import AdminApiError
+from utils.wiremock_manager import get_wiremock_manager
+from utils.front_proxy import get_front_proxy
 
 instances_bp = Blueprint('instances', __name__)
-wiremock_manager = WiremockManager()
+# Open log streams in this process; each one holds a server thread until it ends.
+log_stream_slots = threading.BoundedSemaphore(LOG_STREAM_MAX_CLIENTS)
 
 @instances_bp.route('/start_instance', methods=['POST'])
 def start_instance():
@@ -11,8 +18,8 @@ def start_instance():
     if not port:
         return jsonify({'success': False, 'message': 'Port not set.'})
     
-    success, message = wiremock_manager.start_wiremock(port)
-    return jsonify({'success': success, 'message': message})
+    job = get_wiremock_manager().start_wiremock_async(port)
+    return jsonify({'success': True, 'message': job['message'], 'job': job})
 
 @instances_bp.route('/stop_instance', methods=['POST'])
 def stop_instance():
@@ -20,23 +27,150 @@ def stop_instance():
     if not port:
         return jsonify({'success': False, 'message': 'Port not set.'})
 
-    success, message = wiremock_manager.stop_wiremock(port)
+    job = get_wiremock_manager().stop_wiremock_async(port)
+    return jsonify({'success': True, 'message': job['message'], 'job': job})
+
+@instances_bp.route('/instance_profile', methods=['GET'])
+def get_instance_profile():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'})
+
+    profiles = [{'name': name, 'description': profile['description']} for name, profile in JVM_PROFILES.items()]
+    return jsonify({'success': True, 'profile': get_wiremock_manager().get_profile(port), 'profiles': profiles})
+
+@instances_bp.route('/instance_profile', methods=['POST'])
+def set_instance_profile():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'})
+
+    profile = (request.get_json(silent=True) or {}).get('profile') or request.form.get('profile')
+    success, message = get_wiremock_manager().set_profile(port, profile)
     return jsonify({'success': success, 'message': message})
 
+@instances_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = get_wiremock_manager().jobs.get(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': 'Job not found.'}), 404
+    return jsonify({'success': True, 'job': job})
+
 @instances_bp.route('/get_instance_status', methods=['GET'])
 def get_instance_status():
     port = session.get('current_port')
     if not port:
         return jsonify({'running': False, 'message': 'Port not set.'})
     
-    running = wiremock_manager.is_running(port)
+    running = get_wiremock_manager().is_running(port)
     return jsonify({'running': running, 'port': port})
 
+@instances_bp.route('/instances/status', methods=['GET'])
+def get_all_instances_status():
+    return jsonify(get_wiremock_manager().status_monitor.snapshot())
+
+@instances_bp.route('/warm_pool/metrics', methods=['GET'])
+def get_warm_pool_metrics():
+    wiremock_manager = get_wiremock_manager()
+    warm_pool = wiremock_manager.warm_pool
+    if warm_pool is None:
+        return jsonify({'enabled': False, 'reason': wiremock_manager.warm_pool_disabled_reason()})
+    return jsonify({'enabled': True, **warm_pool.stats()})
+
+@instances_bp.route('/proxy/metrics', methods=['GET'])
+def get_proxy_metrics():
+    proxy = get_front_proxy()
+    if proxy is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **proxy.stats()})
+
+@instances_bp.route('/journal_summary', methods=['GET'])
+def get_journal_summary():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'})
+
+    wiremock_manager = get_wiremock_manager()
+    message = None
+    # ?collect=1 drains the journal now instead of waiting for the next round.
+    if request.args.get('collect') == '1' and wiremock_manager.is_running(port):
+        try:
+            message = f"Collected {wiremock_manager.journal.collect(port)} requests."
+        except (AdminApiError, OSError) as e:
+            message = f"Collecting the request journal failed: {e}"
+    return jsonify({'success': True, 'message': message, 'summary': wiremock_manager.journal.summary(port)})
+
+@instances_bp.route('/journal_summary', methods=['DELETE'])
+def reset_journal_summary():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'})
+
+    get_wiremock_manager().journal.reset(port)
+    return jsonify({'success': True, 'message': f"Request summary of port {port} cleared."})
+
 @instances_bp.route('/get_instance_logs', methods=['GET'])
 def get_instance_logs():
     port = session.get('current_port')
     if not port:
-        return jsonify({'logs': 'Port not set.'})
-    
-    logs = wiremock_manager.get_log_output(port)
-    return jsonify({'logs': logs})
+        return jsonify({'logs': 'Port not set.', 'cursor': None, 'reset': True})
+
+    chunk = get_wiremock_manager().read_log_chunk(port, request.args.get('cursor'))
+    return jsonify(chunk)
+
+@instances_bp.route('/stream_instance_logs', methods=['GET'])
+def stream_instance_logs():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'}), 400
+
+    wiremock_manager = get_wiremock_manager()
+    broadcaster = wiremock_manager.log_broadcaster
+    # EventSource resends the id of the last event it saw when reconnecting.
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('cursor')
+    after_seq = broadcaster.seq_for_cursor(port, cursor)
+
+    # Streams are closed after LOG_STREAM_MAX_SECONDS; EventSource reconnects with Last-Event-ID.
+    deadline = time.monotonic() + LOG_STREAM_MAX_SECONDS
+
+    def generate(after_seq):
+        yield 'retry: 3000\n\n'
+        idle_since = time.monotonic()
+        while (remaining := deadline - time.monotonic()) > 0:
+            # The wait may return early without lines (the supervisor's waits are short polls).
+            lines, after_seq = broadcaster.wait(port, after_seq, min(LOG_STREAM_HEARTBEAT_SECONDS, remaining))
+            if lines:
+                idle_since = time.monotonic()
+                yield ''.join(f'id: {line_cursor}\ndata: {line}\n\n' for line_cursor, line in lines)
+            elif time.monotonic() - idle_since >= LOG_STREAM_HEARTBEAT_SECONDS:
+                idle_since = time.monotonic()
+                yield ': keepalive\n\n'
+
+    def tail(cursor):
+        # The instance's output is pumped by another worker: follow the log file instead.
+        yield 'retry: 3000\n\n'
+        idle_since = time.monotonic()
+        while time.monotonic() < deadline:
+            chunk = wiremock_manager.read_log_chunk(port, cursor)
+            lines = chunk['logs'].splitlines() if chunk['cursor'] else []
+            cursor = chunk['cursor'] or cursor
+            if lines:
+                idle_since = time.monotonic()
+                yield ''.join(f'data: {line}\n\n' for line in lines[:-1]) + f'id: {cursor}\ndata: {lines[-1]}\n\n'
+            elif time.monotonic() - idle_since >= LOG_STREAM_HEARTBEAT_SECONDS:
+                idle_since = time.monotonic()
+                yield ': keepalive\n\n'
+            time.sleep(LOG_TAIL_POLL_SECONDS)
+
+    if wiremock_manager.is_running(port) and not wiremock_manager.streams_logs_locally(port):
+        stream = tail(cursor)
+    else:
+        stream = generate(after_seq)
+    # Past the limit the page falls back to polling /get_instance_logs.
+    if not log_stream_slots.acquire(blocking=False):
+        return jsonify({'success': False, 'message': 'Too many open log streams.'}), 503, {'Retry-After': '30'}
+    response = Response(stream, mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # The server closes the response when the stream ends or the client goes away.
+    response.call_on_close(log_stream_slots.release)
+    return response
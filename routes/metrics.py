@@ -0,0 +1,14 @@
+from flask import Blueprint, Response
+from utils.request_metrics import request_metrics, render_instance_metrics, render_proxy_metrics
+from utils.front_proxy import get_front_proxy
+from utils.wiremock_manager import get_wiremock_manager
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    lines = request_metrics.render() if request_metrics.enabled else []
+    lines += render_instance_metrics(get_wiremock_manager())
+    if get_front_proxy() is not None:
+        lines += render_proxy_metrics(get_front_proxy())
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
@@ -1,13 +1,28 @@
 import os
 import re
 import json
-import shutil
-import zipfile
-from datetime import datetime
-from flask import Blueprint, render_template, request, send_file, session, redirect, url_for, flash, jsonify
-from config import WIREMOCK_JAR_NAME
+import codecs
+import time
+import base64
+import uuid
+from flask import Blueprint, Response, render_template, request, send_file, session, redirect, url_for, flash, jsonify
+from config import WIREMOCK_JAR_NAME, STUBS_PAGE_SIZE, STUBS_PAGE_SIZE_MAX, BODY_PREVIEW_BYTES
+from utils.admin_client import AdminApiError
+from utils.body_store import BodyStore, BODY_REFS_FILE, is_cas_name
+from utils.body_upload import store_upload, detect_content_type, is_text_type
+from utils.stub_index import StubIndex
+from utils.stub_import import StubImport
+from utils.stub_matcher import StubMatcher
+from utils.stub_search import get_stub_search
+from utils.zip_stream import ZipStreamer
+from utils.journal_collector import JOURNAL_SUMMARY_FILE
+from utils.load_benchmark import BENCHMARKS_DIR
+from utils.wiremock_manager import get_wiremock_manager, INSTANCE_SETTINGS_FILE
 
 stubs_bp = Blueprint('stubs', __name__)
+stub_index = StubIndex()
+zip_streamer = ZipStreamer()
+stub_matcher = StubMatcher(stub_index)
 
 def _validate_json_filename(filename):
     # Basic validation for filenames to prevent path traversal and ensure valid format
@@ -15,6 +30,67 @@ def _validate_json_filename(filename):
         return False
     return True
 
+def _body_file_path(port, body_file_name):
+    # bodyFileName comes from mapping JSON; refuse anything that escapes __files
+    files_dir = os.path.abspath(f"wiremock_instances/{port}/__files")
+    path = os.path.abspath(os.path.join(files_dir, body_file_name))
+    if os.path.commonpath([files_dir, path]) != files_dir:
+        return None
+    return path
+
+def _release_body(port, body_file, mapping_filename):
+    # Drops a mapping's reference to its body. Shared blobs go with their last
+    # reference; legacy per-stub files once no other mapping points at them.
+    if is_cas_name(body_file):
+        BodyStore(port).release(body_file)
+        return True
+    if any(entry['body_file'] == body_file for name, entry in stub_index.entries(port).items()
+           if name != mapping_filename):
+        return True
+    path = _body_file_path(port, body_file)
+    if path and os.path.exists(path):
+        os.remove(path)
+        return True
+    return False
+
+def _sync_running_instance(port, push):
+    # Files on disk are the source of truth; a running instance is updated live
+    # through its admin API so edits don't need a JVM restart.
+    wiremock_manager = get_wiremock_manager()
+    if not wiremock_manager.is_running(port):
+        return
+    try:
+        push(wiremock_manager)
+    except AdminApiError as e:
+        flash(f"Saved to disk, but the running instance was not updated: {e}", "warning")
+
+def _push_mapping(manager, port, existing, stub):
+    # Warm-pool instances listen on a spare port and need bodies inlined.
+    admin, served_port = manager.admin, manager.served_port(port)
+    stub = manager.mapping_for_push(port, stub)
+    if existing is None:
+        admin.create_mapping(served_port, stub)
+    elif not existing['id']:
+        # Legacy mapping without an id: let WireMock reload everything from disk.
+        manager.reload_mappings(port)
+    else:
+        try:
+            admin.update_mapping(served_port, stub['id'], stub)
+        except AdminApiError as e:
+            if e.status != 404:
+                raise
+            admin.create_mapping(served_port, stub)
+
+def _push_delete(manager, port, existing):
+    if existing is None or not existing['id']:
+        manager.reload_mappings(port)
+        return
+    try:
+        manager.admin.delete_mapping(manager.served_port(port), existing['id'])
+    except AdminApiError as e:
+        if e.status != 404:
+            raise
+
 @stubs_bp.route('/add_stub', methods=['POST'])
 def add_stub():
     if 'current_port' not in session:
@@ -25,8 +101,10 @@ def add_stub():
     method = request.form['method']
     url = request.form['url'] or '/'
     body = request.form['body']
-    response_body_str = request.form['response_body']
+    response_body_str = request.form.get('response_body', '')
     response_file_name = request.form['response_file']
+    response_upload = request.files.get('response_upload')
+    content_type = request.form.get('response_content_type', '').strip()
 
     # Validate the response file name before proceeding
     if not _validate_json_filename(f"{response_file_name}-req.json"):
@@ -35,80 +113,278 @@ def add_stub():
 
     wiremock_folder = f"wiremock_instances/{port}"
     mappings_dir = os.path.join(wiremock_folder, "mappings")
-    files_dir = os.path.join(wiremock_folder, "__files")
     os.makedirs(mappings_dir, exist_ok=True)
-    os.makedirs(files_dir, exist_ok=True)
 
+    body_store = BodyStore(port)
     try:
-        # Handle response body
-        res_filename = f"{response_file_name}-res.json"
-        with open(os.path.join(files_dir, res_filename), 'w') as f:
-            json.dump(json.loads(response_body_str), f, indent=2)
-    except json.JSONDecodeError:
-        flash("Invalid JSON in Response Body.", "error")
+        # Identical bodies are stored once and shared between stubs.
+        if response_upload and response_upload.filename:
+            # Uploaded files are copied byte for byte, in chunks, whatever their type.
+            stored = store_upload(port, response_upload.stream, response_upload.filename,
+                                  response_upload.mimetype, content_type,
+                                  validate_json=request.form.get('validate_json') == '1')
+            res_filename, content_type = stored['name'], stored['content_type']
+        else:
+            res_filename = body_store.put(json.dumps(json.loads(response_body_str), indent=2).encode())
+            content_type = content_type or "application/json"
+    except ValueError as e:
+        flash(f"Invalid JSON in Response Body: {e}", "error")
         return redirect(url_for('dashboard.dashboard'))
     except Exception as e:
         flash(f"Error writing response file: {e}", "error")
         return redirect(url_for('dashboard.dashboard'))
 
+    mapping_written = False
     try:
         request_stub = {"method": method, "urlPath": url}
         if body:
             request_stub["body"] = json.loads(body)
 
         mapping_filename = f"{response_file_name}-req.json"
+        existing = stub_index.get(port, mapping_filename)
         stub = {
+            "id": (existing and existing['id']) or str(uuid.uuid4()),
             "request": request_stub,
             "response": {
                 "status": 200,
                 "bodyFileName": res_filename,
-                "headers": {"Content-Type": "application/json"}
+                "headers": {"Content-Type": content_type}
             }
         }
 
         with open(os.path.join(mappings_dir, mapping_filename), 'w') as f:
             json.dump(stub, f, indent=2)
+        mapping_written = True
+        stub_index.update(port, mapping_filename)
+        get_stub_search().update(port, mapping_filename)
+        if existing and existing['body_file']:
+            _release_body(port, existing['body_file'], mapping_filename)
+        _sync_running_instance(port, lambda manager: _push_mapping(manager, port, existing, stub))
 
         flash("Stub added successfully!", "success")
     except json.JSONDecodeError:
         flash("Invalid JSON in Request Body.", "error")
     except Exception as e:
         flash(f"Error adding stub: {e}", "error")
+    if not mapping_written:
+        body_store.release(res_filename)
 
     return redirect(url_for('dashboard.dashboard'))
 
+@stubs_bp.route('/import_stubs', methods=['POST'])
+def import_stubs():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'}), 400
+
+    upload = request.files.get('stubs_file')
+    if not upload or not upload.filename:
+        return jsonify({'success': False, 'message': 'No file uploaded.'}), 400
+
+    name = upload.filename.lower()
+    stream = upload.stream
+    importer = StubImport(port)
+    try:
+        if name.endswith('.zip') or stream.read(2) == b'PK':
+            stream.seek(0)
+            importer.import_zip(stream)
+        elif name.endswith('.har'):
+            stream.seek(0)
+            importer.import_har(stream)
+        else:
+            stream.seek(0)
+            importer.import_json(stream)
+        if importer.rejected:
+            return jsonify({'success': False, 'message': "Import rejected, nothing was changed.",
+                            'imported': 0, 'errors': importer.errors}), 400
+        importer.commit()
+    except Exception as e:
+        importer.cleanup()
+        return jsonify({'success': False, 'message': f"Import failed, nothing was changed: {e}",
+                        'errors': importer.errors}), 500
+
+    if importer.imported:
+        _sync_running_instance(port, lambda manager: manager.reload_mappings(port))
+    return jsonify({
+        'success': not importer.errors,
+        'message': f"Imported {len(importer.imported)} stubs with {len(importer.errors)} errors.",
+        'imported': len(importer.imported),
+        'errors': importer.errors,
+    })
+
+@stubs_bp.route('/body_store/migrate', methods=['POST'])
+def migrate_body_store():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'}), 400
+
+    result = BodyStore(port).migrate()
+    if result['migrated']:
+        _sync_running_instance(port, lambda manager: manager.reload_mappings(port))
+    return jsonify({'success': True, 'message': f"Moved {result['migrated']} response bodies into "
+                                                f"{result['blobs']} shared files.", **result})
+
+@stubs_bp.route('/body_store/gc', methods=['POST'])
+def collect_body_store():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'}), 400
+
+    result = BodyStore(port).gc()
+    return jsonify({'success': True, 'message': f"Removed {result['removed']} unreferenced response bodies.",
+                    **result})
+
 @stubs_bp.route('/list_stubs')
 def list_stubs():
     if 'current_port' not in session:
         flash("Set port first", "error")
         return redirect(url_for('dashboard.dashboard'))
 
-    port = session['current_port']
-    mappings_dir = f"wiremock_instances/{port}/mappings"
+    # Rows are loaded page by page from /api/stubs by list_stubs.js.
+    return render_template('list_stubs.html')
 
+def _encode_cursor(stub):
+    raw = json.dumps([stub['mtime'], stub['filename']]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def _decode_cursor(cursor):
+    mtime, filename = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return float(mtime), str(filename)
+
+@stubs_bp.route('/api/stubs')
+def api_list_stubs():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'}), 400
+
+    method = request.args.get('method', '').upper()
+    url_prefix = request.args.get('url_prefix', '')
+    filename_filter = request.args.get('filename', '').lower()
+    descending = request.args.get('order', 'desc') != 'asc'
     try:
-        stubs = []
-        if os.path.exists(mappings_dir):
-            for filename in os.listdir(mappings_dir):
-                if filename.endswith('.json') and _validate_json_filename(filename):
-                    with open(os.path.join(mappings_dir, filename)) as f:
-                        stub_data = json.load(f)
-                        stubs.append({
-                            'filename': filename,
-                            'method': stub_data['request'].get('method', 'GET'),
-                            'url': stub_data['request'].get('urlPath', stub_data['request'].get('url', 'N/A')),
-                            'created_at': datetime.fromtimestamp(
-                                os.path.getmtime(os.path.join(mappings_dir, filename))
-                            ).strftime('%Y-%m-%d %H:%M:%S')
-                        })
-        stubs.sort(key=lambda x: x['created_at'], reverse=True)
-        return render_template('list_stubs.html', stubs=stubs)
-    except FileNotFoundError:
-        flash("Mappings directory not found.", "error")
-        return render_template('list_stubs.html', stubs=[])
-    except Exception as e:
-        flash(f"Error listing stubs: {e}", "error")
-        return render_template('list_stubs.html', stubs=[])
+        limit = min(max(int(request.args.get('limit', STUBS_PAGE_SIZE)), 1), STUBS_PAGE_SIZE_MAX)
+        url_regex = re.compile(request.args['url_regex']) if request.args.get('url_regex') else None
+        after = _decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except re.error as e:
+        return jsonify({'success': False, 'message': f"Invalid URL regex: {e}"}), 400
+    except (ValueError, TypeError):
+        return jsonify({'success': False, 'message': 'Invalid limit or cursor.'}), 400
+
+    stubs = [
+        stub for stub in stub_index.entries(port).values()
+        if (not method or stub['method'].upper() == method)
+        and stub['url'].startswith(url_prefix)
+        and (url_regex is None or url_regex.search(stub['url']))
+        and filename_filter in stub['filename'].lower()
+    ]
+    stubs.sort(key=lambda x: (x['mtime'], x['filename']), reverse=descending)
+    total = len(stubs)
+
+    if after is not None:
+        if descending:
+            stubs = [stub for stub in stubs if (stub['mtime'], stub['filename']) < after]
+        else:
+            stubs = [stub for stub in stubs if (stub['mtime'], stub['filename']) > after]
+    page = stubs[:limit]
+    next_cursor = _encode_cursor(page[-1]) if len(stubs) > limit else None
+
+    return jsonify({
+        'success': True,
+        'stubs': [
+            {key: stub[key] for key in ('filename', 'method', 'url', 'created_at', 'mtime')}
+            for stub in page
+        ],
+        'total': total,
+        'next_cursor': next_cursor,
+    })
+
+@stubs_bp.route('/api/stubs/match', methods=['GET', 'POST'])
+def api_match_stub():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'}), 400
+
+    if request.method == 'POST':
+        data = request.get_json(silent=True)
+        data = data if isinstance(data, dict) else {}
+    else:
+        data = request.args
+    url = data.get('url')
+    if not url:
+        return jsonify({'success': False, 'message': 'Give the request url (path and optional query).'}), 400
+    headers = data.get('headers') if isinstance(data.get('headers'), dict) else {}
+    body = data.get('body')
+    if body is not None and not isinstance(body, str):
+        body = json.dumps(body)
+
+    result = stub_matcher.match(port, data.get('method') or 'GET', url, headers, body)
+    return jsonify({'success': True, **result})
+
+@stubs_bp.route('/api/stubs/overlaps')
+def api_stub_overlaps():
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'}), 400
+
+    try:
+        limit = max(int(request.args.get('limit', 500)), 0)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid limit.'}), 400
+    return jsonify({'success': True, **stub_matcher.overlaps(port, limit)})
+
+@stubs_bp.route('/api/stubs/search')
+def api_search_stubs():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'message': 'Missing search query.'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', STUBS_PAGE_SIZE)), 1), STUBS_PAGE_SIZE_MAX)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid limit.'}), 400
+    # Searches every port unless one is given; 'current' means the session's port.
+    port = request.args.get('port') or None
+    if port == 'current':
+        port = session.get('current_port')
+        if not port:
+            return jsonify({'success': False, 'message': 'Port not set.'}), 400
+
+    started = time.perf_counter()
+    try:
+        results = get_stub_search().search(query, port, request.args.get('field') or None, limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify({'success': True, 'results': results,
+                    'took_ms': round((time.perf_counter() - started) * 1000, 2)})
+
+def _response_content_type(response_data):
+    headers = response_data.get('headers') or {}
+    for name, value in headers.items():
+        if name.lower() == 'content-type' and isinstance(value, str):
+            return value
+    return None
+
+def _body_preview(path, body_file_name, response_data):
+    # Only the first BODY_PREVIEW_BYTES are read; the page fetches more with range requests.
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        head = f.read(BODY_PREVIEW_BYTES)
+    content_type = _response_content_type(response_data) or detect_content_type(head[:512], body_file_name)
+    truncated = size > len(head)
+    preview = {'size': size, 'content_type': content_type, 'truncated': truncated, 'text': None,
+               'offset': len(head)}
+    if not is_text_type(content_type):
+        return preview
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    text = decoder.decode(head, final=not truncated)
+    # A multi-byte character cut off at the end is left for the next range.
+    preview['offset'] -= len(decoder.getstate()[0])
+    if not truncated and 'json' in content_type:
+        try:
+            text = json.dumps(json.loads(text), indent=2, ensure_ascii=False)
+        except ValueError:
+            pass
+    preview['text'] = text
+    return preview
 
 @stubs_bp.route('/view_stub/<filename>')
 def view_stub(filename):
@@ -121,6 +397,11 @@ def view_stub(filename):
         flash("Port not set.", "error")
         return redirect(url_for('dashboard.index'))
 
+    entry = stub_index.get(port, filename)
+    if entry is None:
+        flash("Stub file not found.", "error")
+        return redirect(url_for('stubs.list_stubs'))
+
     mappings_path = os.path.join(f"wiremock_instances/{port}/mappings", filename)
 
     try:
@@ -129,14 +410,16 @@ def view_stub(filename):
 
         request_data = stub_content.get('request', {})
         response_data = stub_content.get('response', {})
-        response_body = {}
+        response_body = None
+        body_refs = 0
 
-        response_file_name = response_data.get('bodyFileName')
+        response_file_name = entry['body_file']
         if response_file_name:
-            response_file_path = os.path.join(f"wiremock_instances/{port}/__files", response_file_name)
-            if os.path.exists(response_file_path):
-                with open(response_file_path, 'r') as rf:
-                    response_body = json.load(rf)
+            response_file_path = _body_file_path(port, response_file_name)
+            if response_file_path and os.path.exists(response_file_path):
+                response_body = _body_preview(response_file_path, response_file_name, response_data)
+                if is_cas_name(response_file_name):
+                    body_refs = BodyStore(port).refs(response_file_name)
             else:
                 flash(f"Response file '{response_file_name}' not found.", "warning")
 
@@ -145,7 +428,8 @@ def view_stub(filename):
             filename=filename,
             request_data=request_data,
             response_data=response_data,
-            response_body=response_body
+            response_body=response_body,
+            body_refs=body_refs
         )
     except FileNotFoundError:
         flash("Stub file not found.", "error")
@@ -157,6 +441,30 @@ def view_stub(filename):
         flash(f"An unexpected error occurred: {e}", "error")
         return redirect(url_for('stubs.list_stubs'))
 
+@stubs_bp.route('/stub_body/<filename>')
+def stub_body(filename):
+    if not _validate_json_filename(filename):
+        return jsonify({'success': False, 'message': 'Invalid file name.'}), 400
+
+    port = session.get('current_port')
+    if not port:
+        return jsonify({'success': False, 'message': 'Port not set.'}), 400
+
+    entry = stub_index.get(port, filename)
+    path = entry and entry['body_file'] and _body_file_path(port, entry['body_file'])
+    if not path or not os.path.exists(path):
+        return jsonify({'success': False, 'message': 'Response body not found.'}), 404
+
+    try:
+        with open(os.path.join(f"wiremock_instances/{port}/mappings", filename)) as f:
+            content_type = _response_content_type(json.load(f).get('response', {}))
+    except (OSError, ValueError, AttributeError):
+        content_type = None
+    # conditional=True answers Range requests with 206 Partial Content.
+    return send_file(path, mimetype=content_type or 'application/octet-stream', conditional=True,
+                     as_attachment=request.args.get('download') == '1',
+                     download_name=os.path.basename(entry['body_file']), max_age=0)
+
 @stubs_bp.route('/delete_stub/<filename>')
 def delete_stub(filename):
     if not _validate_json_filename(filename):
@@ -169,17 +477,18 @@ def delete_stub(filename):
         return redirect(url_for('dashboard.index'))
 
     try:
+        entry = stub_index.get(port, filename)
         mapping_file_path = os.path.join(f"wiremock_instances/{port}/mappings", filename)
         if os.path.exists(mapping_file_path):
             os.remove(mapping_file_path)
+            stub_index.remove(port, filename)
+            get_stub_search().remove(port, filename)
+            _sync_running_instance(port, lambda manager: _push_delete(manager, port, entry))
         else:
             flash("Mapping file not found.", "warning")
 
-        res_file = filename.replace('-req.json', '-res.json')
-        res_path = os.path.join(f"wiremock_instances/{port}/__files", res_file)
-        if os.path.exists(res_path):
-            os.remove(res_path)
-        else:
+        res_file = (entry and entry['body_file']) or filename.replace('-req.json', '-res.json')
+        if not _release_body(port, res_file, filename):
             flash("Response body file not found.", "warning")
 
         flash("Stub deleted successfully!", "success")
@@ -197,25 +506,31 @@ def generate_zip():
         return redirect(url_for('dashboard.index'))
 
     wiremock_folder = f"wiremock_instances/{port}"
-    # No need to copy wiremock-jre8-standalone-2.35.0.jar or start.bat into the zip folder
-    # as they are already in the static directory and not part of the instance's configuration.
-
-    zip_filename = f"wiremock_{port}.zip"
-    zip_file_path = os.path.join(os.getcwd(), zip_filename)
-
-    try:
-        with zipfile.ZipFile(zip_file_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(wiremock_folder):
-                for file in files:
-                    # Exclude the WireMock JAR and start.bat if they were accidentally copied
-                    if file == WIREMOCK_JAR_NAME or file == "start.bat":
-                        continue
-                    zipf.write(os.path.join(root, file), os.path.relpath(os.path.join(root, file), wiremock_folder))
-
-        return send_file(zip_file_path, as_attachment=True)
-    except Exception as e:
-        flash(f"Failed to generate ZIP: {str(e)}", "error")
-        return redirect(url_for('dashboard.dashboard'))
+    include_logs = request.args.get('include_logs') == '1'
+
+    files = []
+    for root, dirs, filenames in os.walk(wiremock_folder):
+        # Skip in-progress imports and other hidden working directories.
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        if root == wiremock_folder and BENCHMARKS_DIR in dirs:
+            dirs.remove(BENCHMARKS_DIR)
+        for file in sorted(filenames):
+            # Exclude the WireMock JAR and start.bat if they were accidentally copied
+            if file == WIREMOCK_JAR_NAME or file == "start.bat":
+                continue
+            if root == wiremock_folder and file.startswith((INSTANCE_SETTINGS_FILE, JOURNAL_SUMMARY_FILE,
+                                                            BODY_REFS_FILE)):
+                continue
+            if file.startswith('wiremock.log') and not include_logs:
+                continue
+            path = os.path.join(root, file)
+            files.append((path, os.path.relpath(path, wiremock_folder)))
+
+    return Response(
+        zip_streamer.iter_zip(files),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename=wiremock_{port}.zip'},
+    )
 
 @stubs_bp.route('/download_stub/<filename>')
 def download_stub(filename):
@@ -0,0 +1,51 @@
+"""
+Production entry point: serves the app with waitress if it is installed,
+otherwise with werkzeug's threaded server (no debugger, no reloader).
+
+    python serve.py --host 0.0.0.0 --port 5000 --threads 16
+
+For several worker processes, use a pre-forking server with the shared
+SQLite state backend so every worker sees the same instances and jobs:
+
+    STATE_BACKEND=sqlite gunicorn -w 4 --threads 8 -b 0.0.0.0:5000 app:app
+"""
+import argparse
+
+from config import PROXY_PORT, SUPERVISOR_ADDRESS, WARM_POOL_SIZE
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve WireMock Wizard without the debug server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=16, help="request threads (waitress only)")
+    parser.add_argument('--proxy-port', type=int, default=PROXY_PORT,
+                        help="also run the front proxy for the instances on this port (0: off)")
+    args = parser.parse_args()
+
+    from app import app
+    if args.proxy_port:
+        from utils.front_proxy import start_front_proxy
+        proxy = start_front_proxy(port=args.proxy_port)
+        print(f"Front proxy listening on http://{proxy.host}:{proxy.port} (/<port>/... or <port>.<host>)")
+    if WARM_POOL_SIZE > 0 and not SUPERVISOR_ADDRESS:
+        # This single process owns the instances, so it keeps the warm pool.
+        from utils.wiremock_manager import get_wiremock_manager
+        get_wiremock_manager().start_warm_pool()
+
+    try:
+        from waitress import serve
+    except ImportError:
+        from werkzeug.serving import run_simple
+        print(f"waitress not installed; serving with werkzeug (threaded) on http://{args.host}:{args.port}")
+        run_simple(args.host, args.port, app, threaded=True, use_debugger=False, use_reloader=False)
+        return
+
+    print(f"Serving with waitress ({args.threads} threads) on http://{args.host}:{args.port}")
+    # Log streams hold a thread each (at most LOG_STREAM_MAX_CLIENTS); keep the default
+    # --threads above that so regular requests still get served.
+    serve(app, host=args.host, port=args.port, threads=args.threads, channel_timeout=120)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,117 @@
-document.querySelectorAll('.btn-delete').forEach(btn => {
-    btn.addEventListener('click', (e) => {
+const stubTableBody = document.getElementById('stubTableBody');
+const stubListStatus = document.getElementById('stubListStatus');
+const stubListEmpty = document.getElementById('stubListEmpty');
+
+let nextCursor = null;
+let hasMore = true;
+let loading = false;
+let listGeneration = 0;
+
+function stubQuery() {
+    const params = new URLSearchParams();
+    const filters = {
+        method: document.getElementById('filterMethod').value,
+        url_prefix: document.getElementById('filterUrlPrefix').value,
+        url_regex: document.getElementById('filterUrlRegex').value,
+        filename: document.getElementById('filterFilename').value,
+        order: document.getElementById('sortOrder').value,
+    };
+    Object.entries(filters).forEach(([key, value]) => {
+        if (value) params.set(key, value);
+    });
+    if (nextCursor) params.set('cursor', nextCursor);
+    return params.toString();
+}
+
+function actionLink(href, className, label, text) {
+    const link = document.createElement('a');
+    link.href = href;
+    link.className = className;
+    link.setAttribute('aria-label', label);
+    link.textContent = text;
+    return link;
+}
+
+function renderStubRow(stub) {
+    const row = document.createElement('tr');
+    const encoded = encodeURIComponent(stub.filename);
+
+    const methodCell = document.createElement('td');
+    const badge = document.createElement('span');
+    badge.className = 'badge bg-success';
+    badge.textContent = stub.method;
+    methodCell.appendChild(badge);
+
+    const urlCell = document.createElement('td');
+    const code = document.createElement('code');
+    code.textContent = stub.url;
+    urlCell.appendChild(code);
+
+    const createdCell = document.createElement('td');
+    createdCell.textContent = stub.created_at;
+
+    const actionsCell = document.createElement('td');
+    actionsCell.appendChild(actionLink(`/view_stub/${encoded}`, 'btn btn-sm btn-primary me-1', `View stub ${stub.filename}`, '🔍 View'));
+    const deleteLink = actionLink(`/delete_stub/${encoded}`, 'btn btn-sm btn-danger me-1 btn-delete', `Delete stub ${stub.filename}`, '🗑️ Delete');
+    deleteLink.addEventListener('click', (e) => {
         if (!confirm('Hapus stub ini?')) {
             e.preventDefault();
         }
     });
-});
\ No newline at end of file
+    actionsCell.appendChild(deleteLink);
+    actionsCell.appendChild(actionLink(`/download_stub/${encoded}`, 'btn btn-sm btn-secondary', `Download stub ${stub.filename}`, '⬇️ Download'));
+
+    row.append(methodCell, urlCell, createdCell, actionsCell);
+    return row;
+}
+
+function loadStubPage() {
+    if (loading || !hasMore) return;
+    loading = true;
+    stubListStatus.textContent = 'Loading...';
+    const generation = listGeneration;
+
+    fetch(`/api/stubs?${stubQuery()}`)
+        .then(response => response.json())
+        .then(data => {
+            if (generation !== listGeneration) return; // Filters changed meanwhile
+            if (!data.success) {
+                stubListStatus.textContent = data.message;
+                hasMore = false;
+                return;
+            }
+            data.stubs.forEach(stub => stubTableBody.appendChild(renderStubRow(stub)));
+            nextCursor = data.next_cursor;
+            hasMore = Boolean(nextCursor);
+            stubListEmpty.classList.toggle('d-none', data.total > 0);
+            stubListStatus.textContent = data.total
+                ? `Showing ${stubTableBody.children.length} of ${data.total} stubs`
+                : '';
+        })
+        .finally(() => {
+            if (generation === listGeneration) loading = false;
+        });
+}
+
+function reloadStubs() {
+    listGeneration++;
+    loading = false;
+    nextCursor = null;
+    hasMore = true;
+    stubTableBody.replaceChildren();
+    loadStubPage();
+}
+
+let filterTimer;
+document.getElementById('stubFilters').addEventListener('input', () => {
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(reloadStubs, 300);
+});
+document.getElementById('stubFilters').addEventListener('submit', (e) => e.preventDefault());
+
+// Fetch the next page whenever the bottom of the table scrolls into view.
+new IntersectionObserver(entries => {
+    if (entries.some(entry => entry.isIntersecting)) loadStubPage();
+}).observe(document.getElementById('stubListSentinel'));
+
+reloadStubs();
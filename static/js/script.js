@@ -19,27 +19,222 @@ window.addEventListener('DOMContentLoaded', () => {
     if (!document.getElementById('port')?.value) {
         document.getElementById('new_port')?.focus();
     }
-    getInstanceStatus();
+    if (document.getElementById('wiremockStatus')) {
+        getInstanceStatus();
+    }
+    if (document.getElementById('profileSelect')) {
+        loadProfiles();
+    }
+    if (document.getElementById('benchmarkForm')) {
+        initializeBenchmarks();
+    }
     initializeLogs();
+    if (document.getElementById('instanceStatusBody')) {
+        refreshInstancesTable();
+        setInterval(refreshInstancesTable, 5000);
+    }
 });
 
-function startWiremock() {
-    fetch('/start_instance', {method: 'POST'})
+function formatUptime(seconds) {
+    if (seconds == null) return '-';
+    const h = Math.floor(seconds / 3600);
+    const m = Math.floor((seconds % 3600) / 60);
+    return h ? `${h}h ${m}m` : `${m}m ${Math.floor(seconds % 60)}s`;
+}
+
+// One request for every instance; the server answers from its cached probe results.
+function refreshInstancesTable() {
+    fetch('/instances/status')
+        .then(response => response.json())
+        .then(data => {
+            const body = document.getElementById('instanceStatusBody');
+            body.replaceChildren();
+            data.instances.forEach(instance => {
+                const row = document.createElement('tr');
+                const cells = [
+                    instance.port,
+                    instance.running ? 'Running' : 'Stopped',
+                    formatUptime(instance.uptime),
+                    instance.rss != null ? `${(instance.rss / 1048576).toFixed(1)} MB` : '-',
+                    instance.cpu_percent != null ? `${instance.cpu_percent.toFixed(1)}%` : '-',
+                    instance.connections != null ? instance.connections : '-',
+                ];
+                cells.forEach((value, i) => {
+                    const cell = document.createElement('td');
+                    cell.textContent = value;
+                    if (i === 1) cell.className = instance.running ? 'text-success' : 'text-danger';
+                    row.appendChild(cell);
+                });
+                body.appendChild(row);
+            });
+        });
+}
+
+// JVM profile of the current port; it takes effect on the next start.
+function loadProfiles() {
+    fetch('/instance_profile')
         .then(response => response.json())
         .then(data => {
-            document.getElementById('wiremockStatus').innerText = data.message;
-            getInstanceStatus();
-            getInstanceLogs(); // Fetch logs immediately after starting
+            if (!data.success) return;
+            const select = document.getElementById('profileSelect');
+            select.replaceChildren();
+            data.profiles.forEach(profile => {
+                const option = document.createElement('option');
+                option.value = profile.name;
+                option.textContent = `${profile.name} - ${profile.description}`;
+                option.selected = profile.name === data.profile;
+                select.appendChild(option);
+            });
+            select.addEventListener('change', saveProfile);
         });
 }
 
+function saveProfile(event) {
+    fetch('/instance_profile', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ profile: event.target.value }),
+    })
+        .then(response => response.json())
+        .then(data => {
+            const status = document.getElementById('profileStatus');
+            status.textContent = data.message;
+            status.className = data.success ? 'text-success' : 'text-danger';
+        });
+}
+
+function initializeBenchmarks() {
+    document.getElementById('benchmarkForm').addEventListener('submit', event => {
+        event.preventDefault();
+        const form = event.target;
+        fetch('/benchmarks', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ requests: form.requests.value, concurrency: form.concurrency.value }),
+        })
+            .then(response => response.json())
+            .then(data => {
+                document.getElementById('benchmarkStatus').textContent = data.message;
+                if (data.job) waitForBenchmark(data.job.id);
+            });
+    });
+    document.getElementById('benchCompareBtn').addEventListener('click', compareBenchmarks);
+    loadBenchmarks();
+}
+
+function waitForBenchmark(jobId) {
+    fetch(`/jobs/${jobId}`)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) return;
+            const status = document.getElementById('benchmarkStatus');
+            status.textContent = data.job.message;
+            if (data.job.state === 'pending' || data.job.state === 'running') {
+                setTimeout(() => waitForBenchmark(jobId), 1000);
+                return;
+            }
+            status.className = data.job.state === 'succeeded' ? 'mb-2 text-success' : 'mb-2 text-danger';
+            loadBenchmarks();
+        });
+}
+
+function loadBenchmarks() {
+    fetch('/benchmarks')
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) return;
+            const body = document.getElementById('benchmarkBody');
+            body.replaceChildren();
+            const ms = value => value != null ? value.toFixed(2) : '-';
+            data.runs.forEach(run => {
+                const row = document.createElement('tr');
+                const selectCell = document.createElement('td');
+                const checkbox = document.createElement('input');
+                checkbox.type = 'checkbox';
+                checkbox.className = 'form-check-input bench-select';
+                checkbox.value = run.id;
+                selectCell.appendChild(checkbox);
+                row.appendChild(selectCell);
+                [
+                    run.id,
+                    run.profile || '-',
+                    run.stub_set,
+                    run.throughput_rps,
+                    ms(run.latency_ms.p50),
+                    ms(run.latency_ms.p95),
+                    ms(run.latency_ms.p99),
+                    `${(run.error_rate * 100).toFixed(1)}%`,
+                ].forEach(value => {
+                    const cell = document.createElement('td');
+                    cell.textContent = value;
+                    row.appendChild(cell);
+                });
+                body.appendChild(row);
+            });
+        });
+}
+
+// Compares two checked runs; the older one is the baseline.
+function compareBenchmarks() {
+    const selected = [...document.querySelectorAll('.bench-select:checked')].map(box => box.value);
+    const output = document.getElementById('benchmarkCompare');
+    if (selected.length !== 2) {
+        output.textContent = 'Pilih tepat dua run untuk dibandingkan.';
+        return;
+    }
+    const [candidate, baseline] = selected;
+    fetch(`/benchmarks/compare?baseline=${encodeURIComponent(baseline)}&candidate=${encodeURIComponent(candidate)}`)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                output.textContent = data.message;
+                return;
+            }
+            const lines = Object.entries(data.comparison.metrics).map(([name, metric]) =>
+                `${name}: ${metric.baseline} -> ${metric.candidate}` +
+                (metric.change_pct != null ? ` (${metric.change_pct > 0 ? '+' : ''}${metric.change_pct}%)` : ''));
+            const comparison = data.comparison;
+            lines.unshift(`profile: ${comparison.profile.baseline} -> ${comparison.profile.candidate}`,
+                `stub set: ${comparison.stub_set.baseline} -> ${comparison.stub_set.candidate}`);
+            output.textContent = lines.join('\n');
+        });
+}
+
+function startWiremock() {
+    fetch('/start_instance', {method: 'POST'})
+        .then(response => response.json())
+        .then(handleJobResponse);
+}
+
 function stopWiremock() {
     fetch('/stop_instance', {method: 'POST'})
+        .then(response => response.json())
+        .then(handleJobResponse);
+}
+
+function handleJobResponse(data) {
+    document.getElementById('wiremockStatus').innerText = data.message;
+    if (data.job) {
+        waitForJob(data.job.id);
+    }
+}
+
+// Start/stop run in the background; poll the job until it settles.
+function waitForJob(jobId) {
+    fetch(`/jobs/${jobId}`)
         .then(response => response.json())
         .then(data => {
-            document.getElementById('wiremockStatus').innerText = data.message;
-            getInstanceStatus();
-            getInstanceLogs(); // Fetch logs immediately after stopping
+            if (!data.success) return;
+            const job = data.job;
+            const statusDiv = document.getElementById('wiremockStatus');
+            statusDiv.innerText = job.message;
+            if (job.state === 'pending' || job.state === 'running') {
+                setTimeout(() => waitForJob(jobId), 500);
+                return;
+            }
+            statusDiv.style.color = job.state === 'succeeded' ? 'green' : 'red';
+            setTimeout(getInstanceStatus, 1500);
+            if (!logStream) getInstanceLogs();
         });
 }
 
@@ -59,8 +254,10 @@ function getInstanceStatus() {
 }
 
 let term;
-let currentLogContent = "";
+let logCursor = null;
 let logPollingInterval;
+let logFetchInFlight = false;
+let logStream;
 
 function initializeLogs() {
     const terminalContainer = document.getElementById('terminal');
@@ -78,21 +275,61 @@ function initializeLogs() {
         fitAddon.fit();
     }
 
-    getInstanceLogs(); // Initial fetch
+    // Load the existing log tail, then switch to the live stream.
+    getInstanceLogs().then(openLogStream);
+}
+
+function startLogPolling() {
     if (logPollingInterval) clearInterval(logPollingInterval); // Clear existing interval if any
     logPollingInterval = setInterval(getInstanceLogs, 3000); // Poll every 3 seconds
 }
 
+function openLogStream() {
+    if (!window.EventSource) {
+        startLogPolling();
+        return;
+    }
+    if (logStream) logStream.close();
+
+    const url = logCursor ? `/stream_instance_logs?cursor=${encodeURIComponent(logCursor)}` : '/stream_instance_logs';
+    logStream = new EventSource(url);
+    logStream.onopen = () => {
+        if (logPollingInterval) {
+            clearInterval(logPollingInterval);
+            logPollingInterval = null;
+        }
+    };
+    logStream.onmessage = (event) => {
+        term.write(event.data + '\r\n');
+        logCursor = event.lastEventId || logCursor;
+    };
+    logStream.onerror = () => {
+        // The browser reconnects on its own; only fall back once it gives up.
+        if (logStream.readyState === EventSource.CLOSED) {
+            logStream = null;
+            startLogPolling();
+        }
+    };
+}
+
 function getInstanceLogs() {
-    fetch('/get_instance_logs')
+    if (!term || logFetchInFlight) return Promise.resolve();
+    logFetchInFlight = true;
+
+    const url = logCursor ? `/get_instance_logs?cursor=${encodeURIComponent(logCursor)}` : '/get_instance_logs';
+    return fetch(url)
         .then(response => response.json())
         .then(data => {
-            const newLogContent = data.logs;
-            if (newLogContent !== currentLogContent) {
-                // Find the new part of the logs
-                const diff = newLogContent.substring(currentLogContent.length);
-                term.write(diff.replace(/\n/g, '\r\n'));
-                currentLogContent = newLogContent;
+            if (data.reset) {
+                term.reset();
             }
+            if (data.logs) {
+                // Only the bytes appended since the last cursor are sent.
+                term.write(data.logs.replace(/\n/g, '\r\n'));
+            }
+            logCursor = data.cursor;
+        })
+        .finally(() => {
+            logFetchInFlight = false;
         });
 }
@@ -17,4 +17,37 @@ function handleFileUpload(inputId, textareaId) {
 
 // Panggil fungsi untuk body dan response
 handleFileUpload('body_upload', 'body');
-handleFileUpload('response_upload', 'response_body');
\ No newline at end of file
+// File respons dikirim apa adanya (streaming di server), tidak disalin ke textarea
+document.getElementById('response_upload')?.addEventListener('change', function() {
+    var textarea = document.getElementById('response_body');
+    var file = this.files[0];
+    textarea.disabled = !!file;
+    textarea.placeholder = file ? file.name + ' (' + file.size + ' bytes) will be uploaded as-is.' : '';
+});
+// Bulk import: kirim file ke /import_stubs dan tampilkan hasil per item
+document.getElementById('importForm')?.addEventListener('submit', function(e) {
+    e.preventDefault();
+    var result = document.getElementById('importResult');
+    result.className = 'mt-3 text-muted';
+    result.textContent = 'Importing...';
+
+    fetch('/import_stubs', {method: 'POST', body: new FormData(this)})
+        .then(response => response.json())
+        .then(data => {
+            result.className = 'mt-3 alert ' + (data.success ? 'alert-success' : 'alert-warning');
+            result.textContent = data.message;
+            if (data.errors && data.errors.length) {
+                var list = document.createElement('ul');
+                data.errors.slice(0, 50).forEach(function(err) {
+                    var item = document.createElement('li');
+                    item.textContent = err.item + ': ' + err.error;
+                    list.appendChild(item);
+                });
+                result.appendChild(list);
+            }
+        })
+        .catch(err => {
+            result.className = 'mt-3 alert alert-danger';
+            result.textContent = 'Import failed: ' + err;
+        });
+});
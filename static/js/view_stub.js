@@ -0,0 +1,36 @@
+// Large response bodies are previewed in part; "Load more" fetches the next byte range.
+const responseBody = document.getElementById('responseBody');
+const loadMoreBody = document.getElementById('loadMoreBody');
+const bodyProgress = document.getElementById('bodyProgress');
+
+const BODY_RANGE_BYTES = 256 * 1024;
+// One streaming decoder, so characters split between ranges are decoded whole.
+const bodyDecoder = new TextDecoder('utf-8');
+
+loadMoreBody?.addEventListener('click', function() {
+    const offset = Number(responseBody.dataset.offset);
+    const size = Number(responseBody.dataset.size);
+    const end = Math.min(offset + BODY_RANGE_BYTES, size) - 1;
+    loadMoreBody.disabled = true;
+
+    fetch(responseBody.dataset.url, {headers: {Range: `bytes=${offset}-${end}`}})
+        .then(response => {
+            if (response.status !== 206) throw new Error('HTTP ' + response.status);
+            return response.arrayBuffer();
+        })
+        .then(buffer => {
+            const next = offset + buffer.byteLength;
+            responseBody.value += bodyDecoder.decode(buffer, {stream: next < size});
+            responseBody.dataset.offset = next;
+            bodyProgress.textContent = `Showing ${next} of ${size} bytes.`;
+            if (next < size) {
+                loadMoreBody.disabled = false;
+            } else {
+                loadMoreBody.remove();
+            }
+        })
+        .catch(err => {
+            bodyProgress.textContent = 'Loading failed: ' + err.message;
+            loadMoreBody.disabled = false;
+        });
+});
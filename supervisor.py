@@ -0,0 +1,193 @@
+"""
+Supervisor daemon: owns the WireMock JVMs, their log pumps and the restart
+policy, so restarting or redeploying the web app never stalls or orphans an
+instance. The web app talks to it when SUPERVISOR_ADDRESS is set:
+
+    SUPERVISOR_AUTHKEY=<secret> SUPERVISOR_ADDRESS=127.0.0.1:5050 python supervisor.py
+    SUPERVISOR_AUTHKEY=<secret> SUPERVISOR_ADDRESS=127.0.0.1:5050 python serve.py
+"""
+import os
+import sys
+import signal
+import subprocess
+import threading
+import time
+from multiprocessing.connection import Listener
+
+from config import (SUPERVISOR_ADDRESS, SUPERVISOR_AUTHKEY, SUPERVISOR_RESTART_POLICY, SUPERVISOR_MAX_RESTARTS,
+                    SUPERVISOR_RESTART_BACKOFF_SECONDS)
+from utils.admin_client import AdminApiError
+from utils.supervisor_client import RPC_METHODS, SupervisorError, check_rpc_settings
+from utils.wiremock_manager import WiremockManager
+
+RESTART_POLICIES = ('never', 'on-failure', 'always')
+# Instances that stayed up this long get their restart budget back.
+_STABLE_SECONDS = 60
+
+
+class Supervisor:
+    """
+    Serves WiremockManager calls over multiprocessing.connection and restarts
+    instances that exit without being stopped, according to the restart policy.
+    """
+
+    def __init__(self, manager: WiremockManager, policy: str = SUPERVISOR_RESTART_POLICY,
+                 max_restarts: int = SUPERVISOR_MAX_RESTARTS,
+                 backoff: float = SUPERVISOR_RESTART_BACKOFF_SECONDS) -> None:
+        if policy not in RESTART_POLICIES:
+            raise ValueError(f"Unknown restart policy '{policy}'; use one of {', '.join(RESTART_POLICIES)}.")
+        self.manager = manager
+        self.policy = policy
+        self.max_restarts = max_restarts
+        self.backoff = backoff
+        # Ports that should be running, with their restart bookkeeping.
+        self._wanted: dict[str, dict] = {
+            port: {'restarts': 0, 'retry_at': 0.0, 'since': time.monotonic()} for port in manager.processes
+        }
+        self._lock = threading.Lock()
+
+    # RPC methods that change which instances should be running.
+
+    def start_wiremock(self, port):
+        success, message = self.manager.start_wiremock(port)
+        if success:
+            self._want(port)
+        return success, message
+
+    def stop_wiremock(self, port):
+        self._unwant(port)
+        return self.manager.stop_wiremock(port)
+
+    def start_wiremock_async(self, port):
+        self._want(port)
+        return self.manager.start_wiremock_async(port)
+
+    def stop_wiremock_async(self, port):
+        self._unwant(port)
+        return self.manager.stop_wiremock_async(port)
+
+    def has_warm_pool(self):
+        return self.manager.warm_pool is not None
+
+    def restart_policy(self):
+        with self._lock:
+            return {'policy': self.policy, 'max_restarts': self.max_restarts,
+                    'instances': {port: dict(state) for port, state in self._wanted.items()}}
+
+    def _want(self, port) -> None:
+        with self._lock:
+            self._wanted.setdefault(str(port), {'restarts': 0, 'retry_at': 0.0, 'since': time.monotonic()})
+
+    def _unwant(self, port) -> None:
+        with self._lock:
+            self._wanted.pop(str(port), None)
+
+    def _resolve(self, method: str):
+        if method not in RPC_METHODS:
+            raise ValueError(f"Method '{method}' is not available over RPC.")
+        target = self if hasattr(self, method) and '.' not in method else self.manager
+        for part in method.split('.'):
+            target = getattr(target, part)
+        return target
+
+    def _serve_connection(self, conn) -> None:
+        with conn:
+            while True:
+                try:
+                    method, args, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = ('ok', self._resolve(method)(*args, **kwargs))
+                except AdminApiError as e:
+                    reply = ('error', ('AdminApiError', str(e), e.status))
+                except Exception as e:
+                    reply = ('error', (type(e).__name__, str(e), None))
+                try:
+                    conn.send(reply)
+                except (OSError, ValueError):
+                    return
+
+    def _watch(self) -> None:
+        while True:
+            time.sleep(1)
+            with self._lock:
+                ports = list(self._wanted)
+            for port in ports:
+                self._check(port)
+
+    def _check(self, port: str) -> None:
+        # Probe the process outside the lock, then update the port's bookkeeping under it.
+        now = time.monotonic()
+        running = self.manager.is_running(port)
+        busy = not running and bool(self.manager.jobs.active(port))
+        process = self.manager.processes.get(port)
+        returncode = process.returncode if isinstance(process, subprocess.Popen) else None
+
+        with self._lock:
+            state = self._wanted.get(port)
+            if state is None:
+                return  # Stopped (or stopped and restarted) through the RPC meanwhile.
+            if running:
+                if now - state['since'] > _STABLE_SECONDS:
+                    state['restarts'] = 0
+                return
+            if busy:
+                return  # A start or stop is still in progress.
+            if self.policy == 'never' or (self.policy == 'on-failure' and returncode == 0):
+                del self._wanted[port]
+                return
+            if state['restarts'] >= self.max_restarts:
+                print(f"[supervisor] port {port} exited {state['restarts']} times; giving up")
+                del self._wanted[port]
+                return
+            if now < state['retry_at']:
+                return
+            state['restarts'] += 1
+            # Exponential backoff between attempts.
+            state['retry_at'] = now + self.backoff * 2 ** state['restarts']
+            state['since'] = now
+            print(f"[supervisor] port {port} exited (code {returncode}); restart #{state['restarts']}")
+            # Submitted under the lock, so a stop that unwants the port either comes first
+            # (and this returns above) or is queued behind this start.
+            self.manager.start_wiremock_async(port)
+
+    def serve_forever(self, address) -> None:
+        """
+        Accepts RPC connections until the process is stopped; one thread per connection.
+        """
+        threading.Thread(target=self._watch, daemon=True).start()
+        if isinstance(address, str) and os.path.exists(address) and os.name != 'nt':
+            os.remove(address)  # Stale socket from a previous run.
+        with Listener(address, authkey=SUPERVISOR_AUTHKEY) as listener:
+            if isinstance(address, str) and os.name != 'nt':
+                os.chmod(address, 0o600)  # Only this user may connect to the socket.
+            print(f"[supervisor] listening on {address} (restart policy: {self.policy})")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # A client with the wrong authkey, or one that went away mid-handshake.
+                    print(f"[supervisor] rejected connection: {e}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+
+def main() -> None:
+    if not SUPERVISOR_ADDRESS:
+        raise SystemExit("Set SUPERVISOR_ADDRESS (host:port or a Unix socket path) first.")
+    try:
+        address = check_rpc_settings(SUPERVISOR_ADDRESS, SUPERVISOR_AUTHKEY)
+    except SupervisorError as e:
+        raise SystemExit(str(e))
+    manager = WiremockManager()
+    manager.start_warm_pool()
+    supervisor = Supervisor(manager)
+    # Exit through atexit (stops idle warm-pool JVMs). Instances run in their own session
+    # and outlive the supervisor; the next one adopts them from the PID registry.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    supervisor.serve_forever(address)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import json
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like Jetty, so the client pools connections.
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.stub.connection_opened(self.connection)
+
+    def _reply(self, status: int, payload=None) -> None:
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        payload = json.loads(raw) if raw else None
+        status, data = self.server.stub.handle(self.command, self.path, payload)
+        self._reply(status, data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+
+class AdminStub:
+    """
+    Stand-in for the WireMock admin API (/__admin) on a free loopback port.
+
+    Keeps mappings by id and a request journal (newest first, like WireMock),
+    records every call it gets and can be told to fail a given method and path
+    or to drop its open connections, so pooled client connections go stale.
+    Batches in arrivals are logged one per journal read, as if traffic came in
+    while a collector pages through the journal.
+    """
+
+    def __init__(self) -> None:
+        self.mappings: dict[str, dict] = {}
+        self.journal: list[dict] = []
+        self.arrivals: list[list[dict]] = []
+        self.calls: list[tuple[str, str, object]] = []
+        self.failures: dict[tuple[str, str], int] = {}
+        self.connections = 0
+        self._sockets = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.drop_connections()
+
+    def connection_opened(self, sock) -> None:
+        with self._lock:
+            self.connections += 1
+            self._sockets.append(sock)
+
+    def drop_connections(self) -> None:
+        """
+        Closes every open connection from the server side, as an idle timeout would.
+        """
+        with self._lock:
+            sockets, self._sockets = self._sockets, []
+        for sock in sockets:
+            try:
+                sock.shutdown(2)
+                sock.close()
+            except OSError:
+                pass
+
+    def fail(self, method: str, path: str, status: int = 500) -> None:
+        """
+        Answers the next method and path with an error status.
+        """
+        self.failures[(method, path)] = status
+
+    def paths(self, method: str | None = None) -> list[str]:
+        return [path for call_method, path, _ in self.calls if method in (None, call_method)]
+
+    def handle(self, method: str, path: str, payload) -> tuple[int, object]:
+        with self._lock:
+            self.calls.append((method, path, payload))
+            status = self.failures.pop((method, path), None)
+            if status is not None:
+                return status, {'errors': [{'title': 'Stand-in failure'}]}
+            route = urlsplit(path)
+            parts = route.path.strip('/').split('/')
+
+            if parts[:2] == ['__admin', 'mappings']:
+                if len(parts) == 2 and method == 'POST':
+                    self.mappings[payload['id']] = payload
+                    return 201, payload
+                if parts[2:] == ['reset'] and method == 'POST':
+                    return 200, None
+                if len(parts) == 3 and method in ('PUT', 'DELETE'):
+                    if parts[2] not in self.mappings:
+                        return 404, None
+                    if method == 'PUT':
+                        self.mappings[parts[2]] = payload
+                        return 200, payload
+                    del self.mappings[parts[2]]
+                    return 200, None
+
+            if parts == ['__admin', 'requests']:
+                if method == 'GET':
+                    query = parse_qs(route.query)
+                    limit = int(query.get('limit', [len(self.journal)])[0])
+                    events = self.journal
+                    if 'since' in query:
+                        since = datetime.strptime(query['since'][0], '%Y-%m-%dT%H:%M:%S.%fZ')
+                        since_ms = since.replace(tzinfo=timezone.utc).timestamp() * 1000
+                        events = [event for event in events if event['request']['loggedDate'] > since_ms]
+                    data = {'requests': events[:limit], 'meta': {'total': len(self.journal)}}
+                    if self.arrivals:
+                        self.journal[:0] = self.arrivals.pop(0)
+                    return 200, data
+                if method == 'DELETE':
+                    self.journal.clear()
+                    return 200, None
+
+            if parts == ['__admin', 'health']:
+                return 200, {'status': 'healthy'}
+            return 404, None
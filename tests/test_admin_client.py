@@ -0,0 +1,169 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+import routes.stubs
+import utils.stub_search
+from routes.dashboard import dash_bp
+from routes.stubs import stubs_bp
+from tests.admin_stub import AdminStub
+from utils.admin_client import AdminApiError, WiremockAdminClient
+from utils.stub_index import StubIndex
+from utils.stub_search import StubSearch
+
+PORT = '8080'
+
+
+class _Manager:
+    """
+    The parts of WiremockManager the stub routes use, pointed at a stand-in admin API.
+    """
+
+    def __init__(self, admin_stub: AdminStub, running: bool = True) -> None:
+        self.admin = WiremockAdminClient(host='127.0.0.1', timeout=2)
+        self.admin_port = admin_stub.port
+        self.running = running
+
+    def is_running(self, port) -> bool:
+        return self.running
+
+    def served_port(self, port) -> int:
+        return self.admin_port
+
+    def mapping_for_push(self, port, mapping: dict) -> dict:
+        return mapping
+
+    def reload_mappings(self, port) -> None:
+        self.admin.reset_mappings(self.admin_port)
+
+
+class WiremockAdminClientTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.stub = AdminStub()
+        self.addCleanup(self.stub.close)
+        self.client = WiremockAdminClient(host='127.0.0.1', timeout=2)
+
+    def test_create_update_delete(self) -> None:
+        mapping = {'id': 'a1', 'request': {'method': 'GET', 'urlPath': '/a'}, 'response': {'status': 200}}
+        self.client.create_mapping(self.stub.port, mapping)
+        self.assertEqual(self.stub.mappings['a1'], mapping)
+
+        updated = dict(mapping, response={'status': 204})
+        self.client.update_mapping(self.stub.port, 'a1', updated)
+        self.assertEqual(self.stub.mappings['a1']['response'], {'status': 204})
+
+        self.client.delete_mapping(self.stub.port, 'a1')
+        self.assertEqual(self.stub.mappings, {})
+        with self.assertRaises(AdminApiError) as raised:
+            self.client.delete_mapping(self.stub.port, 'a1')
+        self.assertEqual(raised.exception.status, 404)
+        # Every call went over the one pooled keep-alive connection.
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_stale_pooled_connection_is_retried(self) -> None:
+        self.client.create_mapping(self.stub.port, {'id': 'a1', 'request': {}, 'response': {}})
+        self.stub.drop_connections()
+
+        self.client.update_mapping(self.stub.port, 'a1', {'id': 'a1', 'request': {}, 'response': {'status': 201}})
+        self.assertEqual(self.stub.mappings['a1']['response'], {'status': 201})
+        self.assertEqual(self.stub.paths('PUT'), ['/__admin/mappings/a1'])
+        self.assertEqual(self.stub.connections, 2)
+
+    def test_stopped_instance_is_unreachable(self) -> None:
+        self.stub.close()
+        with self.assertRaises(AdminApiError) as raised:
+            self.client.create_mapping(self.stub.port, {'id': 'a1'})
+        self.assertIsNone(raised.exception.status)
+
+
+class StubRoutesPushTest(unittest.TestCase):
+    """
+    add_stub and delete_stub write the mapping files and push them to a running instance.
+    """
+
+    def setUp(self) -> None:
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        cwd = os.getcwd()
+        os.chdir(self.tmp)
+        self.addCleanup(os.chdir, cwd)
+
+        self.stub = AdminStub()
+        self.addCleanup(self.stub.close)
+        self.manager = _Manager(self.stub)
+        search = StubSearch(os.path.join(self.tmp, 'stub_search.db'), recheck_seconds=0)
+        for target, name, value in ((routes.stubs, 'get_wiremock_manager', lambda: self.manager),
+                                    (routes.stubs, 'stub_index', StubIndex()),
+                                    (utils.stub_search, '_stub_search', search)):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        app = Flask(__name__)
+        app.secret_key = 'test'
+        app.register_blueprint(stubs_bp)
+        app.register_blueprint(dash_bp)
+        self.http = app.test_client()
+        with self.http.session_transaction() as session:
+            session['current_port'] = PORT
+
+    def add_stub(self, name: str = 'orders', body: dict | None = None) -> dict:
+        self.http.post('/add_stub', data={
+            'method': 'GET', 'url': '/orders', 'body': '',
+            'response_body': json.dumps(body or {'ok': True}), 'response_file': name,
+        })
+        with open(f"wiremock_instances/{PORT}/mappings/{name}-req.json") as f:
+            return json.load(f)
+
+    def flashes(self) -> list[tuple[str, str]]:
+        with self.http.session_transaction() as session:
+            return session.pop('_flashes', [])
+
+    def test_add_creates_mapping_on_running_instance(self) -> None:
+        mapping = self.add_stub()
+        self.assertEqual(self.stub.mappings, {mapping['id']: mapping})
+        self.assertEqual(self.stub.paths(), ['/__admin/mappings'])
+
+    def test_update_of_mapping_unknown_to_instance_falls_back_to_create(self) -> None:
+        first = self.add_stub()
+        self.stub.mappings.clear()  # E.g. the instance was restarted from older files.
+
+        mapping = self.add_stub(body={'ok': False})
+        self.assertEqual(mapping['id'], first['id'])
+        self.assertEqual(self.stub.paths()[1:], [f"/__admin/mappings/{mapping['id']}", '/__admin/mappings'])
+        self.assertEqual(self.stub.mappings, {mapping['id']: mapping})
+
+    def test_failed_push_keeps_the_file(self) -> None:
+        first = self.add_stub()
+        self.flashes()
+        self.stub.fail('PUT', f"/__admin/mappings/{first['id']}")
+
+        mapping = self.add_stub(body={'ok': False})
+        self.assertNotEqual(mapping['response']['bodyFileName'], first['response']['bodyFileName'])
+        self.assertEqual(self.stub.mappings, {first['id']: first})
+        self.assertIn('warning', [category for category, _ in self.flashes()])
+
+    def test_stopped_instance_only_writes_files(self) -> None:
+        self.manager.running = False
+        mapping = self.add_stub()
+        self.assertTrue(os.path.exists(f"wiremock_instances/{PORT}/__files/{mapping['response']['bodyFileName']}"))
+
+        self.http.get('/delete_stub/orders-req.json')
+        self.assertFalse(os.path.exists(f"wiremock_instances/{PORT}/mappings/orders-req.json"))
+        self.assertEqual(self.stub.calls, [])
+
+    def test_delete_removes_mapping_from_running_instance(self) -> None:
+        mapping = self.add_stub()
+        self.http.get('/delete_stub/orders-req.json')
+        self.assertFalse(os.path.exists(f"wiremock_instances/{PORT}/mappings/orders-req.json"))
+        self.assertEqual(self.stub.paths('DELETE'), [f"/__admin/mappings/{mapping['id']}"])
+        self.assertEqual(self.stub.mappings, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests.admin_stub import AdminStub
+from utils.admin_client import AdminApiError, WiremockAdminClient
+from utils.journal_collector import JournalCollector, UNMATCHED_KEY
+
+PORT = '8080'
+
+
+class _Manager:
+    def __init__(self, admin_stub: AdminStub) -> None:
+        self.admin = WiremockAdminClient(host='127.0.0.1', timeout=2)
+        self.admin_port = admin_stub.port
+        self.processes = {}
+
+    def served_port(self, port) -> int:
+        return self.admin_port
+
+
+def _event(event_id: str, logged_ms: int, stub_id: str | None = 's1', latency: int = 3) -> dict:
+    return {
+        'id': event_id,
+        'request': {'method': 'GET', 'url': '/orders', 'loggedDate': logged_ms},
+        'stubMapping': {'id': stub_id, 'request': {'method': 'GET', 'urlPath': '/orders'}} if stub_id else None,
+        'wasMatched': stub_id is not None,
+        'timing': {'totalTime': latency},
+    }
+
+
+class JournalCollectorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        cwd = os.getcwd()
+        os.chdir(self.tmp)
+        self.addCleanup(os.chdir, cwd)
+        os.makedirs(f"wiremock_instances/{PORT}")
+
+        self.stub = AdminStub()
+        self.addCleanup(self.stub.close)
+        self.manager = _Manager(self.stub)
+        self.collector = JournalCollector(self.manager, interval=0, page_size=2, max_pages=3)
+
+    def log(self, *events: dict) -> None:
+        # WireMock lists the newest entry first.
+        self.stub.journal[:0] = sorted(events, key=lambda event: event['request']['loggedDate'], reverse=True)
+
+    def test_collect_folds_and_resets_the_journal(self) -> None:
+        self.log(_event('a', 1000), _event('b', 1001, latency=40), _event('c', 1002, stub_id=None))
+        self.collector = JournalCollector(self.manager, interval=0)
+
+        self.assertEqual(self.collector.collect(PORT), 3)
+        summary = self.collector.summary(PORT)
+        self.assertEqual(summary['total_requests'], 3)
+        self.assertEqual(summary['stubs']['s1']['hits'], 2)
+        self.assertEqual(summary['stubs']['s1']['latency_ms_max'], 40)
+        self.assertEqual(summary['stubs'][UNMATCHED_KEY]['hits'], 1)
+        self.assertEqual(self.stub.journal, [])
+        self.assertEqual(self.stub.paths('DELETE'), ['/__admin/requests'])
+
+    def test_pages_follow_traffic_logged_during_the_round(self) -> None:
+        self.log(_event('a', 1000), _event('b', 1001))
+        self.stub.arrivals = [[_event('d', 1003), _event('c', 1002)], [_event('e', 1004)]]
+
+        self.assertEqual(self.collector.collect(PORT), 5)
+        self.assertEqual(self.stub.paths('GET'), [
+            '/__admin/requests?limit=2',
+            '/__admin/requests?limit=2&since=1970-01-01T00:00:01.000Z',
+            '/__admin/requests?limit=2&since=1970-01-01T00:00:01.002Z',
+        ])
+        summary = self.collector.summary(PORT)
+        self.assertEqual(summary['total_requests'], 5)
+        self.assertEqual(summary['dropped_requests'], 0)
+        self.assertEqual(self.stub.journal, [])
+
+    def test_round_stops_after_max_pages(self) -> None:
+        self.log(_event('a', 1000), _event('b', 1001))
+        self.stub.arrivals = [[_event(str(i), 1002 + i)] for i in range(5)]
+
+        self.assertEqual(self.collector.collect(PORT), 4)
+        self.assertEqual(len(self.stub.paths('GET')), 3)
+        self.assertEqual(self.collector.summary(PORT)['total_requests'], 4)
+
+    def test_entries_older_than_a_full_first_page_are_counted_as_dropped(self) -> None:
+        self.log(*(_event(str(i), 1000 + i) for i in range(6)))
+
+        self.assertEqual(self.collector.collect(PORT), 2)
+        summary = self.collector.summary(PORT)
+        self.assertEqual(summary['total_requests'], 2)
+        self.assertEqual(summary['dropped_requests'], 4)
+        self.assertEqual(self.stub.journal, [])
+
+    def test_failed_reset_does_not_count_entries_twice(self) -> None:
+        self.log(_event('a', 1000), _event('b', 1001))
+        self.stub.fail('DELETE', '/__admin/requests')
+        with self.assertRaises(AdminApiError):
+            self.collector.collect(PORT)
+        self.assertEqual(len(self.stub.journal), 2)
+
+        # Logged in the same millisecond as the newest entry already folded, and later.
+        self.log(_event('c', 1001), _event('d', 1002))
+        self.assertEqual(self.collector.collect(PORT), 2)
+        summary = self.collector.summary(PORT)
+        self.assertEqual(summary['total_requests'], 4)
+        self.assertEqual(summary['stubs']['s1']['hits'], 4)
+        self.assertEqual(self.stub.journal, [])
+
+    def test_empty_journal_is_not_reset(self) -> None:
+        self.assertEqual(self.collector.collect(PORT), 0)
+        self.assertEqual(self.stub.paths('DELETE'), [])
+        self.assertEqual(self.collector.summary(PORT)['total_requests'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import io
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from utils.stub_import import StubImport
+
+PORT = '8080'
+
+
+def _mapping(i: int) -> dict:
+    return {'id': f'id-{i}', 'request': {'method': 'GET', 'urlPath': f'/orders/{i}'}, 'response': {'status': 200}}
+
+
+class StubImportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        cwd = os.getcwd()
+        os.chdir(self.tmp)
+        self.addCleanup(os.chdir, cwd)
+
+    def mappings(self) -> list[str]:
+        mappings_dir = f"wiremock_instances/{PORT}/mappings"
+        return sorted(os.listdir(mappings_dir)) if os.path.isdir(mappings_dir) else []
+
+    def test_invalid_items_are_skipped(self) -> None:
+        importer = StubImport(PORT)
+        importer.import_json(io.BytesIO(json.dumps([_mapping(0), {'request': {}}, _mapping(2)]).encode()))
+        importer.commit()
+
+        self.assertFalse(importer.rejected)
+        self.assertEqual([error['item'] for error in importer.errors], ['item 1'])
+        self.assertEqual(len(self.mappings()), 2)
+
+    def test_truncated_json_rejects_the_batch(self) -> None:
+        document = json.dumps([_mapping(i) for i in range(5)]).encode()
+        importer = StubImport(PORT)
+        importer.import_json(io.BytesIO(document[:len(document) * 2 // 3]))
+        importer.commit()
+
+        self.assertTrue(importer.rejected)
+        self.assertEqual(importer.imported, [])
+        self.assertEqual(self.mappings(), [])
+        self.assertFalse(os.path.exists(importer.staging_dir))
+
+    def test_malformed_zip_member_rejects_the_batch(self) -> None:
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('mappings/a-req.json', json.dumps(_mapping(0)))
+            archive.writestr('__files/a-res.json', '{"ok": true}')
+            archive.writestr('mappings/b-req.json', '{"request": {"method": ')
+        buffer.seek(0)
+        importer = StubImport(PORT)
+        importer.import_zip(buffer)
+        importer.commit()
+
+        self.assertTrue(importer.rejected)
+        self.assertEqual([error['item'] for error in importer.errors], ['mappings/b-req.json'])
+        self.assertEqual(self.mappings(), [])
+        self.assertFalse(os.path.exists(f"wiremock_instances/{PORT}/__files/a-res.json"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import json
+import queue
+import threading
+from datetime import datetime, timezone
+from http.client import HTTPConnection, HTTPException
+
+from config import WIREMOCK_ADMIN_HOST, WIREMOCK_ADMIN_TIMEOUT, WIREMOCK_ADMIN_POOL_SIZE
+
+
+class AdminApiError(Exception):
+    """
+    Raised when a WireMock admin API call fails or returns an error status.
+    """
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class WiremockAdminClient:
+    """
+    Small HTTP client for the WireMock admin API (/__admin) that keeps a pool of
+    keep-alive connections per instance port.
+    """
+
+    def __init__(self, host: str = WIREMOCK_ADMIN_HOST, timeout: float = WIREMOCK_ADMIN_TIMEOUT,
+                 pool_size: int = WIREMOCK_ADMIN_POOL_SIZE) -> None:
+        self.host = host
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._pools: dict[str, queue.LifoQueue] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, port: str | int) -> queue.LifoQueue:
+        port_str = str(port)
+        with self._lock:
+            pool = self._pools.get(port_str)
+            if pool is None:
+                pool = self._pools[port_str] = queue.LifoQueue(self.pool_size)
+            return pool
+
+    def _release(self, pool: queue.LifoQueue, conn: HTTPConnection) -> None:
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self, port: str | int) -> None:
+        """
+        Closes all pooled connections to an instance, e.g. after it was stopped.
+
+        Args:
+            port: The port of the WireMock instance.
+        """
+        pool = self._pool(port)
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def request(self, port: str | int, method: str, path: str, payload=None) -> tuple[int, object]:
+        """
+        Sends a request to the admin API of a WireMock instance.
+
+        Args:
+            port: The port of the WireMock instance.
+            method: The HTTP method.
+            path: The path, starting with /__admin.
+            payload: An optional JSON-serializable request body.
+
+        Returns:
+            A tuple of the HTTP status and the decoded JSON response (None if empty).
+
+        Raises:
+            AdminApiError: If the instance can't be reached or answers with an error status.
+        """
+        pool = self._pool(port)
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+
+        for attempt in range(2):
+            try:
+                conn, reused = pool.get_nowait(), True
+            except queue.Empty:
+                conn, reused = HTTPConnection(self.host, int(port), timeout=self.timeout), False
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                raw = response.read()
+            except (OSError, HTTPException) as e:
+                conn.close()
+                if reused and attempt == 0:
+                    # The pooled connection went stale (server closed it); retry on a fresh one.
+                    continue
+                raise AdminApiError(f"Admin API on port {port} unreachable: {e}") from e
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(pool, conn)
+            break
+
+        try:
+            data = json.loads(raw) if raw else None
+        except ValueError:
+            data = raw.decode(errors='replace')
+        if response.status >= 400:
+            raise AdminApiError(f"{method} {path} returned HTTP {response.status}", response.status)
+        return response.status, data
+
+    def create_mapping(self, port: str | int, mapping: dict) -> None:
+        self.request(port, 'POST', '/__admin/mappings', mapping)
+
+    def update_mapping(self, port: str | int, mapping_id: str, mapping: dict) -> None:
+        self.request(port, 'PUT', f'/__admin/mappings/{mapping_id}', mapping)
+
+    def delete_mapping(self, port: str | int, mapping_id: str) -> None:
+        self.request(port, 'DELETE', f'/__admin/mappings/{mapping_id}')
+
+    def reset_mappings(self, port: str | int) -> None:
+        """
+        Makes the instance reload its mappings from the files on disk.
+
+        Args:
+            port: The port of the WireMock instance.
+        """
+        self.request(port, 'POST', '/__admin/mappings/reset')
+
+    def list_requests(self, port: str | int, limit: int,
+                      since_ms: int | float | None = None) -> tuple[list[dict], int | None]:
+        """
+        Returns the newest entries of the request journal, newest first.
+
+        Args:
+            port: The port of the WireMock instance.
+            limit: The maximum number of entries to return.
+            since_ms: Only return entries logged after this time (epoch milliseconds).
+
+        Returns:
+            A tuple of the journal entries and the total journal size reported by WireMock.
+        """
+        path = f'/__admin/requests?limit={int(limit)}'
+        if since_ms is not None:
+            since = datetime.fromtimestamp(since_ms / 1000, timezone.utc)
+            path += f"&since={since.strftime('%Y-%m-%dT%H:%M:%S.')}{since.microsecond // 1000:03d}Z"
+        _, data = self.request(port, 'GET', path)
+        data = data if isinstance(data, dict) else {}
+        return data.get('requests') or [], (data.get('meta') or {}).get('total')
+
+    def reset_requests(self, port: str | int) -> None:
+        """
+        Empties the request journal in one call.
+
+        Args:
+            port: The port of the WireMock instance.
+        """
+        self.request(port, 'DELETE', '/__admin/requests')
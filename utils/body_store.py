@@ -0,0 +1,338 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from config import BODY_STORE_GC_GRACE_SECONDS
+from utils.pid_registry import _locked
+
+# Blobs live in __files/<CAS_DIR>/<first two hex digits>/<sha256><extension>.
+CAS_DIR = '_cas'
+# Reference counts per blob, kept in the instance folder (not served, not exported).
+BODY_REFS_FILE = 'body_refs.json'
+
+
+def is_cas_name(body_file_name: str | None) -> bool:
+    """
+    Tells whether a bodyFileName points into the content-addressed store.
+    """
+    return bool(body_file_name) and body_file_name.startswith(CAS_DIR + '/')
+
+
+def cas_name(data: bytes, extension: str = '.json') -> str:
+    """
+    Returns the bodyFileName (relative to __files) a body is stored under.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{CAS_DIR}/{digest[:2]}/{digest}{extension}"
+
+
+class BodyStore:
+    """
+    Content-addressed response bodies for one instance, under __files/_cas.
+
+    Identical bodies are written once and shared by every mapping that uses
+    them; mappings keep plain bodyFileName references, so WireMock serves them
+    as usual. Reference counts are kept in body_refs.json under a file lock and
+    a blob is deleted when its last reference is released. Counts that drift
+    (hand-edited mappings, imports overwriting stubs) are fixed by gc(), which
+    recounts from the mapping files.
+    """
+
+    # Per-port locks for the threads of this process; the file lock covers other workers.
+    _locks: dict[str, threading.Lock] = {}
+    _locks_lock = threading.Lock()
+
+    def __init__(self, port: str | int) -> None:
+        self.port = str(port)
+        self.instance_dir = f"wiremock_instances/{self.port}"
+        self.files_dir = os.path.join(self.instance_dir, '__files')
+        self.refs_path = os.path.join(self.instance_dir, BODY_REFS_FILE)
+        self.lock_path = self.refs_path + '.lock'
+        with self._locks_lock:
+            self._lock = self._locks.setdefault(self.port, threading.Lock())
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.files_dir, *name.split('/'))
+
+    def _load_refs(self) -> dict[str, int]:
+        try:
+            with open(self.refs_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_refs(self, refs: dict[str, int]) -> None:
+        tmp_path = f"{self.refs_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(refs, f, sort_keys=True)
+        os.replace(tmp_path, self.refs_path)
+
+    def _update(self, fn):
+        os.makedirs(self.instance_dir, exist_ok=True)
+        with self._lock, _locked(self.lock_path):
+            refs = self._load_refs()
+            result = fn(refs)
+            self._save_refs(refs)
+            return result
+
+    def _write_blob(self, name: str, data: bytes) -> None:
+        path = self.path(name)
+        if os.path.exists(path):
+            os.utime(path)  # Restarts gc's grace period for a blob that is being reused.
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def put(self, data: bytes, extension: str = '.json') -> str:
+        """
+        Stores a body (if it isn't stored yet) and takes a reference to it.
+
+        Args:
+            data: The body bytes, stored as-is.
+            extension: File extension of the blob; WireMock guesses nothing from it.
+
+        Returns:
+            The bodyFileName to put in the mapping.
+        """
+        name = cas_name(data, extension)
+
+        def put(refs):
+            self._write_blob(name, data)
+            refs[name] = refs.get(name, 0) + 1
+        self._update(put)
+        return name
+
+    def staging_path(self) -> str:
+        """
+        Returns a fresh temporary path next to the blobs, for bodies streamed in by put_file().
+        """
+        cas_root = os.path.join(self.files_dir, CAS_DIR)
+        os.makedirs(cas_root, exist_ok=True)
+        return os.path.join(cas_root, f".upload-{os.getpid()}-{threading.get_ident()}-{time.time_ns()}.tmp")
+
+    def put_file(self, tmp_path: str, digest: str, extension: str = '.json') -> str:
+        """
+        Moves a body that was already written to disk into the store and takes a reference to it.
+
+        Args:
+            tmp_path: The body file, from staging_path(); it is moved or deleted.
+            digest: Hex SHA-256 of the file's bytes.
+            extension: File extension of the blob.
+
+        Returns:
+            The bodyFileName to put in the mapping.
+        """
+        name = f"{CAS_DIR}/{digest[:2]}/{digest}{extension}"
+
+        def put(refs):
+            path = self.path(name)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            refs[name] = refs.get(name, 0) + 1
+        self._update(put)
+        return name
+
+    def add_refs(self, names: list[str]) -> None:
+        """
+        Takes references to blobs that were moved into place directly (e.g. by an import).
+        """
+        names = [name for name in names if is_cas_name(name)]
+        if not names:
+            return
+
+        def add(refs):
+            for name in names:
+                refs[name] = refs.get(name, 0) + 1
+        self._update(add)
+
+    def release(self, name: str) -> bool:
+        """
+        Drops one reference to a blob and deletes the blob with its last reference.
+
+        Returns:
+            True if the blob was deleted.
+        """
+        def release(refs):
+            count = refs.get(name, 0) - 1
+            if count > 0:
+                refs[name] = count
+                return False
+            refs.pop(name, None)
+            try:
+                os.remove(self.path(name))
+                return True
+            except FileNotFoundError:
+                return False
+        return self._update(release)
+
+    def refs(self, name: str) -> int:
+        """
+        Returns how many mappings reference a blob, as far as the counts know.
+        """
+        return self._load_refs().get(name, 0)
+
+    def _mapping_bodies(self) -> dict[str, str | None]:
+        # Mapping file -> bodyFileName, read straight from disk.
+        bodies = {}
+        mappings_dir = os.path.join(self.instance_dir, 'mappings')
+        if not os.path.isdir(mappings_dir):
+            return bodies
+        for filename in sorted(os.listdir(mappings_dir)):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(mappings_dir, filename)) as f:
+                    mapping = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(mapping, dict) and isinstance(mapping.get('response'), dict):
+                bodies[filename] = mapping['response'].get('bodyFileName')
+        return bodies
+
+    def _blobs(self) -> list[str]:
+        cas_root = os.path.join(self.files_dir, CAS_DIR)
+        blobs = []
+        if os.path.isdir(cas_root):
+            for shard in sorted(os.listdir(cas_root)):
+                shard_dir = os.path.join(cas_root, shard)
+                if os.path.isdir(shard_dir):
+                    blobs += [f"{CAS_DIR}/{shard}/{name}" for name in sorted(os.listdir(shard_dir))
+                              if not name.endswith('.tmp')]
+        return blobs
+
+    def gc(self, grace_seconds: float = BODY_STORE_GC_GRACE_SECONDS) -> dict:
+        """
+        Recounts references from the mapping files and deletes unreferenced blobs.
+
+        Blobs younger than grace_seconds are kept, so a body stored by a request
+        that hasn't written its mapping yet survives a concurrent collection.
+
+        Returns:
+            The number of referenced and removed blobs and the bytes freed.
+        """
+        def collect(refs):
+            counts: dict[str, int] = {}
+            for body_file in self._mapping_bodies().values():
+                if is_cas_name(body_file):
+                    counts[body_file] = counts.get(body_file, 0) + 1
+            removed, freed, now = 0, 0, time.time()
+            for name in self._blobs():
+                if name in counts:
+                    continue
+                path = self.path(name)
+                try:
+                    stat = os.stat(path)
+                    if now - stat.st_mtime < grace_seconds:
+                        counts[name] = refs.get(name, 0)
+                        continue
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                removed += 1
+                freed += stat.st_size
+            # Uploads abandoned by a crashed request.
+            cas_root = os.path.join(self.files_dir, CAS_DIR)
+            for name in os.listdir(cas_root) if os.path.isdir(cas_root) else ():
+                path = os.path.join(cas_root, name)
+                try:
+                    stat = os.stat(path)
+                    if not name.endswith('.tmp') or now - stat.st_mtime < grace_seconds:
+                        continue
+                    os.remove(path)
+                except OSError:
+                    continue
+                removed += 1
+                freed += stat.st_size
+            refs.clear()
+            refs.update({name: count for name, count in counts.items() if count > 0})
+            return {'referenced': len(refs), 'removed': removed, 'freed_bytes': freed}
+        return self._update(collect)
+
+    def migrate(self) -> dict:
+        """
+        Moves the bodies of existing mappings into the store.
+
+        Every mapping whose bodyFileName is outside the store is rewritten to
+        point at the blob with the same bytes; the old body files are deleted
+        once no mapping references them any more. Running instances must reload
+        their mappings afterwards.
+
+        Returns:
+            The number of mappings migrated, blobs stored and old files removed.
+        """
+        mappings_dir = os.path.join(self.instance_dir, 'mappings')
+        bodies = self._mapping_bodies()
+        migrated, blobs, legacy = 0, set(), set()
+        for filename, body_file in bodies.items():
+            if not body_file or is_cas_name(body_file):
+                continue
+            source = os.path.abspath(self.path(body_file))
+            if os.path.commonpath([os.path.abspath(self.files_dir), source]) != os.path.abspath(self.files_dir):
+                continue  # Never follow a bodyFileName out of __files.
+            try:
+                with open(source, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue
+            name = self.put(data, os.path.splitext(body_file)[1] or '.json')
+            mapping_path = os.path.join(mappings_dir, filename)
+            with open(mapping_path) as f:
+                mapping = json.load(f)
+            mapping['response']['bodyFileName'] = name
+            tmp_path = f"{mapping_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(mapping, f, indent=2)
+            os.replace(tmp_path, mapping_path)
+            bodies[filename] = name
+            migrated += 1
+            blobs.add(name)
+            legacy.add(body_file)
+
+        still_used = set(bodies.values())
+        removed = 0
+        for body_file in legacy - still_used:
+            try:
+                os.remove(self.path(body_file))
+                removed += 1
+            except OSError:
+                pass
+        return {'migrated': migrated, 'blobs': len(blobs), 'removed_files': removed}
+
+
+def _instance_ports() -> list[str]:
+    root = 'wiremock_instances'
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if name.isdigit())
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the content-addressed response body store.")
+    parser.add_argument('command', choices=('migrate', 'gc'),
+                        help="migrate: move existing bodies into the store; gc: delete unreferenced blobs")
+    parser.add_argument('ports', nargs='*', help="instance ports (default: every instance folder)")
+    parser.add_argument('--grace', type=float, default=BODY_STORE_GC_GRACE_SECONDS,
+                        help="gc keeps blobs younger than this many seconds")
+    args = parser.parse_args()
+
+    for port in args.ports or _instance_ports():
+        store = BodyStore(port)
+        if args.command == 'migrate':
+            result = store.migrate()
+            result.update(store.gc(args.grace))
+        else:
+            result = store.gc(args.grace)
+        print(f"{port}: {json.dumps(result)}")
+    if args.command == 'migrate':
+        print("Reload or restart running instances so they pick up the rewritten mappings.")
@@ -0,0 +1,137 @@
+import os
+import hashlib
+import mimetypes
+
+from config import BODY_UPLOAD_CHUNK_BYTES
+from utils.body_store import BodyStore
+from utils.json_stream import validate_document
+
+# Leading bytes of binary formats; these win over whatever the client declared.
+_MAGIC = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'%PDF-', 'application/pdf'),
+    (b'PK\x03\x04', 'application/zip'),
+    (b'\x1f\x8b', 'application/gzip'),
+)
+# Enough of the body to sniff its type.
+_HEAD_BYTES = 512
+_GENERIC_TYPES = ('', 'application/octet-stream', 'binary/octet-stream')
+_EXTENSIONS = {'application/json': '.json', 'text/plain': '.txt', 'application/octet-stream': '.bin'}
+
+
+def detect_content_type(head: bytes, filename: str | None = None, declared: str | None = None) -> str:
+    """
+    Guesses the Content-Type of a body from its first bytes.
+
+    Magic numbers decide first, then a specific type declared by the client,
+    then the file name; otherwise the bytes are sniffed as JSON, XML, HTML or
+    plain text and anything that isn't UTF-8 is application/octet-stream.
+    """
+    for magic, content_type in _MAGIC:
+        if head.startswith(magic):
+            return content_type
+    declared = (declared or '').split(';')[0].strip().lower()
+    if declared not in _GENERIC_TYPES:
+        return declared
+    guessed = mimetypes.guess_type(filename or '')[0]
+    if guessed:
+        return guessed
+
+    try:
+        # The head may end in the middle of a multi-byte character.
+        text = head.decode('utf-8-sig', errors='strict' if len(head) < _HEAD_BYTES else 'ignore')
+    except UnicodeDecodeError:
+        return 'application/octet-stream'
+    if '\x00' in text:
+        return 'application/octet-stream'
+    text = text.lstrip().lower()
+    if text.startswith(('{', '[')):
+        return 'application/json'
+    if text.startswith('<?xml'):
+        return 'application/xml'
+    if text.startswith(('<!doctype html', '<html')):
+        return 'text/html'
+    return 'text/plain'
+
+
+def extension_for(content_type: str) -> str:
+    """
+    Returns the file extension a body of this Content-Type is stored with.
+    """
+    content_type = content_type.split(';')[0].strip().lower()
+    return _EXTENSIONS.get(content_type) or mimetypes.guess_extension(content_type) or '.bin'
+
+
+def is_text_type(content_type: str) -> bool:
+    """
+    Tells whether a body of this Content-Type can be previewed as text.
+    """
+    content_type = content_type.split(';')[0].strip().lower()
+    return (content_type.startswith('text/') or content_type.endswith(('/json', '+json', '/xml', '+xml'))
+            or content_type == 'application/javascript')
+
+
+class _TeeReader:
+    """
+    Read-through wrapper that copies every chunk to a file and hashes it on the way.
+    """
+
+    def __init__(self, source, sink) -> None:
+        self.source = source
+        self.sink = sink
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.head = b''
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.source.read(size if size and size > 0 else BODY_UPLOAD_CHUNK_BYTES)
+        if chunk:
+            self.sink.write(chunk)
+            self.sha256.update(chunk)
+            self.size += len(chunk)
+            if len(self.head) < _HEAD_BYTES:
+                self.head += chunk[:_HEAD_BYTES - len(self.head)]
+        return chunk
+
+
+def store_upload(port: str | int, stream, filename: str | None = None, declared_type: str | None = None,
+                 content_type: str | None = None, validate_json: bool = False) -> dict:
+    """
+    Streams an uploaded response body into the body store, chunk by chunk.
+
+    The bytes are kept exactly as uploaded. With validate_json the body is
+    parsed while it is copied, without holding the whole document in memory.
+
+    Args:
+        port: The instance the body belongs to.
+        stream: A binary file object with the body.
+        filename: Client-side file name, used to guess the type.
+        declared_type: Content-Type the client sent with the file.
+        content_type: Explicit Content-Type; skips detection.
+        validate_json: Reject the body unless it is one well-formed JSON document.
+
+    Returns:
+        The bodyFileName ('name'), the Content-Type and the size in bytes.
+
+    Raises:
+        ValueError: If validate_json is set and the body isn't valid JSON.
+    """
+    store = BodyStore(port)
+    tmp_path = store.staging_path()
+    try:
+        with open(tmp_path, 'wb') as sink:
+            tee = _TeeReader(stream, sink)
+            if validate_json:
+                validate_document(tee, BODY_UPLOAD_CHUNK_BYTES)
+            while tee.read(BODY_UPLOAD_CHUNK_BYTES):
+                pass
+        content_type = content_type or detect_content_type(tee.head, filename, declared_type)
+        name = store.put_file(tmp_path, tee.sha256.hexdigest(), extension_for(content_type))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return {'name': name, 'content_type': content_type, 'size': tee.size}
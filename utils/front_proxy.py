@@ -0,0 +1,568 @@
+"""
+Single-port HTTP/1.1 reverse proxy in front of the managed WireMock instances.
+
+A request is routed to the instance named by the first label of its Host
+header ("8080.mocks.local") or, failing that, by its first path segment,
+which is stripped before forwarding ("/8080/api/orders" -> "/api/orders").
+Upstream connections are kept alive and pooled per instance.
+
+Runs next to the web app when PROXY_PORT is set, or on its own:
+
+    PROXY_PORT=8000 python -m utils.front_proxy
+"""
+import json
+import time
+import asyncio
+import threading
+
+from config import (PROXY_HOST, PROXY_PORT, PROXY_BACKLOG, PROXY_UPSTREAM_POOL_SIZE,
+                    PROXY_UPSTREAM_MAX_CONNECTIONS, PROXY_UPSTREAM_TIMEOUT_SECONDS, PROXY_CLIENT_IDLE_SECONDS,
+                    PROXY_ROUTE_TTL_SECONDS, WIREMOCK_ADMIN_HOST)
+from utils.request_metrics import LATENCY_BUCKETS, Histogram
+from utils.wiremock_manager import get_wiremock_manager
+
+# Headers that apply to a single connection and are never forwarded.
+_HOP_BY_HOP = frozenset({b'connection', b'keep-alive', b'proxy-connection', b'proxy-authenticate',
+                         b'proxy-authorization', b'te', b'trailer', b'upgrade', b'expect'})
+_MAX_HEAD_BYTES = 64 * 1024
+_COPY_BYTES = 64 * 1024
+_REASONS = {400: b'Bad Request', 404: b'Not Found', 502: b'Bad Gateway', 503: b'Service Unavailable',
+            504: b'Gateway Timeout'}
+# Seconds over which requests_per_second is measured.
+_RATE_WINDOW = 10
+
+
+class ProxyError(Exception):
+    """
+    A request the proxy answers itself, with an HTTP error status.
+    """
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_head(reader: asyncio.StreamReader) -> tuple[bytes, list[tuple[bytes, bytes]]] | None:
+    # Returns None when the peer closed the connection between messages.
+    while True:
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise ValueError('Connection closed mid-header.') from e
+            return None
+        except asyncio.LimitOverrunError as e:
+            raise ValueError('Header section too large.') from e
+        head = head.lstrip(b'\r\n')
+        if head:
+            break
+    lines = head[:-4].split(b'\r\n')
+    headers = []
+    for line in lines[1:]:
+        name, sep, value = line.partition(b':')
+        if not sep or not name.strip():
+            raise ValueError('Malformed header line.')
+        headers.append((name.strip(), value.strip()))
+    return lines[0], headers
+
+
+def _header(headers: list[tuple[bytes, bytes]], name: bytes) -> bytes | None:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _framing(headers: list[tuple[bytes, bytes]]) -> tuple[str, int]:
+    """
+    Returns how a message body is delimited: ('chunked', 0), ('length', n) or ('none', 0).
+    """
+    transfer_encoding = _header(headers, b'transfer-encoding')
+    if transfer_encoding is not None and b'chunked' in transfer_encoding.lower():
+        return 'chunked', 0
+    content_length = _header(headers, b'content-length')
+    if content_length is None:
+        return 'none', 0
+    length = int(content_length)
+    if length < 0:
+        raise ValueError('Negative Content-Length.')
+    return 'length', length
+
+
+def _connection_tokens(headers: list[tuple[bytes, bytes]]) -> set[bytes]:
+    value = _header(headers, b'connection') or b''
+    return {token.strip().lower() for token in value.split(b',') if token.strip()}
+
+
+def _forwardable(headers: list[tuple[bytes, bytes]]) -> list[tuple[bytes, bytes]]:
+    dropped = _HOP_BY_HOP | _connection_tokens(headers)
+    return [(key, value) for key, value in headers if key.lower() not in dropped]
+
+
+def _serialize(first_line: bytes, headers: list[tuple[bytes, bytes]]) -> bytes:
+    return first_line + b'\r\n' + b''.join(key + b': ' + value + b'\r\n' for key, value in headers) + b'\r\n'
+
+
+def _error_response(status: int, message: str) -> bytes:
+    body = json.dumps({'success': False, 'message': message}).encode()
+    return _serialize(b'HTTP/1.1 %d %s' % (status, _REASONS[status]),
+                      [(b'Content-Type', b'application/json'), (b'Content-Length', b'%d' % len(body)),
+                       (b'Connection', b'close')]) + body
+
+
+async def _copy_length(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, length: int) -> int:
+    remaining = length
+    while remaining > 0:
+        data = await reader.read(min(remaining, _COPY_BYTES))
+        if not data:
+            raise ConnectionError('Connection closed mid-body.')
+        writer.write(data)
+        remaining -= len(data)
+        await writer.drain()
+    return length
+
+
+async def _copy_chunked(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, dechunk: bool = False) -> int:
+    """
+    Copies a chunked body. With dechunk, only the chunk data is written (for HTTP/1.0 clients).
+    """
+    total = 0
+    while True:
+        line = await reader.readuntil(b'\r\n')
+        try:
+            size = int(line.split(b';', 1)[0].strip(), 16)
+        except ValueError as e:
+            raise ConnectionError('Malformed chunk size.') from e
+        if not dechunk:
+            writer.write(line)
+        if size == 0:
+            while True:  # Trailers, up to the closing empty line.
+                line = await reader.readuntil(b'\r\n')
+                if not dechunk:
+                    writer.write(line)
+                if line == b'\r\n':
+                    await writer.drain()
+                    return total
+        if dechunk:
+            await _copy_length(reader, writer, size)
+            await reader.readexactly(2)
+        else:
+            await _copy_length(reader, writer, size + 2)
+        total += size
+
+
+async def _copy_until_eof(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> int:
+    total = 0
+    while data := await reader.read(_COPY_BYTES):
+        writer.write(data)
+        total += len(data)
+        await writer.drain()
+    return total
+
+
+class _Upstream:
+    """
+    Keep-alive connections to one WireMock instance.
+    """
+
+    def __init__(self, port: int) -> None:
+        self.port = port
+        self.idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.slots = asyncio.Semaphore(PROXY_UPSTREAM_MAX_CONNECTIONS)
+        self.connects = 0
+        self.reuses = 0
+
+    async def connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if reader.at_eof() or writer.is_closing():
+                writer.close()
+                continue
+            self.reuses += 1
+            return reader, writer, True
+        reader, writer = await asyncio.open_connection(WIREMOCK_ADMIN_HOST, self.port, limit=_MAX_HEAD_BYTES)
+        self.connects += 1
+        return reader, writer, False
+
+    def release(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, reusable: bool) -> None:
+        if reusable and len(self.idle) < PROXY_UPSTREAM_POOL_SIZE and not reader.at_eof():
+            self.idle.append((reader, writer))
+        else:
+            writer.close()
+
+
+class FrontProxy:
+    """
+    asyncio reverse proxy routing one listening port to every running instance.
+
+    Port lookups go through the manager (or the supervisor client) in a thread
+    and are cached for PROXY_ROUTE_TTL_SECONDS. Per-route request counts,
+    latency and bytes are kept for /metrics and /proxy/metrics.
+    """
+
+    def __init__(self, host: str = PROXY_HOST, port: int = PROXY_PORT) -> None:
+        self.host = host
+        self.port = port
+        self._upstreams: dict[int, _Upstream] = {}
+        self._routes: dict[str, tuple[int | None, float]] = {}
+        self._lookups: dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = {}
+        self.client_connections = 0
+        self.started_at = None
+
+    # Routing.
+
+    @staticmethod
+    def route(headers: list[tuple[bytes, bytes]], target: bytes) -> tuple[str, bytes, bytes]:
+        """
+        Picks the instance port for a request.
+
+        Returns:
+            The instance port, the target to forward and the stripped path prefix.
+
+        Raises:
+            ProxyError: If neither the Host header nor the path names a port.
+        """
+        hostname = (_header(headers, b'host') or b'').split(b':', 1)[0]
+        label = hostname.split(b'.', 1)[0]
+        # "8080.mocks.local" names a port; "127.0.0.1" doesn't.
+        if label.isdigit() and not hostname.replace(b'.', b'').isdigit():
+            port, forwarded, prefix = label, target, b''
+        else:
+            segment, _, rest = target[1:].partition(b'/') if target.startswith(b'/') else (b'', b'', b'')
+            segment, query_sep, query = segment.partition(b'?')
+            if not segment.isdigit():
+                raise ProxyError(404, "Name the instance in the Host header (<port>.host) or the path (/<port>/...).")
+            port, prefix = segment, b'/' + segment
+            forwarded = b'/' + rest + (query_sep + query if query_sep else b'')
+        if not 0 < int(port) < 65536:
+            raise ProxyError(404, f"Invalid port {port.decode()}.")
+        return port.decode(), forwarded, prefix
+
+    @staticmethod
+    def _lookup(port: str) -> int | None:
+        manager = get_wiremock_manager()
+        try:
+            return manager.served_port(port) if manager.is_running(port) else None
+        except Exception as e:  # E.g. the supervisor is unreachable.
+            raise ProxyError(502, f"Can't look up port {port}: {e}") from e
+
+    async def _resolve(self, port: str) -> int | None:
+        cached = self._routes.get(port)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        pending = self._lookups.get(port)
+        if pending is None:
+            # One lookup per port at a time; concurrent requests share its result.
+            pending = self._lookups[port] = asyncio.ensure_future(
+                asyncio.get_running_loop().run_in_executor(None, self._lookup, port))
+            try:
+                served_port = await pending
+            finally:
+                del self._lookups[port]
+            self._routes[port] = (served_port, time.monotonic() + PROXY_ROUTE_TTL_SECONDS)
+            return served_port
+        return await asyncio.shield(pending)
+
+    def _upstream(self, served_port: int) -> _Upstream:
+        upstream = self._upstreams.get(served_port)
+        if upstream is None:
+            upstream = self._upstreams[served_port] = _Upstream(served_port)
+        return upstream
+
+    # Connections.
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info('peername')
+        client_ip = peer[0].encode() if peer else b''
+        with self._lock:
+            self.client_connections += 1
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(_read_head(reader), PROXY_CLIENT_IDLE_SECONDS)
+                except asyncio.TimeoutError:
+                    break
+                except ValueError as e:
+                    writer.write(_error_response(400, str(e)))
+                    await writer.drain()
+                    break
+                if head is None or not await self._exchange(head, reader, writer, client_ip):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass  # Either side went away mid-message; nothing left to answer.
+        finally:
+            with self._lock:
+                self.client_connections -= 1
+            writer.close()
+
+    async def _exchange(self, head: tuple[bytes, list[tuple[bytes, bytes]]], reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter, client_ip: bytes) -> bool:
+        """
+        Proxies one request and its response.
+
+        Returns:
+            Whether the client connection can carry another request.
+        """
+        started = time.perf_counter()
+        request_line, headers = head
+        route = 'unmatched'
+        try:
+            parts = request_line.split(b' ')
+            if len(parts) != 3 or not parts[2].startswith(b'HTTP/1.'):
+                raise ProxyError(400, 'Malformed request line.')
+            method, target, version = parts
+            try:
+                framing, length = _framing(headers)
+            except ValueError:
+                raise ProxyError(400, 'Invalid Content-Length.')
+            route, forwarded, prefix = self.route(headers, target)
+            served_port = await self._resolve(route)
+            if served_port is None:
+                raise ProxyError(503, f"WireMock on port {route} is not running.")
+            if (_header(headers, b'expect') or b'').lower() == b'100-continue':
+                writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+
+            forwarded_headers = _forwardable(headers)
+            # Transfer-Encoding overrides Content-Length (RFC 9112 6.3): never forward both.
+            smuggled_length = framing == 'chunked' and _header(headers, b'content-length') is not None
+            if smuggled_length:
+                forwarded_headers = [(key, value) for key, value in forwarded_headers
+                                     if key.lower() != b'content-length']
+            forwarded_for = _header(headers, b'x-forwarded-for')
+            forwarded_headers = [(key, value) for key, value in forwarded_headers
+                                 if key.lower() not in (b'x-forwarded-for', b'x-forwarded-prefix')]
+            forwarded_headers.append((b'X-Forwarded-For', forwarded_for + b', ' + client_ip if forwarded_for
+                                      else client_ip))
+            if prefix:
+                forwarded_headers.append((b'X-Forwarded-Prefix', prefix))
+            request_head = _serialize(b'%s %s HTTP/1.1' % (method, forwarded), forwarded_headers)
+
+            keep_alive = (b'close' not in _connection_tokens(headers) if version == b'HTTP/1.1'
+                          else b'keep-alive' in _connection_tokens(headers))
+            # A request with both headers may be aimed at desyncing the connection; close it after.
+            keep_alive = keep_alive and not smuggled_length
+            upstream = self._upstream(served_port)
+            async with upstream.slots:
+                status, sent, keep_alive = await self._relay(upstream, request_head, method, reader, writer,
+                                                             framing, length, version, keep_alive)
+        except ProxyError as e:
+            writer.write(_error_response(e.status, str(e)))
+            await writer.drain()
+            self._record(route, e.status, 0, time.perf_counter() - started)
+            return False
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self._record(route, 502, 0, time.perf_counter() - started)
+            raise
+        self._record(route, status, sent, time.perf_counter() - started)
+        return keep_alive
+
+    async def _relay(self, upstream: _Upstream, request_head: bytes, method: bytes,
+                     client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter,
+                     framing: str, length: int, client_version: bytes, keep_alive: bool) -> tuple[int, int, bool]:
+        for attempt in range(2):
+            try:
+                reader, writer, reused = await asyncio.wait_for(upstream.connect(), PROXY_UPSTREAM_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                raise ProxyError(504, f"Timed out connecting to port {upstream.port}.")
+            except OSError as e:
+                raise ProxyError(502, f"Can't reach port {upstream.port}: {e}")
+            try:
+                writer.write(request_head)
+                if framing == 'length':
+                    await _copy_length(client_reader, writer, length)
+                elif framing == 'chunked':
+                    await _copy_chunked(client_reader, writer)
+                else:
+                    await writer.drain()
+                response = await asyncio.wait_for(self._read_response_head(reader), PROXY_UPSTREAM_TIMEOUT_SECONDS)
+                break
+            except asyncio.TimeoutError:
+                writer.close()
+                raise ProxyError(504, f"Port {upstream.port} didn't answer in time.")
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+                writer.close()
+                # A pooled connection the instance closed meanwhile: retry once, if the body allows.
+                if reused and framing == 'none' and attempt == 0:
+                    continue
+                raise ProxyError(502, f"Bad response from port {upstream.port}: {e}")
+
+        status_line, headers, status = response
+        if method == b'HEAD' or status in (204, 304):
+            response_framing, response_length = 'none', 0
+        else:
+            try:
+                response_framing, response_length = _framing(headers)
+            except ValueError:
+                writer.close()
+                raise ProxyError(502, f"Invalid Content-Length from port {upstream.port}.")
+            if response_framing == 'none':
+                response_framing = 'close'  # Delimited by the instance closing the connection.
+        reusable = (status_line.startswith(b'HTTP/1.1') and b'close' not in _connection_tokens(headers)
+                    and response_framing != 'close')
+        dechunk = response_framing == 'chunked' and client_version != b'HTTP/1.1'
+        keep_alive = keep_alive and response_framing != 'close' and not dechunk
+
+        response_headers = _forwardable(headers)
+        if dechunk:
+            response_headers = [(key, value) for key, value in response_headers
+                                if key.lower() != b'transfer-encoding']
+        if not keep_alive:
+            response_headers.append((b'Connection', b'close'))
+        elif client_version != b'HTTP/1.1':
+            response_headers.append((b'Connection', b'keep-alive'))
+        client_writer.write(_serialize(status_line, response_headers))
+        try:
+            if response_framing == 'length':
+                sent = await _copy_length(reader, client_writer, response_length)
+            elif response_framing == 'chunked':
+                sent = await _copy_chunked(reader, client_writer, dechunk)
+            elif response_framing == 'close':
+                sent = await _copy_until_eof(reader, client_writer)
+            else:
+                sent = 0
+                await client_writer.drain()
+        except BaseException:
+            writer.close()
+            raise
+        upstream.release(reader, writer, reusable)
+        return status, sent, keep_alive
+
+    @staticmethod
+    async def _read_response_head(reader: asyncio.StreamReader) -> tuple[bytes, list[tuple[bytes, bytes]], int]:
+        while True:
+            head = await _read_head(reader)
+            if head is None:
+                raise ConnectionError('Connection closed before the response.')
+            status_line, headers = head
+            parts = status_line.split(b' ', 2)
+            if len(parts) < 2 or not parts[1].isdigit():
+                raise ValueError('Malformed status line.')
+            status = int(parts[1])
+            # Interim responses (e.g. 100 Continue) are dropped; the client got its own.
+            if not 100 <= status < 200:
+                return status_line, headers, status
+
+    # Metrics.
+
+    def _record(self, route: str, status: int, sent: int, elapsed: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats.get(route)
+            if stats is None:
+                stats = self._stats[route] = {'latency': Histogram(), 'responses': {}, 'bytes_sent': 0,
+                                              'window_started': now, 'window_requests': 0, 'rate': 0.0}
+            stats['latency'].observe(elapsed)
+            stats['responses'][status] = stats['responses'].get(status, 0) + 1
+            stats['bytes_sent'] += sent
+            stats['window_requests'] += 1
+            if now - stats['window_started'] >= _RATE_WINDOW:
+                stats['rate'] = stats['window_requests'] / (now - stats['window_started'])
+                stats['window_started'], stats['window_requests'] = now, 0
+
+    def route_stats(self) -> dict[str, dict]:
+        """
+        Returns a copy of the per-route counters and latency histograms.
+        """
+        with self._lock:
+            routes = {}
+            for route, stats in self._stats.items():
+                histogram = Histogram()
+                histogram.buckets = list(stats['latency'].buckets)
+                histogram.total, histogram.count = stats['latency'].total, stats['latency'].count
+                routes[route] = {**stats, 'latency': histogram, 'responses': dict(stats['responses'])}
+            return routes
+
+    def stats(self) -> dict:
+        """
+        Returns per-route throughput and latency, plus connection counts.
+        """
+        now = time.monotonic()
+        routes = {}
+        for route, stats in self.route_stats().items():
+            histogram = stats['latency']
+            elapsed = now - stats['window_started']
+            # The last full window, or the current one once it is long enough to be meaningful.
+            rate = stats['window_requests'] / elapsed if elapsed >= _RATE_WINDOW else stats['rate']
+            routes[route] = {
+                'requests': histogram.count,
+                'responses': {str(status): count for status, count in sorted(stats['responses'].items())},
+                'bytes_sent': stats['bytes_sent'],
+                'requests_per_second': round(rate, 2),
+                'latency_ms': {
+                    'avg': round(histogram.total / histogram.count * 1000, 3) if histogram.count else None,
+                    **{f'p{q}': _quantile_ms(histogram, q / 100) for q in (50, 95, 99)},
+                },
+            }
+        upstreams = {str(port): {'idle': len(upstream.idle), 'connects': upstream.connects,
+                                 'reuses': upstream.reuses}
+                     for port, upstream in list(self._upstreams.items())}
+        return {'host': self.host, 'port': self.port, 'client_connections': self.client_connections,
+                'uptime': round(time.time() - self.started_at, 1) if self.started_at else None,
+                'routes': routes, 'upstreams': upstreams}
+
+    # Lifecycle.
+
+    async def serve(self) -> None:
+        """
+        Listens on host:port and proxies until cancelled.
+        """
+        server = await asyncio.start_server(self._handle_client, self.host, self.port,
+                                            limit=_MAX_HEAD_BYTES, backlog=PROXY_BACKLOG)
+        self.started_at = time.time()
+        async with server:
+            await server.serve_forever()
+
+    def start(self) -> None:
+        """
+        Runs the proxy on its own event loop in a daemon thread.
+        """
+        threading.Thread(target=asyncio.run, args=(self.serve(),), name='front-proxy', daemon=True).start()
+
+
+def _quantile_ms(histogram: Histogram, q: float) -> float | None:
+    # Upper bound of the bucket holding the quantile; None past the last bucket.
+    if not histogram.count:
+        return None
+    cumulative = 0
+    for bound, bucket in zip(LATENCY_BUCKETS, histogram.buckets):
+        cumulative += bucket
+        if cumulative >= q * histogram.count:
+            return bound * 1000
+    return None
+
+
+_front_proxy: FrontProxy | None = None
+
+
+def start_front_proxy(host: str = PROXY_HOST, port: int = PROXY_PORT) -> FrontProxy:
+    """
+    Starts the process-wide front proxy in the background (once).
+    """
+    global _front_proxy
+    if _front_proxy is None:
+        _front_proxy = FrontProxy(host, port)
+        _front_proxy.start()
+    return _front_proxy
+
+
+def get_front_proxy() -> FrontProxy | None:
+    """
+    Returns the running front proxy, or None if it wasn't started in this process.
+    """
+    return _front_proxy
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Front proxy for the managed WireMock instances.")
+    parser.add_argument('--host', default=PROXY_HOST)
+    parser.add_argument('--port', type=int, default=PROXY_PORT or 8000)
+    args = parser.parse_args()
+    print(f"Front proxy listening on http://{args.host}:{args.port} (/<port>/... or <port>.<host>)")
+    try:
+        asyncio.run(FrontProxy(args.host, args.port).serve())
+    except KeyboardInterrupt:
+        pass
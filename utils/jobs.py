@@ -0,0 +1,148 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from config import JOB_WORKERS, JOB_HISTORY, JOB_SIDE_WORKERS, READINESS_POLL_INTERVAL_SECONDS
+
+ACTIVE_STATES = ('pending', 'running')
+# Kinds that change an instance's process; at most one of them is active per port.
+LIFECYCLE_KINDS = ('start', 'stop')
+
+
+class JobRegistry:
+    """
+    Runs slow instance operations (start, stop, ...) on a background thread pool
+    and keeps their status so request handlers can return immediately and the UI
+    can poll for the outcome.
+
+    Start and stop of a port run one after the other on their own threads: a
+    repeated request returns the job in progress, while the opposite one (a stop
+    sent during a start that is still waiting for readiness) is queued behind it
+    rather than dropped. Other kinds (e.g. benchmarks) are deduplicated per port
+    and kind and run on separate threads, so a long benchmark never blocks or
+    delays starting and stopping.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, history: int = JOB_HISTORY, store=None,
+                 side_workers: int = JOB_SIDE_WORKERS) -> None:
+        self.history = history
+        # Optional shared store (see utils.state_store) so other workers see these jobs.
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='wiremock-job')
+        self._side_executor = ThreadPoolExecutor(max_workers=side_workers, thread_name_prefix='wiremock-side-job')
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+        # Jobs waiting for a job of this process to finish, by the id of that job.
+        self._followers: dict[str, list[tuple[dict, Callable]]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, port: str | int, fn: Callable[[], tuple[bool, str]]) -> dict:
+        """
+        Schedules an operation for a port, unless the same operation is already in progress.
+
+        A start or stop that follows an active start or stop of the other kind is
+        queued and runs once that one has finished. Other kinds are only
+        deduplicated against a job of the same kind.
+
+        Args:
+            kind: A short label such as "start" or "stop".
+            port: The port of the WireMock instance.
+            fn: The operation; it returns a (success, message) tuple like the manager methods.
+
+        Returns:
+            A snapshot of the new job, or of the same operation already in progress.
+        """
+        port_str = str(port)
+        kinds = LIFECYCLE_KINDS if kind in LIFECYCLE_KINDS else (kind,)
+        with self._lock:
+            blocker = self._active(port_str, kinds)
+            if blocker is not None and blocker['kind'] == kind:
+                return dict(blocker)
+            job = {
+                'id': uuid.uuid4().hex,
+                'kind': kind,
+                'port': port_str,
+                'state': 'pending',
+                'message': f"{kind.capitalize()} of port {port_str} is queued.",
+                'created_at': time.time(),
+                'finished_at': None,
+            }
+            if self.store is not None:
+                active = self.store.claim(job, kinds)
+                if active is not None and active['kind'] == kind:
+                    return active
+                blocker = blocker or active
+            if blocker is not None:
+                job['message'] = f"{kind.capitalize()} of port {port_str} is queued behind the {blocker['kind']}."
+            local_blocker = (blocker is not None and blocker['id'] in self._jobs
+                             and self._jobs[blocker['id']]['state'] in ACTIVE_STATES)
+            if local_blocker:
+                self._followers.setdefault(blocker['id'], []).append((job, fn))
+            self._jobs[job['id']] = job
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs.values()))
+                if oldest['state'] in ACTIVE_STATES:
+                    break
+                self._jobs.popitem(last=False)
+            snapshot = dict(job)
+
+        if self.store is not None:
+            self.store.prune()
+        if not local_blocker:
+            executor = self._executor if kind in LIFECYCLE_KINDS else self._side_executor
+            executor.submit(self._run, job, fn, blocker['id'] if blocker else None)
+        return snapshot
+
+    def _wait_for_store(self, job_id: str) -> None:
+        # The job we queue behind belongs to another worker process; poll the shared store.
+        while self.store.is_active(job_id):
+            time.sleep(READINESS_POLL_INTERVAL_SECONDS)
+
+    def _run(self, job: dict, fn: Callable[[], tuple[bool, str]], after: str | None = None) -> None:
+        if after is not None:
+            self._wait_for_store(after)
+        with self._lock:
+            job['state'] = 'running'
+            snapshot = dict(job)
+        if self.store is not None:
+            self.store.put(snapshot)
+        try:
+            success, message = fn()
+        except Exception as e:
+            success, message = False, f"{job['kind'].capitalize()} of port {job['port']} failed: {e}"
+        with self._lock:
+            job['state'] = 'succeeded' if success else 'failed'
+            job['message'] = message
+            job['finished_at'] = time.time()
+            snapshot = dict(job)
+            followers = self._followers.pop(job['id'], [])
+        if self.store is not None:
+            self.store.put(snapshot)
+        for follower, follower_fn in followers:
+            self._executor.submit(self._run, follower, follower_fn)
+
+    def _active(self, port_str: str, kinds: tuple[str, ...] = LIFECYCLE_KINDS) -> dict | None:
+        for job in reversed(self._jobs.values()):
+            if job['port'] == port_str and job['kind'] in kinds and job['state'] in ACTIVE_STATES:
+                return job
+        return None
+
+    def active(self, port: str | int) -> dict | None:
+        """
+        Returns a snapshot of the start or stop in progress for a port in this process, if any.
+        """
+        with self._lock:
+            job = self._active(str(port))
+            return dict(job) if job else None
+
+    def get(self, job_id: str) -> dict | None:
+        """
+        Returns a snapshot of a job, or None if it is unknown or expired.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                return dict(job)
+        return self.store.get(job_id) if self.store is not None else None
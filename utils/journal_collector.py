@@ -0,0 +1,217 @@
+import os
+import json
+import threading
+import time
+from bisect import bisect_left
+
+from config import JOURNAL_COLLECT_SECONDS, JOURNAL_PAGE_SIZE, JOURNAL_MAX_PAGES
+from utils.admin_client import AdminApiError
+from utils.pid_registry import _locked
+
+JOURNAL_SUMMARY_FILE = "journal_summary.json"
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+UNMATCHED_KEY = "unmatched"
+
+
+def _bucket_labels() -> list[str]:
+    return [f"le_{bound}" for bound in LATENCY_BUCKETS_MS] + ["inf"]
+
+
+def _empty_summary() -> dict:
+    return {'updated_at': None, 'total_requests': 0, 'dropped_requests': 0, 'stubs': {},
+            'mark': {'logged_ms': None, 'ids': []}}
+
+
+def _logged_ms(event: dict) -> int | float | None:
+    logged = (event.get('request') or {}).get('loggedDate')
+    return logged if isinstance(logged, (int, float)) else None
+
+
+def _after_mark(event: dict, mark: dict) -> bool:
+    # Entries at or before the high-water mark were folded by an earlier round.
+    logged, mark_ms = _logged_ms(event), mark.get('logged_ms')
+    if logged is None or mark_ms is None:
+        return event.get('id') not in mark['ids']
+    return logged > mark_ms or (logged == mark_ms and event.get('id') not in mark['ids'])
+
+
+def _advance_mark(mark: dict, events: list[dict]) -> None:
+    logged = [_logged_ms(event) for event in events if _logged_ms(event) is not None]
+    if not logged:
+        return
+    newest = max(logged)
+    if mark.get('logged_ms') is None or newest > mark['logged_ms']:
+        mark['logged_ms'], mark['ids'] = newest, []
+    ids = {event.get('id') for event in events if _logged_ms(event) == newest and event.get('id')}
+    mark['ids'] = sorted(set(mark['ids']) | ids)
+
+
+class JournalCollector:
+    """
+    Drains the request journal of every running WireMock instance into a small
+    per-port summary (hit counts and latency histograms per stub), so the JVM's
+    journal stays bounded while traffic remains visible.
+
+    Off by default (JOURNAL_COLLECT_SECONDS=0): emptying the journal breaks
+    WireMock's verify and /__admin/requests for anyone relying on them.
+
+    Each round pages through the journal page_size entries at a time, asking
+    only for entries logged after the summary's high-water mark (last
+    loggedDate plus the ids logged at that instant). Every page is folded and
+    the mark advanced before the next page is fetched, so memory stays bounded
+    by one page; later pages pick up traffic logged while the round runs, up to
+    max_pages pages. The summary is then saved (temp file + rename) and the
+    journal emptied with a single reset. If the reset fails, the next round
+    sees the same entries again and skips them by the mark, so nothing is
+    counted twice.
+
+    WireMock only lists the newest entries, so when the first page is full,
+    older entries can't be reached; they are dropped and counted in
+    dropped_requests (an upper bound if an earlier reset failed). Entries
+    logged between the last page and the reset are dropped uncounted.
+    """
+
+    def __init__(self, manager, interval: float = JOURNAL_COLLECT_SECONDS,
+                 page_size: int = JOURNAL_PAGE_SIZE, max_pages: int = JOURNAL_MAX_PAGES) -> None:
+        self.manager = manager
+        self.interval = interval
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._port_locks: dict[str, threading.Lock] = {}
+        if interval > 0:
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            for port in list(self.manager.processes):
+                if not self.manager.is_running(port):
+                    continue
+                try:
+                    self.collect(port)
+                except (AdminApiError, OSError):
+                    pass  # Journal disabled or instance busy; retry next round.
+
+    def _summary_path(self, port: str) -> str:
+        return f"wiremock_instances/{port}/{JOURNAL_SUMMARY_FILE}"
+
+    def _port_lock(self, port: str) -> threading.Lock:
+        with self._lock:
+            return self._port_locks.setdefault(port, threading.Lock())
+
+    def _load(self, port: str) -> dict:
+        # Always read from disk: another worker process may have collected since.
+        try:
+            with open(self._summary_path(port), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return _empty_summary()
+
+    def _save(self, port: str, summary: dict) -> None:
+        path = self._summary_path(port)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _fold(self, summary: dict, events: list[dict]) -> None:
+        labels = _bucket_labels()
+        for event in events:
+            request = event.get('request') or {}
+            stub = event.get('stubMapping') or {}
+            matched = event.get('wasMatched', True) and (stub.get('id') or stub.get('uuid'))
+            key = matched or UNMATCHED_KEY
+            entry = summary['stubs'].get(key)
+            if entry is None:
+                entry = summary['stubs'][key] = {
+                    'name': stub.get('name'),
+                    'method': (stub.get('request') or {}).get('method'),
+                    'url': ((stub.get('request') or {}).get('urlPath')
+                            or (stub.get('request') or {}).get('url')),
+                    'hits': 0,
+                    'latency_ms_sum': 0,
+                    'latency_ms_max': 0,
+                    'histogram': dict.fromkeys(labels, 0),
+                    'last_seen': None,
+                }
+                if key == UNMATCHED_KEY:
+                    entry['url'] = None
+            entry['hits'] += 1
+            latency = (event.get('timing') or {}).get('totalTime')
+            if isinstance(latency, (int, float)):
+                entry['latency_ms_sum'] += latency
+                entry['latency_ms_max'] = max(entry['latency_ms_max'], latency)
+                entry['histogram'][labels[bisect_left(LATENCY_BUCKETS_MS, latency)]] += 1
+            logged = request.get('loggedDate')
+            if isinstance(logged, (int, float)):
+                entry['last_seen'] = max(entry['last_seen'] or 0, logged / 1000)
+            summary['total_requests'] += 1
+
+    def collect(self, port: str | int) -> int:
+        """
+        Drains the request journal of a running instance into its summary.
+
+        Args:
+            port: The port of the WireMock instance.
+
+        Returns:
+            The number of journal entries collected.
+
+        Raises:
+            AdminApiError: If the admin API call fails (e.g. the journal is disabled).
+        """
+        port_str = str(port)
+        served_port = self.manager.served_port(port_str)
+        admin = self.manager.admin
+        # The file lock keeps workers of a multi-process server from collecting the same port at once.
+        with self._port_lock(port_str), _locked(self._summary_path(port_str) + '.lock'):
+            summary = self._load(port_str)
+            mark = summary.setdefault('mark', {'logged_ms': None, 'ids': []})
+            read = collected = 0
+            for page in range(self.max_pages):
+                # One millisecond back, so entries logged in the same instant as the mark come
+                # back too; the mark's ids tell which of those were already folded.
+                since = mark['logged_ms'] - 1 if mark.get('logged_ms') is not None else None
+                events, total = admin.list_requests(served_port, self.page_size, since)
+                fresh = [event for event in events if _after_mark(event, mark)]
+                if page == 0 and len(events) == self.page_size and isinstance(total, int):
+                    # WireMock lists the newest entries first, so anything older than a full
+                    # first page is out of reach.
+                    summary['dropped_requests'] = summary.get('dropped_requests', 0) + total - len(events)
+                self._fold(summary, fresh)
+                _advance_mark(mark, events)
+                read += len(events)
+                collected += len(fresh)
+                if len(events) < self.page_size or not fresh:
+                    break
+            if not read:
+                return 0
+            summary['updated_at'] = time.time()
+            self._save(port_str, summary)
+            admin.reset_requests(served_port)
+        return collected
+
+    def summary(self, port: str | int) -> dict:
+        """
+        Returns the collected summary of a port, with average latencies filled in.
+        """
+        port_str = str(port)
+        with self._port_lock(port_str):
+            summary = self._load(port_str)
+        for entry in summary['stubs'].values():
+            entry['latency_ms_avg'] = entry['latency_ms_sum'] / entry['hits'] if entry['hits'] else None
+        summary['buckets_ms'] = list(LATENCY_BUCKETS_MS)
+        return summary
+
+    def reset(self, port: str | int) -> None:
+        """
+        Clears the collected summary of a port.
+        """
+        port_str = str(port)
+        with self._port_lock(port_str):
+            try:
+                os.remove(self._summary_path(port_str))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,165 @@
+import codecs
+import io
+import json
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _StreamReader:
+    """
+    Incremental reader over a text stream that decodes one JSON value at a time,
+    reading more input only when the current value isn't complete yet.
+    """
+
+    def __init__(self, fp, chunk_size: int) -> None:
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        # Grow reads with the buffer so a very large value is decoded in O(n).
+        chunk = self.fp.read(max(self.chunk_size, len(self.buf)))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it ('' at EOF).
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} but found {char or 'end of input'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise ValueError(f"Invalid JSON: {e.msg}") from e
+            # A number at the very end of the buffer might continue in the next chunk.
+            if end == len(self.buf) and not self.eof and isinstance(value, (int, float)) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _text_stream(fp):
+    if isinstance(fp, io.TextIOBase):
+        return fp
+    # codecs readers only need read(), unlike TextIOWrapper (spooled uploads lack readable()).
+    return codecs.getreader('utf-8-sig')(fp)
+
+
+def iter_array_items(fp, path: tuple[str, ...] = (), chunk_size: int = 64 * 1024,
+                     fallback_object: bool = False):
+    """
+    Yields the items of a JSON array one by one without loading the whole document.
+
+    Args:
+        fp: A binary or text file object.
+        path: Object keys leading from the root to the array, e.g. ('log', 'entries').
+            Members that are not on the path are skipped.
+        chunk_size: The minimum number of characters to read at once.
+        fallback_object: If the root is an object without path[0], yield that
+            object itself as the single item (e.g. a lone WireMock mapping).
+
+    Raises:
+        ValueError: If the document is malformed or the path doesn't lead to an array.
+    """
+    reader = _StreamReader(_text_stream(fp), chunk_size)
+
+    for depth, key in enumerate(path):
+        reader.expect('{')
+        collected = {} if fallback_object and depth == 0 else None
+        found = False
+        if reader.peek() == '}':
+            reader.pos += 1
+        else:
+            while True:
+                member = reader.value()
+                if not isinstance(member, str):
+                    raise ValueError("Object keys must be strings")
+                reader.expect(':')
+                if member == key:
+                    found = True
+                    break
+                member_value = reader.value()
+                if collected is not None:
+                    collected[member] = member_value
+                if reader.expect(',}') == '}':
+                    break
+        if not found:
+            if collected is not None:
+                yield collected
+                return
+            raise ValueError(f"Key {'.'.join(path[:depth + 1])!r} not found")
+
+    reader.expect('[')
+    if reader.peek() == ']':
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            return
+
+
+def validate_document(fp, chunk_size: int = 64 * 1024) -> None:
+    """
+    Checks that a stream holds exactly one JSON document without loading it whole.
+
+    The members of a top-level object or array are decoded one at a time, so
+    memory is bounded by the largest member rather than by the document.
+
+    Args:
+        fp: A binary or text file object, read to the end.
+        chunk_size: The minimum number of characters to read at once.
+
+    Raises:
+        ValueError: If the document is malformed or followed by anything but whitespace.
+    """
+    reader = _StreamReader(_text_stream(fp), chunk_size)
+
+    opening = reader.peek()
+    if opening in ('{', '['):
+        closing = '}' if opening == '{' else ']'
+        reader.pos += 1
+        if reader.peek() == closing:
+            reader.pos += 1
+        else:
+            while True:
+                if opening == '{':
+                    if not isinstance(reader.value(), str):
+                        raise ValueError("Object keys must be strings")
+                    reader.expect(':')
+                reader.value()
+                if reader.expect(',' + closing) == closing:
+                    break
+    else:
+        reader.value()
+    if reader.peek():
+        raise ValueError("Unexpected data after the JSON document")
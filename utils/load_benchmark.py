@@ -0,0 +1,262 @@
+import os
+import json
+import hashlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException
+from itertools import count
+
+from config import (WIREMOCK_ADMIN_HOST, BENCHMARK_CONCURRENCY, BENCHMARK_REQUESTS, BENCHMARK_MAX_REQUESTS,
+                    BENCHMARK_TIMEOUT_SECONDS)
+from utils.stub_index import StubIndex
+
+BENCHMARKS_DIR = "benchmarks"
+# WireMock's "match any method" has no HTTP equivalent; such stubs are hit with GET.
+_ANY_METHODS = ('ANY', '*')
+
+
+def benchmark_dir(port: str | int) -> str:
+    return f"wiremock_instances/{port}/{BENCHMARKS_DIR}"
+
+
+def stub_targets(stub_index: StubIndex, port: str | int) -> tuple[list[tuple[str, str]], str]:
+    """
+    Picks the stubs of a port that can be requested as-is.
+
+    Stubs matched by urlPattern/urlPathPattern have no concrete URL and are skipped.
+
+    Args:
+        stub_index: The index to read the port's stubs from.
+        port: The port of the WireMock instance.
+
+    Returns:
+        A tuple of (method, url) targets and a short hash identifying the stub set.
+    """
+    entries = sorted(stub_index.entries(port).values(), key=lambda entry: entry['filename'])
+    digest = hashlib.sha1()
+    targets = []
+    for entry in entries:
+        digest.update(f"{entry['filename']}:{entry['mtime']}\n".encode())
+        url = entry['url']
+        if not isinstance(url, str) or not url.startswith('/'):
+            continue
+        method = str(entry['method']).upper()
+        targets.append(('GET' if method in _ANY_METHODS else method, url))
+    return targets, digest.hexdigest()[:12]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float | None:
+    if not sorted_values:
+        return None
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_benchmark(served_port: int, targets: list[tuple[str, str]], requests: int = BENCHMARK_REQUESTS,
+                  concurrency: int = BENCHMARK_CONCURRENCY, timeout: float = BENCHMARK_TIMEOUT_SECONDS,
+                  host: str = WIREMOCK_ADMIN_HOST) -> dict:
+    """
+    Fires requests at a WireMock instance from a thread pool and measures them.
+
+    Every worker keeps one keep-alive connection and walks the targets round-robin,
+    so the numbers reflect WireMock rather than TCP connection setup.
+
+    Args:
+        served_port: The port the instance listens on.
+        targets: (method, url) pairs to request.
+        requests: The total number of requests.
+        concurrency: The number of concurrent workers.
+        timeout: The per-request socket timeout, in seconds.
+        host: The host the instance listens on.
+
+    Returns:
+        A dictionary with latency percentiles (ms), throughput, and error counts.
+    """
+    if not targets:
+        raise ValueError("No stubs with a concrete URL to benchmark.")
+    requests = max(1, min(int(requests), BENCHMARK_MAX_REQUESTS))
+    concurrency = max(1, min(int(concurrency), requests))
+    ticket = count()
+    lock = threading.Lock()
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    errors: dict[str, int] = {}
+
+    def worker() -> None:
+        conn = HTTPConnection(host, served_port, timeout=timeout)
+        own_latencies, own_statuses, own_errors = [], {}, {}
+        try:
+            while (n := next(ticket)) < requests:
+                method, url = targets[n % len(targets)]
+                started = time.perf_counter()
+                try:
+                    conn.request(method, url, body=b'' if method in ('POST', 'PUT', 'PATCH') else None)
+                    response = conn.getresponse()
+                    response.read()
+                except (OSError, HTTPException) as e:
+                    conn.close()  # Reconnects on the next request.
+                    own_errors[type(e).__name__] = own_errors.get(type(e).__name__, 0) + 1
+                    continue
+                own_latencies.append((time.perf_counter() - started) * 1000)
+                own_statuses[str(response.status)] = own_statuses.get(str(response.status), 0) + 1
+                if response.will_close:
+                    conn.close()
+        finally:
+            conn.close()
+            with lock:
+                latencies.extend(own_latencies)
+                for key, value in own_statuses.items():
+                    statuses[key] = statuses.get(key, 0) + value
+                for key, value in own_errors.items():
+                    errors[key] = errors.get(key, 0) + value
+
+    started_at = time.time()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='wiremock-bench') as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    failed = sum(errors.values()) + sum(value for key, value in statuses.items() if int(key) >= 500)
+    return {
+        'started_at': started_at,
+        'duration_seconds': round(elapsed, 3),
+        'requests': requests,
+        'concurrency': concurrency,
+        'targets': len(targets),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'latency_ms': {
+            'min': latencies[0] if latencies else None,
+            'p50': _percentile(latencies, 50),
+            'p95': _percentile(latencies, 95),
+            'p99': _percentile(latencies, 99),
+            'max': latencies[-1] if latencies else None,
+            'mean': sum(latencies) / len(latencies) if latencies else None,
+        },
+        'statuses': statuses,
+        'errors': errors,
+        'error_rate': failed / requests,
+    }
+
+
+def save_run(port: str | int, result: dict) -> dict:
+    """
+    Stores a benchmark result under wiremock_instances/<port>/benchmarks/.
+
+    Returns:
+        The result with its assigned 'id'.
+    """
+    directory = benchmark_dir(port)
+    os.makedirs(directory, exist_ok=True)
+    run_id = time.strftime('%Y%m%d-%H%M%S', time.localtime(result['started_at'])) + '-' + uuid.uuid4().hex[:6]
+    result = {'id': run_id, **result}
+    path = os.path.join(directory, f"{run_id}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(result, f, indent=2)
+    os.replace(tmp_path, path)
+    return result
+
+
+def list_runs(port: str | int) -> list[dict]:
+    """
+    Returns the stored benchmark results of a port, newest first.
+    """
+    directory = benchmark_dir(port)
+    if not os.path.isdir(directory):
+        return []
+    runs = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                runs.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return runs
+
+
+def load_run(port: str | int, run_id: str) -> dict | None:
+    """
+    Returns one stored benchmark result, or None if it doesn't exist.
+    """
+    if not run_id or os.path.basename(run_id) != run_id or run_id.startswith('.'):
+        return None
+    try:
+        with open(os.path.join(benchmark_dir(port), f"{run_id}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def compare_runs(baseline: dict, candidate: dict) -> dict:
+    """
+    Compares two benchmark results.
+
+    Returns:
+        Per-metric baseline and candidate values with the relative change in percent,
+        plus which JVM profile and stub set each run used.
+    """
+    def delta(old, new):
+        if old is None or new is None:
+            return {'baseline': old, 'candidate': new, 'change_pct': None}
+        change = (new - old) / old * 100 if old else None
+        return {'baseline': old, 'candidate': new, 'change_pct': round(change, 1) if change is not None else None}
+
+    metrics = {f"latency_{key}_ms": delta(baseline['latency_ms'].get(key), candidate['latency_ms'].get(key))
+               for key in ('p50', 'p95', 'p99', 'mean')}
+    metrics['throughput_rps'] = delta(baseline.get('throughput_rps'), candidate.get('throughput_rps'))
+    metrics['error_rate'] = delta(baseline.get('error_rate'), candidate.get('error_rate'))
+    return {
+        'baseline': baseline['id'],
+        'candidate': candidate['id'],
+        'profile': {'baseline': baseline.get('profile'), 'candidate': candidate.get('profile')},
+        'stub_set': {'baseline': baseline.get('stub_set'), 'candidate': candidate.get('stub_set')},
+        'metrics': metrics,
+    }
+
+
+def benchmark_port(manager, stub_index: StubIndex, port: str | int, requests: int = BENCHMARK_REQUESTS,
+                   concurrency: int = BENCHMARK_CONCURRENCY) -> dict:
+    """
+    Benchmarks the running instance of a port against its stubs and stores the result.
+
+    Raises:
+        ValueError: If the instance isn't running or has no stub with a concrete URL.
+    """
+    port_str = str(port)
+    if not manager.is_running(port_str):
+        raise ValueError(f"WireMock is not running on port {port_str}.")
+    targets, stub_set = stub_targets(stub_index, port_str)
+    result = run_benchmark(manager.served_port(port_str), targets, requests, concurrency)
+    result.update({'port': port_str, 'profile': manager.get_profile(port_str), 'stub_set': stub_set})
+    return save_run(port_str, result)
+
+
+if __name__ == '__main__':
+    import argparse
+    from utils.wiremock_manager import WiremockManager
+
+    parser = argparse.ArgumentParser(description="Benchmark a WireMock instance against its stubs.")
+    parser.add_argument('port', help="instance port (its stubs are read from wiremock_instances/<port>)")
+    parser.add_argument('-n', '--requests', type=int, default=BENCHMARK_REQUESTS)
+    parser.add_argument('-c', '--concurrency', type=int, default=BENCHMARK_CONCURRENCY)
+    parser.add_argument('--served-port', type=int, help="port the instance listens on, if not the instance port")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'),
+                        help="compare two stored runs instead of running a benchmark")
+    args = parser.parse_args()
+
+    if args.compare:
+        runs = [load_run(args.port, run_id) for run_id in args.compare]
+        if None in runs:
+            parser.error("unknown run id")
+        print(json.dumps(compare_runs(*runs), indent=2))
+    else:
+        targets, stub_set = stub_targets(StubIndex(), args.port)
+        result = run_benchmark(args.served_port or int(args.port), targets, args.requests, args.concurrency)
+        result.update({'port': args.port, 'profile': WiremockManager.get_profile(args.port), 'stub_set': stub_set})
+        print(json.dumps(save_run(args.port, result), indent=2))
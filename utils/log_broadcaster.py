@@ -0,0 +1,110 @@
+import threading
+from collections import deque
+from itertools import islice
+
+from config import LOG_STREAM_BUFFER_LINES
+
+
+class _PortBuffer:
+    def __init__(self, maxlen: int) -> None:
+        self.lines: deque[tuple[int, str, int, int, str]] = deque(maxlen=maxlen)
+        self.seq = 0
+        self.cond = threading.Condition()
+
+
+class LogBroadcaster:
+    """
+    Fans out log lines to live subscribers through a bounded per-port ring buffer.
+
+    Every published line gets a per-port sequence number. Subscribers only keep
+    the last sequence number they have seen, so memory stays bounded by the ring
+    size no matter how many engineers are watching the same instance.
+    """
+
+    def __init__(self, maxlen: int = LOG_STREAM_BUFFER_LINES) -> None:
+        self.maxlen = maxlen
+        self._buffers: dict[str, _PortBuffer] = {}
+        self._lock = threading.Lock()
+
+    def _buffer(self, port: str | int) -> _PortBuffer:
+        port_str = str(port)
+        with self._lock:
+            buf = self._buffers.get(port_str)
+            if buf is None:
+                buf = self._buffers[port_str] = _PortBuffer(self.maxlen)
+            return buf
+
+    def publish(self, port: str | int, line: str, file_id: int, offset: int) -> None:
+        """
+        Appends a line to the port's ring buffer and wakes up waiting subscribers.
+
+        Args:
+            port: The port of the WireMock instance.
+            line: The log line, without its trailing newline.
+            file_id: The id of the log file the line was written to.
+            offset: The byte offset in that file right after the line.
+        """
+        buf = self._buffer(port)
+        with buf.cond:
+            buf.seq += 1
+            buf.lines.append((buf.seq, f"{file_id}:{offset}", file_id, offset, line))
+            buf.cond.notify_all()
+
+    def seq_for_cursor(self, port: str | int, cursor: str | None) -> int:
+        """
+        Translates a log cursor (see WiremockManager.read_log_chunk) into a sequence number.
+
+        Args:
+            port: The port of the WireMock instance.
+            cursor: A "<file_id>:<offset>" token, or None to start from the live head.
+
+        Returns:
+            The sequence number a subscriber should wait after.
+        """
+        buf = self._buffer(port)
+        with buf.cond:
+            head = buf.seq
+            if not cursor:
+                return head
+            try:
+                file_id, offset = (int(part) for part in cursor.split(':', 1))
+            except ValueError:
+                return head
+
+            last_in_file = None
+            for seq, _, line_file_id, line_offset, _ in buf.lines:
+                if line_file_id != file_id:
+                    continue
+                if line_offset > offset:
+                    return seq - 1
+                last_in_file = seq
+            # Everything from that file was already seen; resume after it (rotation),
+            # or from the live head if the buffer never saw that file.
+            return last_in_file if last_in_file is not None else head
+
+    def wait(self, port: str | int, after_seq: int, timeout: float,
+             limit: int = 500) -> tuple[list[tuple[str, str]], int]:
+        """
+        Waits until lines newer than after_seq are available.
+
+        Args:
+            port: The port of the WireMock instance.
+            after_seq: The last sequence number the subscriber has seen.
+            timeout: How long to block, in seconds, when nothing is available.
+            limit: The maximum number of lines to return at once.
+
+        Returns:
+            A tuple of (cursor, line) pairs and the new sequence number to wait after.
+            If the subscriber fell behind the ring buffer, it resumes at the oldest line.
+        """
+        buf = self._buffer(port)
+        with buf.cond:
+            if buf.seq <= after_seq:
+                buf.cond.wait(timeout)
+            if buf.seq <= after_seq or not buf.lines:
+                return [], min(after_seq, buf.seq)
+
+            oldest = buf.lines[0][0]
+            start = max(after_seq + 1, oldest)
+            entries = list(islice(buf.lines, start - oldest, start - oldest + limit))
+        return [(cursor, line) for _, cursor, _, _, line in entries], entries[-1][0]
@@ -0,0 +1,164 @@
+import glob
+import gzip
+import os
+import shutil
+import threading
+from datetime import datetime
+
+from config import LOG_FLUSH_INTERVAL_SECONDS, LOG_FLUSH_BYTES, LOG_MAX_BYTES, LOG_BACKUP_COUNT
+
+
+def log_segments(log_file_path: str) -> list[str]:
+    """
+    Lists the rotated segments of a log file, oldest first.
+
+    Args:
+        log_file_path: The path of the active log file.
+
+    Returns:
+        The paths of rotated segments, both compressed (.gz) and not yet compressed.
+    """
+    segments = {}
+    for path in glob.glob(glob.escape(log_file_path) + '.*'):
+        stamp = path[len(log_file_path) + 1:]
+        if stamp.endswith('.tmp'):
+            continue
+        stamp = stamp.removesuffix('.gz')
+        if stamp.isdigit():
+            # Prefer the plain file while compression is still running.
+            if stamp not in segments or not path.endswith('.gz'):
+                segments[stamp] = path
+    return [segments[stamp] for stamp in sorted(segments)]
+
+
+def read_segment(path: str) -> bytes:
+    """
+    Reads a log segment, decompressing it if needed.
+
+    Args:
+        path: The path of the segment.
+
+    Returns:
+        The raw bytes of the segment.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rb') as f:
+        return f.read()
+
+
+class LogWriter:
+    """
+    Batches log lines and writes them out by time and size, rotating the file
+    once it grows past max_bytes. Rotated segments are gzipped in the background.
+    """
+
+    def __init__(self, path: str, flush_interval: float = LOG_FLUSH_INTERVAL_SECONDS,
+                 flush_bytes: int = LOG_FLUSH_BYTES, max_bytes: int = LOG_MAX_BYTES,
+                 backup_count: int = LOG_BACKUP_COUNT) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        self._pending: list[bytes] = []
+        self._pending_bytes = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._open()
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def _open(self) -> None:
+        self._file = open(self.path, 'ab')
+        st = os.fstat(self._file.fileno())
+        self.file_id = st.st_ino
+        self._offset = st.st_size
+
+    def write(self, line: str) -> tuple[int, int]:
+        """
+        Queues a line for writing.
+
+        Args:
+            line: The log line, without its trailing newline.
+
+        Returns:
+            The id of the file the line belongs to and the byte offset right after it.
+        """
+        data = (line + '\n').encode()
+        with self._cond:
+            if self.max_bytes and self._offset > 0 and self._offset + len(data) > self.max_bytes:
+                self._rotate()
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+            self._offset += len(data)
+            if self._pending_bytes >= self.flush_bytes:
+                self._flush_locked()
+            return self.file_id, self._offset
+
+    def flush(self) -> None:
+        """
+        Writes out any pending lines.
+        """
+        with self._cond:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """
+        Flushes pending lines and closes the file.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._file.close()
+            self._closed = True
+            self._cond.notify_all()
+
+    def _flush_locked(self) -> None:
+        if not self._pending or self._closed:
+            return
+        self._file.write(b''.join(self._pending))
+        self._file.flush()
+        self._pending.clear()
+        self._pending_bytes = 0
+
+    def _flush_periodically(self) -> None:
+        with self._cond:
+            while not self._closed:
+                self._cond.wait(self.flush_interval)
+                self._flush_locked()
+
+    def _rotate(self) -> None:
+        self._flush_locked()
+        self._file.close()
+        segment = f"{self.path}.{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+        try:
+            os.rename(self.path, segment)
+        except OSError:
+            # Another process holds the file open (Windows); try again on a later write.
+            self._open()
+            return
+        self._open()
+        threading.Thread(target=self._compress, args=(segment,), daemon=True).start()
+
+    def _compress(self, segment: str) -> None:
+        tmp_path = segment + '.gz.tmp'
+        try:
+            with open(segment, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, segment + '.gz')
+            os.remove(segment)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        if not self.backup_count:
+            return
+        for old in log_segments(self.path)[:-self.backup_count]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
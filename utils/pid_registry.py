@@ -0,0 +1,173 @@
+import os
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import psutil
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+# Tolerance when comparing a recorded process create-time with the live one.
+_CREATE_TIME_TOLERANCE = 0.05
+
+
+@contextmanager
+def _locked(lock_path: str):
+    """
+    Holds an exclusive, cross-process lock on lock_path for the duration of the block.
+    """
+    with open(lock_path, 'a+b') as f:
+        if os.name == 'nt':
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s; keep waiting.
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class PidRegistry:
+    """
+    Registry of the WireMock processes started by this app, keyed by port.
+
+    The in-memory copy answers reads; the JSON file is only re-read when another
+    process changed it. Changes are written to a temp file and renamed into place
+    while holding a file lock, so parallel starts in several threads or workers
+    never lose entries. Each entry records the process create-time, so a recycled
+    PID is never mistaken for the original WireMock process.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock_path = path + '.lock'
+        self._entries: dict[str, dict] = {}
+        self._stat_key: tuple[int, int, int] | None = None
+        self._lock = threading.RLock()
+        with self._lock:
+            self._reload_if_changed()
+
+    def _reload_if_changed(self) -> None:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._entries, self._stat_key = {}, None
+            return
+        # Every write renames a new file into place, so the inode changes too.
+        stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stat_key == self._stat_key:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            raw = {}
+        entries = {}
+        for port, entry in raw.items():
+            if isinstance(entry, int):
+                # Legacy format: {"<port>": <pid>}
+                entry = {'pid': entry, 'create_time': None, 'args': None, 'started_at': None}
+            if isinstance(entry, dict) and isinstance(entry.get('pid'), int):
+                entries[str(port)] = entry
+        self._entries, self._stat_key = entries, stat_key
+
+    def _write(self) -> None:
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+        st = os.stat(self.path)
+        self._stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @contextmanager
+    def _update(self):
+        with self._lock, _locked(self.lock_path):
+            self._reload_if_changed()
+            yield self._entries
+            self._write()
+
+    def entries(self) -> dict[str, dict]:
+        """
+        Returns a copy of all registry entries, keyed by port.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            return {port: dict(entry) for port, entry in self._entries.items()}
+
+    def get(self, port: str | int) -> dict | None:
+        """
+        Returns the entry of a port, or None if it isn't tracked.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            entry = self._entries.get(str(port))
+            return dict(entry) if entry else None
+
+    def add(self, port: str | int, process: psutil.Process, args: list[str] | None = None,
+            served_port: int | None = None) -> None:
+        """
+        Records a started WireMock process.
+
+        Args:
+            port: The port of the WireMock instance.
+            process: The process; its PID and create-time are recorded.
+            args: The command line the process was launched with.
+            served_port: The port the process listens on, if it isn't port (warm pool lease).
+        """
+        try:
+            create_time = process.create_time()
+        except psutil.Error:
+            create_time = None
+        with self._update() as entries:
+            entries[str(port)] = {
+                'pid': process.pid,
+                'create_time': create_time,
+                'args': args,
+                'started_at': time.time(),
+                'served_port': served_port,
+            }
+
+    def remove(self, *ports: str | int) -> None:
+        """
+        Stops tracking the given ports.
+        """
+        with self._update() as entries:
+            for port in ports:
+                entries.pop(str(port), None)
+
+    @staticmethod
+    def resolve(entry: dict) -> psutil.Process | None:
+        """
+        Returns the live process for an entry, or None if it has exited or its PID was reused.
+
+        Args:
+            entry: A registry entry.
+        """
+        try:
+            proc = psutil.Process(entry['pid'])
+            if entry.get('create_time') is not None:
+                if abs(proc.create_time() - entry['create_time']) > _CREATE_TIME_TOLERANCE:
+                    return None
+            elif entry.get('args') is None and not any('wiremock' in arg.lower() for arg in proc.cmdline()):
+                # Legacy entry without a create-time: fall back to the command line.
+                return None
+            if proc.status() == psutil.STATUS_ZOMBIE:
+                return None
+            return proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
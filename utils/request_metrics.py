@@ -0,0 +1,262 @@
+import os
+import sys
+import time
+import random
+import cProfile
+import threading
+import functools
+from bisect import bisect_left
+
+import psutil
+from flask import request, g
+
+from config import (METRICS_SLOW_REQUEST_MS, METRICS_PROFILE_SAMPLE_RATE, METRICS_PROFILE_DIR,
+                    METRICS_PROFILE_KEEP)
+
+# Upper bounds (seconds) of the request latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Audit events counted as filesystem operations (see the sys.addaudithook docs for the names).
+_FS_EVENTS = frozenset({
+    'open', 'os.listdir', 'os.scandir', 'os.remove', 'os.rename', 'os.mkdir', 'os.rmdir',
+    'os.truncate', 'os.utime', 'os.chmod', 'shutil.copyfile', 'shutil.move', 'shutil.rmtree',
+})
+_PSUTIL_FUNCTIONS = ('net_connections', 'wait_procs', 'process_iter', 'pid_exists')
+_PSUTIL_METHODS = ('create_time', 'cpu_percent', 'memory_info', 'status', 'children', 'cmdline', 'name',
+                   'is_running', 'net_connections', 'connections', 'terminate', 'kill')
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class Histogram:
+    """
+    Latency histogram over LATENCY_BUCKETS (seconds), shared with the front proxy.
+    """
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class RequestMetrics:
+    """
+    Opt-in request instrumentation for the Flask app.
+
+    Records a latency histogram per endpoint, and per request the number of
+    filesystem operations (via an audit hook) and psutil calls (via wrappers).
+    A sampled share of requests runs under cProfile; profiles of requests slower
+    than METRICS_SLOW_REQUEST_MS are kept in METRICS_PROFILE_DIR.
+
+    Streamed responses (log stream, ZIP export) are timed until their first byte.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.responses: dict[tuple[str, str, int], int] = {}
+        self.fs_ops: dict[str, int] = {}
+        self.psutil_ops: dict[str, int] = {}
+        self.slow_requests: dict[str, int] = {}
+        self.enabled = False
+
+    def init_app(self, app) -> None:
+        """
+        Installs the request hooks, the audit hook and the psutil wrappers.
+        """
+        if self.enabled:
+            return
+        self.enabled = True
+        sys.addaudithook(self._audit)
+        self._wrap_psutil()
+        app.before_request(self._before)
+        app.after_request(self._after)
+
+    def _audit(self, event: str, args) -> None:
+        # Called for every audited event in the process; keep the fast path cheap.
+        if event in _FS_EVENTS:
+            counters = getattr(self._local, 'counters', None)
+            if counters is not None:
+                counters['fs'] += 1
+
+    def _count_psutil(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            counters = getattr(self._local, 'counters', None)
+            if counters is not None:
+                counters['psutil'] += 1
+            return fn(*args, **kwargs)
+        return wrapper
+
+    def _wrap_psutil(self) -> None:
+        for name in _PSUTIL_FUNCTIONS:
+            if hasattr(psutil, name):
+                setattr(psutil, name, self._count_psutil(getattr(psutil, name)))
+        for name in _PSUTIL_METHODS:
+            if hasattr(psutil.Process, name):
+                setattr(psutil.Process, name, self._count_psutil(getattr(psutil.Process, name)))
+
+    def _before(self) -> None:
+        self._local.counters = {'fs': 0, 'psutil': 0}
+        g.metrics_profiler = None
+        if METRICS_SLOW_REQUEST_MS > 0 and random.random() < METRICS_PROFILE_SAMPLE_RATE:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                g.metrics_profiler = profiler
+            except ValueError:
+                pass  # Another profiler is already active on this thread.
+        g.metrics_started = time.perf_counter()
+
+    def _after(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        profiler = g.pop('metrics_profiler', None)
+        if profiler is not None:
+            profiler.disable()
+        counters = self._local.counters
+        self._local.counters = None
+
+        endpoint = request.endpoint or 'unmatched'
+        method = request.method
+        with self._lock:
+            histogram = self.latency.get((endpoint, method))
+            if histogram is None:
+                histogram = self.latency[(endpoint, method)] = Histogram()
+            histogram.observe(elapsed)
+            key = (endpoint, method, response.status_code)
+            self.responses[key] = self.responses.get(key, 0) + 1
+            self.fs_ops[endpoint] = self.fs_ops.get(endpoint, 0) + counters['fs']
+            self.psutil_ops[endpoint] = self.psutil_ops.get(endpoint, 0) + counters['psutil']
+            slow = METRICS_SLOW_REQUEST_MS > 0 and elapsed * 1000 >= METRICS_SLOW_REQUEST_MS
+            if slow:
+                self.slow_requests[endpoint] = self.slow_requests.get(endpoint, 0) + 1
+
+        if profiler is not None and slow:
+            self._save_profile(profiler, endpoint, elapsed)
+        return response
+
+    def _save_profile(self, profiler: cProfile.Profile, endpoint: str, elapsed: float) -> None:
+        try:
+            os.makedirs(METRICS_PROFILE_DIR, exist_ok=True)
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint.replace('.', '_')}-{int(elapsed * 1000)}ms.prof"
+            profiler.dump_stats(os.path.join(METRICS_PROFILE_DIR, name))
+            profiles = sorted(entry for entry in os.listdir(METRICS_PROFILE_DIR) if entry.endswith('.prof'))
+            for old in profiles[:-METRICS_PROFILE_KEEP] if METRICS_PROFILE_KEEP > 0 else []:
+                os.remove(os.path.join(METRICS_PROFILE_DIR, old))
+        except OSError:
+            pass  # Profiling must never break the request.
+
+    def render(self) -> list[str]:
+        """
+        Returns the request metrics in the Prometheus text format, one line per item.
+        """
+        lines = []
+        with self._lock:
+            lines += ['# HELP mockwiz_request_duration_seconds Request latency by endpoint.',
+                      '# TYPE mockwiz_request_duration_seconds histogram']
+            for (endpoint, method), histogram in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, bucket in zip(list(LATENCY_BUCKETS) + ['+Inf'], histogram.buckets):
+                    cumulative += bucket
+                    labels = _labels(endpoint=endpoint, method=method, le=bound)
+                    lines.append(f'mockwiz_request_duration_seconds_bucket{labels} {cumulative}')
+                labels = _labels(endpoint=endpoint, method=method)
+                lines.append(f'mockwiz_request_duration_seconds_sum{labels} {histogram.total}')
+                lines.append(f'mockwiz_request_duration_seconds_count{labels} {histogram.count}')
+
+            lines += ['# HELP mockwiz_responses_total Responses by endpoint and status.',
+                      '# TYPE mockwiz_responses_total counter']
+            for (endpoint, method, status), value in sorted(self.responses.items()):
+                lines.append(f'mockwiz_responses_total{_labels(endpoint=endpoint, method=method, status=status)} {value}')
+
+            for name, help_text, values in (
+                    ('mockwiz_request_fs_operations_total', 'Filesystem operations made while serving requests.',
+                     self.fs_ops),
+                    ('mockwiz_request_psutil_calls_total', 'psutil calls made while serving requests.',
+                     self.psutil_ops),
+                    ('mockwiz_slow_requests_total', 'Requests slower than METRICS_SLOW_REQUEST_MS.',
+                     self.slow_requests)):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for endpoint, value in sorted(values.items()):
+                    lines.append(f'{name}{_labels(endpoint=endpoint)} {value}')
+        return lines
+
+
+def render_instance_metrics(manager) -> list[str]:
+    """
+    Returns the process stats of every WireMock instance in the Prometheus text format.
+    """
+    snapshot = manager.status_monitor.snapshot()
+    gauges = (
+        ('mockwiz_instance_up', 'Whether the WireMock process is running.', 'running'),
+        ('mockwiz_instance_uptime_seconds', 'Seconds since the WireMock process started.', 'uptime'),
+        ('mockwiz_instance_rss_bytes', 'Resident memory of the WireMock process.', 'rss'),
+        ('mockwiz_instance_cpu_percent', 'CPU usage of the WireMock process.', 'cpu_percent'),
+        ('mockwiz_instance_connections', 'Open inet connections of the WireMock process.', 'connections'),
+    )
+    lines = []
+    for name, help_text, key in gauges:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+        for instance in snapshot['instances']:
+            value = instance.get(key)
+            if value is None:
+                continue
+            lines.append(f'{name}{_labels(port=instance["port"])} {int(value) if isinstance(value, bool) else value}')
+
+    if manager.warm_pool is not None:
+        stats = manager.warm_pool.stats()
+        lines += ['# HELP mockwiz_warm_pool_idle Idle JVMs in the warm pool.', '# TYPE mockwiz_warm_pool_idle gauge',
+                  f'mockwiz_warm_pool_idle {stats["idle"]}',
+                  '# HELP mockwiz_warm_pool_leases_total Warm pool leases by outcome.',
+                  '# TYPE mockwiz_warm_pool_leases_total counter',
+                  f'mockwiz_warm_pool_leases_total{_labels(result="hit")} {stats["hits"]}',
+                  f'mockwiz_warm_pool_leases_total{_labels(result="miss")} {stats["misses"]}']
+    return lines
+
+
+def render_proxy_metrics(proxy) -> list[str]:
+    """
+    Returns the front proxy's per-route counters and latency in the Prometheus text format.
+    """
+    routes = proxy.route_stats()
+    lines = ['# HELP mockwiz_proxy_client_connections Open client connections to the front proxy.',
+             '# TYPE mockwiz_proxy_client_connections gauge',
+             f'mockwiz_proxy_client_connections {proxy.client_connections}',
+             '# HELP mockwiz_proxy_request_duration_seconds Proxied request latency by instance port.',
+             '# TYPE mockwiz_proxy_request_duration_seconds histogram']
+    for route, stats in sorted(routes.items()):
+        histogram = stats['latency']
+        cumulative = 0
+        for bound, bucket in zip(list(LATENCY_BUCKETS) + ['+Inf'], histogram.buckets):
+            cumulative += bucket
+            lines.append(f'mockwiz_proxy_request_duration_seconds_bucket{_labels(route=route, le=bound)} {cumulative}')
+        lines.append(f'mockwiz_proxy_request_duration_seconds_sum{_labels(route=route)} {histogram.total}')
+        lines.append(f'mockwiz_proxy_request_duration_seconds_count{_labels(route=route)} {histogram.count}')
+
+    lines += ['# HELP mockwiz_proxy_responses_total Proxied responses by instance port and status.',
+              '# TYPE mockwiz_proxy_responses_total counter']
+    for route, stats in sorted(routes.items()):
+        for status, value in sorted(stats['responses'].items()):
+            lines.append(f'mockwiz_proxy_responses_total{_labels(route=route, status=status)} {value}')
+    lines += ['# HELP mockwiz_proxy_sent_bytes_total Response body bytes sent to clients by instance port.',
+              '# TYPE mockwiz_proxy_sent_bytes_total counter']
+    for route, stats in sorted(routes.items()):
+        lines.append(f'mockwiz_proxy_sent_bytes_total{_labels(route=route)} {stats["bytes_sent"]}')
+    return lines
+
+
+request_metrics = RequestMetrics()
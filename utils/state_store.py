@@ -0,0 +1,174 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+
+import psutil
+
+from utils.pid_registry import PidRegistry
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS instances (
+    port TEXT PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    create_time REAL,
+    args TEXT,
+    started_at REAL,
+    served_port INTEGER
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    port TEXT NOT NULL,
+    state TEXT NOT NULL,
+    message TEXT,
+    created_at REAL NOT NULL,
+    finished_at REAL,
+    owner_pid INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_port_state ON jobs (port, state);
+"""
+
+
+class SqliteState:
+    """
+    Instance and job state shared by every worker process through one SQLite file.
+
+    Each thread gets its own connection; WAL mode lets readers run while a
+    worker writes, and busy_timeout makes concurrent writers wait instead of failing.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        return self._connect().execute(sql, params).fetchall()
+
+
+class SqlitePidRegistry:
+    """
+    PidRegistry stored in SQLite; same interface as the JSON-file registry.
+    """
+
+    resolve = staticmethod(PidRegistry.resolve)
+
+    def __init__(self, state: SqliteState) -> None:
+        self.state = state
+
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> dict:
+        return {
+            'pid': row['pid'],
+            'create_time': row['create_time'],
+            'args': json.loads(row['args']) if row['args'] else None,
+            'started_at': row['started_at'],
+            'served_port': row['served_port'],
+        }
+
+    def entries(self) -> dict[str, dict]:
+        return {row['port']: self._entry(row) for row in self.state.execute('SELECT * FROM instances')}
+
+    def get(self, port: str | int) -> dict | None:
+        rows = self.state.execute('SELECT * FROM instances WHERE port = ?', (str(port),))
+        return self._entry(rows[0]) if rows else None
+
+    def add(self, port: str | int, process: psutil.Process, args: list[str] | None = None,
+            served_port: int | None = None) -> None:
+        try:
+            create_time = process.create_time()
+        except psutil.Error:
+            create_time = None
+        self.state.execute(
+            'INSERT OR REPLACE INTO instances (port, pid, create_time, args, started_at, served_port) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (str(port), process.pid, create_time, json.dumps(args) if args is not None else None,
+             time.time(), served_port))
+
+    def remove(self, *ports: str | int) -> None:
+        for port in ports:
+            self.state.execute('DELETE FROM instances WHERE port = ?', (str(port),))
+
+
+class SqliteJobStore:
+    """
+    Job snapshots shared across workers, so any worker can answer /jobs/<id>
+    and a second start of the same port is deduplicated everywhere.
+    """
+
+    _COLUMNS = ('id', 'kind', 'port', 'state', 'message', 'created_at', 'finished_at')
+
+    def __init__(self, state: SqliteState, history: int) -> None:
+        self.state = state
+        self.history = history
+
+    def put(self, job: dict) -> None:
+        columns = self._COLUMNS + ('owner_pid',)
+        self.state.execute(
+            f"INSERT OR REPLACE INTO jobs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            tuple(job[column] for column in self._COLUMNS) + (os.getpid(),))
+
+    def get(self, job_id: str) -> dict | None:
+        rows = self.state.execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
+        return self._snapshot(rows[0]) if rows else None
+
+    def _snapshot(self, row: sqlite3.Row) -> dict:
+        return {column: row[column] for column in self._COLUMNS}
+
+    def claim(self, job: dict, kinds: tuple[str, ...]) -> dict | None:
+        """
+        Stores a new job unless the port already has an active job of the same kind.
+
+        An active job of one of the other kinds doesn't prevent storing; it is
+        returned so the new job can wait for it.
+
+        Jobs owned by a worker that has since exited are ignored, so a crashed
+        worker can't block a port forever.
+
+        Returns:
+            The newest conflicting active job, or None if there is none.
+        """
+        conn = self.state._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE port = ? AND kind IN ({', '.join('?' * len(kinds))}) "
+                f"AND state IN ('pending', 'running') ORDER BY created_at DESC",
+                (job['port'],) + tuple(kinds)).fetchall()
+            for row in rows:
+                if row['owner_pid'] is None or psutil.pid_exists(row['owner_pid']):
+                    if row['kind'] != job['kind']:
+                        self.put(job)
+                    conn.execute('COMMIT')
+                    return self._snapshot(row)
+            self.put(job)
+            conn.execute('COMMIT')
+            return None
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def is_active(self, job_id: str) -> bool:
+        """
+        Tells whether a job is pending or running in a worker that is still alive.
+        """
+        rows = self.state.execute('SELECT state, owner_pid FROM jobs WHERE id = ?', (job_id,))
+        return bool(rows) and rows[0]['state'] in ('pending', 'running') and (
+            rows[0]['owner_pid'] is None or psutil.pid_exists(rows[0]['owner_pid']))
+
+    def prune(self) -> None:
+        self.state.execute(
+            "DELETE FROM jobs WHERE state NOT IN ('pending', 'running') AND id NOT IN "
+            "(SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?)", (self.history,))
@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+import psutil
+
+from config import STATUS_REFRESH_SECONDS
+
+INSTANCES_DIR = 'wiremock_instances'
+
+
+class StatusMonitor:
+    """
+    Refreshes the process stats of every tracked WireMock instance on a short
+    interval and serves the cached result, so a dashboard listing many instances
+    costs one cheap request instead of a round of psutil probes per instance.
+    """
+
+    def __init__(self, manager, interval: float = STATUS_REFRESH_SECONDS) -> None:
+        self.manager = manager
+        self.interval = interval
+        self._procs: dict[str, psutil.Process] = {}
+        self._snapshot: dict = {'instances': [], 'refreshed_at': None}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                pass  # Keep serving the last snapshot; the next round may succeed.
+            time.sleep(self.interval)
+
+    def _proc_for(self, port: str, pid: int) -> psutil.Process:
+        # Reuse Process objects: cpu_percent() measures against the previous call on the same object.
+        proc = self._procs.get(port)
+        if proc is None or proc.pid != pid:
+            proc = self._procs[port] = psutil.Process(pid)
+            proc.cpu_percent(None)
+        return proc
+
+    def _probe(self, port: str, pid: int, now: float) -> dict:
+        stats = {'port': port, 'pid': pid, 'running': False, 'uptime': None,
+                 'rss': None, 'cpu_percent': None, 'connections': None,
+                 'served_port': self.manager.served_port(port)}
+        try:
+            proc = self._proc_for(port, pid)
+            with proc.oneshot():
+                if not proc.is_running() or proc.status() == psutil.STATUS_ZOMBIE:
+                    return stats
+                stats['running'] = True
+                stats['uptime'] = round(now - proc.create_time(), 1)
+                stats['rss'] = proc.memory_info().rss
+                stats['cpu_percent'] = proc.cpu_percent(None)
+            try:
+                net_connections = getattr(proc, 'net_connections', None) or proc.connections
+                stats['connections'] = len(net_connections(kind='inet'))
+            except psutil.AccessDenied:
+                pass
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self._procs.pop(port, None)
+        return stats
+
+    def refresh(self) -> dict:
+        """
+        Probes every tracked instance and replaces the cached snapshot.
+
+        Returns:
+            The new snapshot.
+        """
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> dict:
+        now = time.time()
+        ports = set(self.manager.processes)
+        if os.path.isdir(INSTANCES_DIR):
+            ports.update(p for p in os.listdir(INSTANCES_DIR) if p.isdigit())
+        for port in ports - set(self.manager.processes):
+            self.manager.is_running(port)  # Picks up instances started by another worker.
+        tracked = {port: proc.pid for port, proc in list(self.manager.processes.items())}
+
+        instances = []
+        for port in sorted(ports, key=int):
+            if port in tracked:
+                instances.append(self._probe(port, tracked[port], now))
+            else:
+                self._procs.pop(port, None)
+                instances.append({'port': port, 'pid': None, 'running': False, 'uptime': None,
+                                  'rss': None, 'cpu_percent': None, 'connections': None,
+                                  'served_port': int(port)})
+        snapshot = {'instances': instances, 'refreshed_at': now}
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def snapshot(self) -> dict:
+        """
+        Returns the cached status of all instances, starting the refresher on first use.
+
+        Returns:
+            A dictionary with the per-instance 'instances' list and 'refreshed_at' timestamp.
+        """
+        self._ensure_started()
+        with self._lock:
+            if self._snapshot['refreshed_at'] is not None:
+                return self._snapshot
+        return self.refresh()
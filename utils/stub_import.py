@@ -0,0 +1,252 @@
+import os
+import re
+import json
+import base64
+import shutil
+import uuid
+import zipfile
+from urllib.parse import urlsplit
+
+from utils.body_store import BodyStore, cas_name, is_cas_name
+from utils.json_stream import iter_array_items
+from utils.stub_index import STUB_FILENAME_RE
+
+# Response headers from a HAR capture that don't make sense to replay.
+_HAR_SKIP_HEADERS = {'content-length', 'content-encoding', 'transfer-encoding', 'connection', 'keep-alive'}
+_NAME_RE = re.compile(r'[^a-zA-Z0-9_\-]+')
+
+
+def _slug(text: str) -> str:
+    return _NAME_RE.sub('-', text).strip('-')[:60] or 'stub'
+
+
+class StubImport:
+    """
+    Imports many mappings into wiremock_instances/<port> as one batch.
+
+    Items are parsed one at a time and written into a staging directory next to
+    the instance's mappings. commit() then moves the staged files into place,
+    restoring any overwritten file if a move fails, so a failed import never
+    leaves a half-written stub set behind. Mappings that reference the body
+    store get their references counted once the import is committed.
+
+    Items that aren't mappings are reported one by one and skipped, but an
+    upload that breaks off partway (truncated or malformed JSON, a damaged
+    ZIP) rejects the whole batch: everything staged so far is discarded.
+    """
+
+    def __init__(self, port: str | int) -> None:
+        self.port = str(port)
+        self.instance_dir = f"wiremock_instances/{self.port}"
+        self.staging_dir = os.path.join(self.instance_dir, f".import-{uuid.uuid4().hex}")
+        self.errors: list[dict] = []
+        self.imported: list[str] = []
+        self._staged: list[tuple[str, str]] = []
+        self._names: set[str] = set()
+        self.body_refs: list[str] = []
+        self.rejected = False
+        os.makedirs(os.path.join(self.staging_dir, 'mappings'))
+        os.makedirs(os.path.join(self.staging_dir, '__files'))
+
+    def _stage(self, kind: str, name: str) -> str:
+        staged = os.path.join(self.staging_dir, kind, name)
+        os.makedirs(os.path.dirname(staged), exist_ok=True)
+        self._staged.append((staged, os.path.join(self.instance_dir, kind, name)))
+        return staged
+
+    def _mapping_name(self, mapping: dict) -> str:
+        request_data = mapping['request']
+        url = request_data.get('urlPath') or request_data.get('url') or request_data.get('urlPattern') or ''
+        base = _slug(mapping.get('name') or f"{request_data.get('method', 'ANY')}-{url}")
+        filename = f"{base}-{_slug(str(mapping['id']))[:8]}-req.json"
+        while filename in self._names:
+            filename = f"{base}-{uuid.uuid4().hex[:8]}-req.json"
+        return filename
+
+    def add_mapping(self, item, source: str, filename: str | None = None) -> str | None:
+        """
+        Validates a mapping and stages it as <name>-req.json.
+
+        Args:
+            item: The decoded mapping.
+            source: A label for error reports (e.g. "item 3" or a ZIP member name).
+            filename: A filename to keep (e.g. from a ZIP export) instead of deriving one.
+
+        Returns:
+            The staged mapping filename, or None if the item was rejected.
+        """
+        if not isinstance(item, dict) or not isinstance(item.get('request'), dict) \
+                or not isinstance(item.get('response'), dict):
+            self.errors.append({'item': source, 'error': "Not a mapping with 'request' and 'response' objects."})
+            return None
+        item.setdefault('id', item.get('uuid') or str(uuid.uuid4()))
+        if not filename or not STUB_FILENAME_RE.match(filename) or filename in self._names:
+            filename = self._mapping_name(item)
+        self._names.add(filename)
+        try:
+            with open(self._stage('mappings', filename), 'w') as f:
+                json.dump(item, f, indent=2)
+        except (OSError, TypeError, ValueError) as e:
+            self.errors.append({'item': source, 'error': str(e)})
+            return None
+        self.imported.append(filename)
+        body_file = item['response'].get('bodyFileName')
+        if is_cas_name(body_file):
+            self.body_refs.append(body_file)
+        return filename
+
+    def add_body_file(self, name: str, fp) -> None:
+        """
+        Stages a response body file under __files, copying it in chunks.
+
+        Args:
+            name: The path relative to __files.
+            fp: A binary file object with the body.
+        """
+        with open(self._stage('__files', name), 'wb') as f:
+            shutil.copyfileobj(fp, f)
+
+    def reject(self, source: str, error: str) -> None:
+        """
+        Rejects the whole batch and discards everything staged for it.
+
+        Args:
+            source: A label for the error report.
+            error: Why the upload can't be imported.
+        """
+        self.errors.append({'item': source, 'error': error})
+        self.rejected = True
+        self.imported, self.body_refs, self._staged = [], [], []
+        self.cleanup()
+
+    def import_json(self, fp) -> None:
+        """
+        Imports a JSON array of mappings, a {"mappings": [...]} export or a single mapping.
+        """
+        try:
+            for i, item in enumerate(iter_array_items(fp, ('mappings',), fallback_object=True)
+                                     if self._peek_object(fp) else iter_array_items(fp)):
+                self.add_mapping(item, f"item {i}")
+        except ValueError as e:
+            self.reject('upload', str(e))
+
+    @staticmethod
+    def _peek_object(fp) -> bool:
+        # Uploaded files are seekable (werkzeug spools them); sniff the first token.
+        start = fp.tell()
+        head = fp.read(64).lstrip(b'\xef\xbb\xbf \t\r\n')
+        fp.seek(start)
+        return head.startswith(b'{')
+
+    def import_zip(self, fp) -> None:
+        """
+        Imports a ZIP laid out like generate_zip's output (mappings/ and __files/).
+        """
+        try:
+            archive = zipfile.ZipFile(fp)
+        except zipfile.BadZipFile as e:
+            self.reject('upload', f"Invalid ZIP: {e}")
+            return
+
+        with archive:
+            for info in archive.infolist():
+                name = info.filename.replace('\\', '/')
+                if info.is_dir() or name.startswith('/') or '..' in name.split('/'):
+                    continue
+                try:
+                    if name.startswith('mappings/') and name.endswith('.json'):
+                        with archive.open(info) as member:
+                            for i, item in enumerate(iter_array_items(member, ('mappings',), fallback_object=True)):
+                                # Keep the original filename so re-importing an export updates in place.
+                                keep = os.path.basename(name) if i == 0 and name.count('/') == 1 else None
+                                self.add_mapping(item, f"{name}#{i}", keep)
+                    elif name.startswith('__files/'):
+                        with archive.open(info) as member:
+                            self.add_body_file(name[len('__files/'):], member)
+                except (ValueError, OSError, zipfile.BadZipFile) as e:
+                    self.reject(name, str(e))
+                    return
+
+    def import_har(self, fp) -> None:
+        """
+        Imports the request/response pairs of a HAR capture, one mapping per entry.
+        """
+        try:
+            for i, entry in enumerate(iter_array_items(fp, ('log', 'entries'))):
+                try:
+                    self._add_har_entry(entry, f"entry {i}")
+                except (KeyError, TypeError, ValueError) as e:
+                    self.errors.append({'item': f"entry {i}", 'error': f"Malformed HAR entry: {e}"})
+        except ValueError as e:
+            self.reject('upload', str(e))
+
+    def _add_har_entry(self, entry: dict, source: str) -> None:
+        har_request, har_response = entry['request'], entry['response']
+        parts = urlsplit(har_request['url'])
+        url = parts.path or '/'
+        if parts.query:
+            url += '?' + parts.query
+
+        headers = {
+            header['name']: header['value'] for header in har_response.get('headers', [])
+            if header['name'].lower() not in _HAR_SKIP_HEADERS and not header['name'].startswith(':')
+        }
+        mapping = {
+            'id': str(uuid.uuid4()),
+            'request': {'method': har_request['method'], 'url': url},
+            'response': {'status': har_response['status'], 'headers': headers},
+        }
+
+        content = har_response.get('content') or {}
+        text = content.get('text')
+        if text:
+            body = base64.b64decode(text) if content.get('encoding') == 'base64' else text.encode()
+            mime = (content.get('mimeType') or '').split(';')[0].strip()
+            extension = '.json' if mime.endswith('json') else '.bin'
+            # Captures repeat the same bodies a lot; stage each distinct one once in the body store.
+            body_name = cas_name(body, extension)
+            staged = os.path.join(self.staging_dir, '__files', *body_name.split('/'))
+            if not os.path.exists(staged):
+                with open(self._stage('__files', body_name), 'wb') as f:
+                    f.write(body)
+            mapping['response']['bodyFileName'] = body_name
+        self.add_mapping(mapping, source)
+
+    def commit(self) -> None:
+        """
+        Moves every staged file into the instance directory.
+
+        Raises:
+            OSError: If a move fails; files already moved are rolled back first.
+        """
+        if self.rejected:
+            return
+        backup_dir = os.path.join(self.staging_dir, 'backup')
+        done: list[tuple[str, str, str | None]] = []
+        try:
+            for staged, target in self._staged:
+                if not os.path.exists(staged):
+                    continue  # The item failed to stage and was reported already.
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                backup = None
+                if os.path.exists(target):
+                    backup = os.path.join(backup_dir, str(len(done)))
+                    os.makedirs(backup_dir, exist_ok=True)
+                    os.replace(target, backup)
+                os.replace(staged, target)
+                done.append((staged, target, backup))
+        except OSError:
+            for staged, target, backup in reversed(done):
+                os.replace(target, staged)
+                if backup:
+                    os.replace(backup, target)
+            raise
+        finally:
+            self.cleanup()
+        BodyStore(self.port).add_refs(self.body_refs)
+
+    def cleanup(self) -> None:
+        """
+        Removes the staging directory and anything left in it.
+        """
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
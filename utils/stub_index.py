@@ -0,0 +1,187 @@
+import os
+import re
+import json
+import threading
+import time
+from datetime import datetime
+
+from config import STUB_INDEX_RECHECK_SECONDS
+
+STUB_FILENAME_RE = re.compile(r'^[a-zA-Z0-9_\-]+\.json$')
+
+
+class _PortIndex:
+    def __init__(self) -> None:
+        self.entries: dict[str, dict] = {}
+        self.mtimes: dict[str, int] = {}
+        self.dir_mtime: int | None = None
+        self.checked_at = 0.0
+        # Bumped whenever an entry changes, so dependent caches know when to rebuild.
+        self.generation = 0
+
+
+class StubIndex:
+    """
+    In-memory catalog of the mappings under wiremock_instances/<port>/mappings.
+
+    Entries are keyed by filename and only re-parsed when the file's mtime changes.
+    The directory is rescanned when its own mtime changes (files added or removed),
+    or at most every STUB_INDEX_RECHECK_SECONDS to pick up edits made in place.
+    """
+
+    def __init__(self, recheck_seconds: float = STUB_INDEX_RECHECK_SECONDS) -> None:
+        self.recheck_seconds = recheck_seconds
+        self._ports: dict[str, _PortIndex] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def mappings_dir(port: str | int) -> str:
+        return f"wiremock_instances/{port}/mappings"
+
+    @staticmethod
+    def _parse(path: str, filename: str, mtime: float) -> dict | None:
+        try:
+            with open(path) as f:
+                stub_data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(stub_data, dict):
+            return None
+        request_data = stub_data.get('request') or {}
+        response_data = stub_data.get('response') or {}
+        return {
+            'filename': filename,
+            'id': stub_data.get('id') or stub_data.get('uuid'),
+            'method': request_data.get('method', 'GET'),
+            'url': request_data.get('urlPath', request_data.get('url', 'N/A')),
+            'body_file': response_data.get('bodyFileName'),
+            'mtime': mtime,
+            'created_at': datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+    def _refresh(self, port: str, index: _PortIndex, force: bool = False) -> None:
+        mappings_dir = self.mappings_dir(port)
+        try:
+            dir_mtime = os.stat(mappings_dir).st_mtime_ns
+        except FileNotFoundError:
+            if index.mtimes:
+                index.generation += 1
+            index.entries.clear()
+            index.mtimes.clear()
+            index.dir_mtime = None
+            return
+
+        now = time.monotonic()
+        if (not force and dir_mtime == index.dir_mtime
+                and now - index.checked_at < self.recheck_seconds):
+            return
+
+        seen = set()
+        with os.scandir(mappings_dir) as it:
+            for entry in it:
+                if not STUB_FILENAME_RE.match(entry.name) or not entry.is_file():
+                    continue
+                seen.add(entry.name)
+                st = entry.stat()
+                if index.mtimes.get(entry.name) == st.st_mtime_ns:
+                    continue
+                index.mtimes[entry.name] = st.st_mtime_ns
+                index.generation += 1
+                parsed = self._parse(entry.path, entry.name, st.st_mtime)
+                if parsed is None:
+                    index.entries.pop(entry.name, None)
+                else:
+                    index.entries[entry.name] = parsed
+        for filename in list(index.mtimes):
+            if filename not in seen:
+                index.generation += 1
+                del index.mtimes[filename]
+                index.entries.pop(filename, None)
+        index.dir_mtime = dir_mtime
+        index.checked_at = now
+
+    def _port_index(self, port: str | int) -> tuple[str, _PortIndex]:
+        port_str = str(port)
+        index = self._ports.get(port_str)
+        if index is None:
+            index = self._ports[port_str] = _PortIndex()
+        return port_str, index
+
+    def entries(self, port: str | int) -> dict[str, dict]:
+        """
+        Returns the indexed stubs of a port, refreshing stale entries first.
+
+        Args:
+            port: The port of the WireMock instance.
+
+        Returns:
+            A dictionary mapping mapping filenames to their index entries.
+        """
+        with self._lock:
+            port_str, index = self._port_index(port)
+            self._refresh(port_str, index)
+            return dict(index.entries)
+
+    def generation(self, port: str | int) -> int:
+        """
+        Returns a counter that changes whenever the stubs of a port change.
+
+        Args:
+            port: The port of the WireMock instance.
+        """
+        with self._lock:
+            port_str, index = self._port_index(port)
+            self._refresh(port_str, index)
+            return index.generation
+
+    def get(self, port: str | int, filename: str) -> dict | None:
+        """
+        Looks up a single stub by mapping filename.
+
+        Args:
+            port: The port of the WireMock instance.
+            filename: The mapping filename.
+
+        Returns:
+            The index entry, or None if the mapping doesn't exist.
+        """
+        return self.entries(port).get(filename)
+
+    def update(self, port: str | int, filename: str) -> None:
+        """
+        Re-reads a single mapping file after it has been written.
+
+        Args:
+            port: The port of the WireMock instance.
+            filename: The mapping filename.
+        """
+        path = os.path.join(self.mappings_dir(port), filename)
+        with self._lock:
+            port_str, index = self._port_index(port)
+            index.generation += 1
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                index.mtimes.pop(filename, None)
+                index.entries.pop(filename, None)
+                return
+            index.mtimes[filename] = st.st_mtime_ns
+            parsed = self._parse(path, filename, st.st_mtime)
+            if parsed is None:
+                index.entries.pop(filename, None)
+            else:
+                index.entries[filename] = parsed
+
+    def remove(self, port: str | int, filename: str) -> None:
+        """
+        Drops a mapping from the index after its file has been deleted.
+
+        Args:
+            port: The port of the WireMock instance.
+            filename: The mapping filename.
+        """
+        with self._lock:
+            _, index = self._port_index(port)
+            index.generation += 1
+            index.mtimes.pop(filename, None)
+            index.entries.pop(filename, None)
@@ -0,0 +1,461 @@
+"""
+Request-matching simulator and overlap detector for the mappings of a port.
+
+Answers "which mapping would WireMock use for this request?" without a JVM,
+and flags mappings that can never be selected because an earlier one always
+wins. The matcher follows WireMock's rules: method (or ANY), one URL matcher
+(url, urlPath, urlPattern, urlPathPattern), then query/header/cookie/body
+patterns; among matches the lowest priority wins, ties go to the most recently
+written mapping. Regexes run with Python's re, which agrees with Java's for
+the usual patterns.
+
+    python -m utils.stub_matcher 8080 match POST /orders --body '{"id": 1}'
+    python -m utils.stub_matcher 8080 overlaps
+"""
+import os
+import re
+import json
+import time
+import threading
+from http.cookies import SimpleCookie, CookieError
+from urllib.parse import urlsplit, parse_qs
+
+DEFAULT_PRIORITY = 5
+_URL_KEYS = ('url', 'urlPath', 'urlPattern', 'urlPathPattern')
+_REGEX_META = frozenset('.^$*+?{}[]\\|()')
+
+
+class _Stub:
+    __slots__ = ('filename', 'id', 'name', 'method', 'url_key', 'url_value', 'regex', 'priority', 'mtime',
+                 'order', 'checks', 'unsupported', 'conditions', 'signature', 'error')
+
+    def summary(self) -> dict:
+        return {'filename': self.filename, 'id': self.id, 'name': self.name, 'method': self.method,
+                'url_matcher': self.url_key, 'url': self.url_value, 'priority': self.priority}
+
+
+class _Node:
+    __slots__ = ('children', 'exact', 'patterns')
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.exact: list[_Stub] = []     # url / urlPath stubs ending at this path.
+        self.patterns: list[_Stub] = []  # Regex and URL-less stubs whose literal prefix ends here.
+
+
+def _segments(path: str) -> list[str]:
+    # "/a/b" -> ["a", "b"]; a trailing slash is a segment of its own, as WireMock treats it.
+    return path.split('/')[1:] if path.startswith('/') else [path]
+
+
+def _literal_prefix(pattern: str) -> str:
+    """
+    Returns the literal text every match of a URL regex starts with.
+    """
+    if '|' in pattern:
+        return ''
+    if pattern.startswith('^'):
+        pattern = pattern[1:]
+    prefix = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\':
+            escaped = pattern[i + 1:i + 2]
+            if not escaped or escaped.isalnum():
+                break  # \d, \w, ... are classes, not literals.
+            literal, i = escaped, i + 2
+        elif ch in _REGEX_META:
+            break
+        else:
+            literal, i = ch, i + 1
+        if i < len(pattern) and pattern[i] in '*?{':
+            break  # The quantifier makes this character optional.
+        prefix.append(literal)
+    return ''.join(prefix)
+
+
+def _pattern_segments(stub: _Stub) -> list[str]:
+    # Trie position of a regex stub: the complete path segments of its literal prefix.
+    if stub.regex is None:
+        return []
+    prefix = _literal_prefix(str(stub.url_value)).split('?', 1)[0]
+    if not prefix.startswith('/'):
+        return []
+    return _segments(prefix[:prefix.rfind('/')]) if prefix.rfind('/') > 0 else []
+
+
+def _compile(filename: str, mapping, mtime: float) -> _Stub | None:
+    if not isinstance(mapping, dict) or not isinstance(mapping.get('request'), dict):
+        return None
+    request_data = mapping['request']
+    stub = _Stub()
+    stub.filename = filename
+    stub.id = mapping.get('id') or mapping.get('uuid')
+    stub.name = mapping.get('name')
+    stub.method = str(request_data.get('method') or 'ANY').upper()
+    stub.url_key = next((key for key in _URL_KEYS if key in request_data), None)
+    stub.url_value = request_data.get(stub.url_key) if stub.url_key else None
+    stub.regex = None
+    stub.error = None
+    if stub.url_key in ('urlPattern', 'urlPathPattern'):
+        try:
+            stub.regex = re.compile(str(stub.url_value), re.S)
+        except re.error as e:
+            stub.error = f"Invalid {stub.url_key}: {e}"
+    try:
+        stub.priority = int(mapping.get('priority', DEFAULT_PRIORITY))
+    except (TypeError, ValueError):
+        stub.priority = DEFAULT_PRIORITY
+    stub.mtime = mtime
+    stub.order = 0
+
+    stub.checks = []
+    stub.unsupported = False
+    conditions = {key: value for key, value in request_data.items() if key != 'method' and key not in _URL_KEYS}
+    for key, spec in conditions.items():
+        if key in ('queryParameters', 'headers', 'cookies') and isinstance(spec, dict):
+            stub.checks += [(key, name, pattern) for name, pattern in spec.items()]
+        elif key == 'bodyPatterns' and isinstance(spec, list):
+            stub.checks += [('body', None, pattern) for pattern in spec]
+        elif key == 'body':
+            # The dashboard's add_stub form stores the expected JSON body here.
+            stub.checks.append(('body', None, {'equalToJson': spec}))
+        else:
+            # basicAuth, multipartPatterns, customMatcher, ...: assumed to match, flagged as approximate.
+            stub.unsupported = True
+    stub.conditions = json.dumps(conditions, sort_keys=True) if conditions else ''
+    stub.signature = json.dumps(request_data, sort_keys=True)
+    return stub
+
+
+def _check_value(pattern, value: str | None) -> bool | None:
+    """
+    Applies one WireMock string-value pattern. Returns None for patterns the simulator doesn't know.
+    """
+    if not isinstance(pattern, dict):
+        return None
+    if pattern.get('absent'):
+        return value is None
+    if value is None:
+        return False
+    try:
+        if 'equalTo' in pattern:
+            if pattern.get('caseInsensitive'):
+                return value.lower() == str(pattern['equalTo']).lower()
+            return value == str(pattern['equalTo'])
+        if 'contains' in pattern:
+            return str(pattern['contains']) in value
+        if 'doesNotContain' in pattern:
+            return str(pattern['doesNotContain']) not in value
+        if 'matches' in pattern:
+            return re.fullmatch(str(pattern['matches']), value, re.S) is not None
+        if 'doesNotMatch' in pattern:
+            return re.fullmatch(str(pattern['doesNotMatch']), value, re.S) is None
+        if 'equalToJson' in pattern:
+            expected = pattern['equalToJson']
+            if isinstance(expected, str):
+                expected = json.loads(expected)
+            return json.loads(value) == expected
+    except re.error:
+        return None
+    except ValueError:
+        return False  # The request body isn't JSON.
+    return None
+
+
+class _PortMatcher:
+    def __init__(self) -> None:
+        self.generation = None
+        self.stubs: dict[str, _Stub] = {}
+        self.mtimes: dict[str, float] = {}
+        self.tries: dict[str, _Node] = {}
+
+    def rebuild(self) -> None:
+        # Order 0 is the mapping WireMock prefers on equal priority: the newest one.
+        ranked = sorted(self.stubs.values(), key=lambda stub: (-stub.mtime, stub.filename))
+        tries: dict[str, _Node] = {}
+        for order, stub in enumerate(ranked):
+            stub.order = order
+            if stub.error:
+                continue
+            node = tries.setdefault(stub.method, _Node())
+            if stub.url_key in ('url', 'urlPath'):
+                path = urlsplit(str(stub.url_value)).path if stub.url_key == 'url' else str(stub.url_value)
+                for segment in _segments(path):
+                    node = node.children.setdefault(segment, _Node())
+                node.exact.append(stub)
+            else:
+                for segment in _pattern_segments(stub):
+                    node = node.children.setdefault(segment, _Node())
+                node.patterns.append(stub)
+        self.tries = tries
+
+    def candidates(self, method: str, segments: list[str], exact: bool = True) -> list[_Stub]:
+        """
+        Returns the stubs that may match a method and path, found by walking the trie.
+
+        With exact=False only the pattern stubs along the way are returned.
+        """
+        found = []
+        for trie_method in (method, 'ANY') if method != 'ANY' else ('ANY',):
+            node = self.tries.get(trie_method)
+            if node is None:
+                continue
+            found += node.patterns
+            for segment in segments:
+                node = node.children.get(segment)
+                if node is None:
+                    break
+                found += node.patterns
+            else:
+                if exact:
+                    found += node.exact
+        return found
+
+
+def _url_matches(stub: _Stub, path: str, url: str) -> bool:
+    if stub.url_key is None:
+        return True
+    if stub.url_key == 'url':
+        return stub.url_value == url
+    if stub.url_key == 'urlPath':
+        return stub.url_value == path
+    if stub.url_key == 'urlPattern':
+        return stub.regex.fullmatch(url) is not None
+    return stub.regex.fullmatch(path) is not None
+
+
+class StubMatcher:
+    """
+    Per-port matching index over the mappings tracked by a StubIndex.
+
+    Exact url/urlPath stubs sit at the end of their path in a method + path
+    segment trie; regex stubs sit at the node of their literal prefix and
+    URL-less stubs at the root, so a lookup only evaluates the stubs along the
+    request's path. The index is rebuilt when the StubIndex reports changes,
+    re-reading only the mapping files that changed.
+    """
+
+    def __init__(self, stub_index) -> None:
+        self.stub_index = stub_index
+        self._ports: dict[str, _PortMatcher] = {}
+        self._lock = threading.Lock()
+
+    def _port_matcher(self, port: str | int) -> _PortMatcher:
+        port_str = str(port)
+        generation = self.stub_index.generation(port_str)
+        with self._lock:
+            matcher = self._ports.get(port_str)
+            if matcher is None:
+                matcher = self._ports[port_str] = _PortMatcher()
+            if matcher.generation == generation:
+                return matcher
+            entries = self.stub_index.entries(port_str)
+            mappings_dir = self.stub_index.mappings_dir(port_str)
+            for filename in list(matcher.stubs):
+                if filename not in entries:
+                    del matcher.stubs[filename]
+                    del matcher.mtimes[filename]
+            for filename, entry in entries.items():
+                if matcher.mtimes.get(filename) == entry['mtime']:
+                    continue
+                try:
+                    with open(os.path.join(mappings_dir, filename)) as f:
+                        stub = _compile(filename, json.load(f), entry['mtime'])
+                except (OSError, ValueError):
+                    stub = None
+                matcher.mtimes[filename] = entry['mtime']
+                if stub is None:
+                    matcher.stubs.pop(filename, None)
+                else:
+                    matcher.stubs[filename] = stub
+            matcher.rebuild()
+            matcher.generation = generation
+            return matcher
+
+    @staticmethod
+    def _evaluate(stub: _Stub, query: dict, headers: dict, cookies: dict, body: str | None) -> tuple[bool, bool, str]:
+        approximate = stub.unsupported
+        for kind, name, pattern in stub.checks:
+            if kind == 'queryParameters':
+                value = query.get(name, [None])[0]
+            elif kind == 'headers':
+                value = headers.get(name.lower())
+            elif kind == 'cookies':
+                value = cookies.get(name)
+            else:
+                value = body
+            result = _check_value(pattern, value)
+            if result is None:
+                approximate = True
+            elif not result:
+                label = f"{kind} '{name}'" if name else 'body'
+                return False, approximate, f"{label} doesn't match {json.dumps(pattern)}"
+        return True, approximate, ''
+
+    def match(self, port: str | int, method: str, url: str, headers: dict | None = None,
+              body: str | None = None) -> dict:
+        """
+        Resolves a request to the mapping WireMock would answer it with.
+
+        Args:
+            port: The port of the WireMock instance.
+            method: The HTTP method.
+            url: The request path with an optional query string.
+            headers: Request headers.
+            body: The request body as text.
+
+        Returns:
+            The winning stub (or None), whether conditions the simulator can't
+            evaluate were assumed to match, stubs that matched method and URL but
+            failed a condition, and the lookup time in microseconds.
+        """
+        matcher = self._port_matcher(port)
+        started = time.perf_counter()
+        method = method.upper()
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        full_url = path + ('?' + parts.query if parts.query else '')
+        query = parse_qs(parts.query, keep_blank_values=True)
+        headers = {str(name).lower(): str(value) for name, value in (headers or {}).items()}
+        cookies = {}
+        if 'cookie' in headers:
+            jar = SimpleCookie()
+            try:
+                jar.load(headers['cookie'])
+            except CookieError:
+                pass
+            cookies = {name: morsel.value for name, morsel in jar.items()}
+
+        best, best_approximate, near_misses = None, False, []
+        candidates = matcher.candidates(method, _segments(path))
+        for stub in sorted(candidates, key=lambda stub: (stub.priority, stub.order)):
+            if not _url_matches(stub, path, full_url):
+                continue
+            matched, approximate, reason = self._evaluate(stub, query, headers, cookies, body)
+            if matched:
+                best, best_approximate = stub, approximate
+                break
+            near_misses.append({**stub.summary(), 'reason': reason})
+        elapsed = time.perf_counter() - started
+        return {
+            'match': best.summary() if best else None,
+            'approximate': best_approximate,
+            'near_misses': near_misses[:10],
+            'candidates': len(candidates),
+            'stubs': len(matcher.stubs),
+            'elapsed_us': round(elapsed * 1_000_000, 1),
+        }
+
+    def overlaps(self, port: str | int, limit: int = 500) -> dict:
+        """
+        Finds mappings that overlap, or can never be selected, across a port's stub set.
+
+        A mapping is unreachable when a mapping that precedes it (lower priority,
+        or equal priority and newer) matches every request it matches: same or
+        ANY method, a URL matcher covering its URL, and no conditions or the same
+        conditions. Overlaps are pairs of mappings with the same priority that
+        can match the same request but differ in their conditions, so only file
+        order decides between them. Two different regexes are never compared.
+
+        Args:
+            port: The port of the WireMock instance.
+            limit: The maximum number of findings listed per kind.
+
+        Returns:
+            Findings per kind (duplicate, unreachable, overlap, invalid) with totals.
+        """
+        started = time.perf_counter()
+        matcher = self._port_matcher(port)
+        stubs = sorted(matcher.stubs.values(), key=lambda stub: (stub.priority, stub.order))
+        findings: dict[str, list[dict]] = {'duplicate': [], 'unreachable': [], 'overlap': [], 'invalid': []}
+
+        def report(kind, stub, other=None, reason=''):
+            findings[kind].append({**stub.summary(), 'reason': reason,
+                                   'winner': other.summary() if other else None})
+
+        first_by_signature: dict[str, _Stub] = {}
+        unreachable: set[str] = set()
+        for stub in stubs:
+            if stub.error:
+                report('invalid', stub, reason=stub.error)
+                unreachable.add(stub.filename)
+                continue
+            winner = first_by_signature.setdefault(stub.signature, stub)
+            if winner is not stub:
+                report('duplicate', stub, winner, 'Same request pattern as an earlier mapping.')
+                unreachable.add(stub.filename)
+
+        for stub in stubs:
+            if stub.filename in unreachable:
+                continue
+            if stub.url_key in ('url', 'urlPath'):
+                path = urlsplit(str(stub.url_value)).path if stub.url_key == 'url' else str(stub.url_value)
+                candidates = matcher.candidates(stub.method, _segments(path))
+            else:
+                # Patterns that could cover a pattern sit on the way to its own trie node.
+                candidates = matcher.candidates(stub.method, _pattern_segments(stub), exact=False)
+            for other in candidates:
+                if other is stub or other.filename in unreachable or other.error:
+                    continue
+                if (other.priority, other.order) > (stub.priority, stub.order):
+                    continue
+                if other.method != stub.method and other.method != 'ANY':
+                    continue
+                if not self._covers(other, stub):
+                    continue
+                if not other.conditions or other.conditions == stub.conditions:
+                    report('unreachable', stub, other, "An earlier mapping matches every request this one matches.")
+                    unreachable.add(stub.filename)
+                    break
+                if other.priority == stub.priority and stub.conditions and not other.unsupported:
+                    report('overlap', stub, other, "Both can match the same request; only file order decides.")
+
+        totals = {kind: len(items) for kind, items in findings.items()}
+        return {
+            **{kind: items[:limit] for kind, items in findings.items()},
+            'totals': totals,
+            'stubs': len(stubs),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    @staticmethod
+    def _covers(other: _Stub, stub: _Stub) -> bool:
+        # Whether other's URL matcher accepts every URL stub's URL matcher accepts.
+        if other.url_key is None:
+            return True
+        if stub.url_key == 'url':
+            url = str(stub.url_value)
+            path = urlsplit(url).path
+            return _url_matches(other, path, url)
+        if stub.url_key == 'urlPath':
+            # A urlPath stub accepts any query string, which url and urlPattern don't.
+            return other.url_key in ('urlPath', 'urlPathPattern') and _url_matches(other, str(stub.url_value), '')
+        return other.url_key == stub.url_key and other.url_value == stub.url_value
+
+
+if __name__ == '__main__':
+    import argparse
+    from utils.stub_index import StubIndex
+
+    parser = argparse.ArgumentParser(description="Simulate WireMock request matching over a port's mappings.")
+    parser.add_argument('port')
+    commands = parser.add_subparsers(dest='command', required=True)
+    match_parser = commands.add_parser('match', help="show which mapping answers a request")
+    match_parser.add_argument('method')
+    match_parser.add_argument('url')
+    match_parser.add_argument('-H', '--header', action='append', default=[], help="'Name: value', repeatable")
+    match_parser.add_argument('--body')
+    overlaps_parser = commands.add_parser('overlaps', help="list duplicate, unreachable and overlapping mappings")
+    overlaps_parser.add_argument('--limit', type=int, default=500)
+    args = parser.parse_args()
+
+    stub_matcher = StubMatcher(StubIndex())
+    if args.command == 'match':
+        headers = dict(header.split(':', 1) for header in args.header)
+        result = stub_matcher.match(args.port, args.method, args.url,
+                                    {name.strip(): value.strip() for name, value in headers.items()}, args.body)
+    else:
+        result = stub_matcher.overlaps(args.port, args.limit)
+    print(json.dumps(result, indent=2))
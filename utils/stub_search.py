@@ -0,0 +1,443 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+import time
+
+from config import (STUB_SEARCH_DB_PATH, STUB_SEARCH_RECHECK_SECONDS, STUB_SEARCH_BODY_MAX_BYTES,
+                    STUB_SEARCH_RANK_MAX_MATCHES)
+from utils.body_store import is_cas_name
+from utils.body_upload import detect_content_type, is_text_type
+from utils.stub_index import STUB_FILENAME_RE
+
+INSTANCES_DIR = 'wiremock_instances'
+# Searchable columns, in the order they are stored.
+FIELDS = ('url', 'request', 'headers', 'body')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stubs (
+    id INTEGER PRIMARY KEY,
+    port TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    method TEXT,
+    url TEXT,
+    body_file TEXT,
+    mtime_ns INTEGER NOT NULL,
+    body_mtime_ns INTEGER,
+    UNIQUE (port, filename)
+);
+"""
+_FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS stub_text USING fts5({})".format(', '.join(FIELDS))
+# Without FTS5 the same columns live in a plain table and are searched with LIKE.
+_PLAIN_SCHEMA = "CREATE TABLE IF NOT EXISTS stub_text (rowid INTEGER PRIMARY KEY, {})".format(', '.join(FIELDS))
+
+
+def _fts_available() -> bool:
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE probe USING fts5(x)')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _fts_query(text: str) -> str:
+    # Every word or "quoted phrase" must match; a trailing * makes a word a prefix.
+    # Terms are always quoted, so punctuation in URLs never reaches the FTS5 parser.
+    parts = []
+    for term in re.findall(r'"[^"]*"|\S+', text):
+        prefix = term.endswith('*') and not term.startswith('"')
+        term = term.strip('"').rstrip('*')
+        if term:
+            parts.append('"' + term.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(parts)
+
+
+_stub_search = None
+_stub_search_lock = threading.Lock()
+
+
+def get_stub_search() -> 'StubSearch':
+    """
+    Returns the process-wide StubSearch, creating it on first use.
+
+    Opening the index creates the database file and starts the recheck thread,
+    so it is deferred until a request needs it instead of happening while the
+    blueprints are imported.
+    """
+    global _stub_search
+    if _stub_search is None:
+        with _stub_search_lock:
+            if _stub_search is None:
+                _stub_search = StubSearch()
+    return _stub_search
+
+
+class StubSearch:
+    """
+    Persistent full-text index over the mappings and response bodies of every port.
+
+    One SQLite file holds a row per mapping (URL, request matchers, response
+    headers and the text of its response body) in an FTS5 table, or in a plain
+    table searched with LIKE where SQLite lacks FTS5. The index is kept current
+    incrementally: add/delete routes update single rows, a port whose mappings
+    folder changed is resynced before a search, and a background thread rechecks
+    file mtimes every STUB_SEARCH_RECHECK_SECONDS to catch edits made in place.
+    Only files whose mtime changed are re-read.
+    """
+
+    def __init__(self, path: str = STUB_SEARCH_DB_PATH,
+                 recheck_seconds: float = STUB_SEARCH_RECHECK_SECONDS) -> None:
+        self.path = path
+        self.recheck_seconds = recheck_seconds
+        self.fts = _fts_available()
+        self._local = threading.local()
+        # mtime of each port's mappings folder when it was last synced.
+        self._dir_mtimes: dict[str, int | None] = {}
+        # Serialises syncs in this process; SQLite's write lock covers other workers.
+        self._lock = threading.Lock()
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.execute(_FTS_SCHEMA if self.fts else _PLAIN_SCHEMA)
+        # Ports with rows in the index, so ports whose folder is gone get their rows dropped.
+        self._indexed_ports = {row['port'] for row in conn.execute('SELECT DISTINCT port FROM stubs')}
+        if recheck_seconds > 0:
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.recheck_seconds)
+            try:
+                self.sync(force=True)
+            except (OSError, sqlite3.Error):
+                pass  # Retry next round.
+
+    @staticmethod
+    def mappings_dir(port: str) -> str:
+        return f"{INSTANCES_DIR}/{port}/mappings"
+
+    @staticmethod
+    def ports() -> list[str]:
+        if not os.path.isdir(INSTANCES_DIR):
+            return []
+        return sorted(name for name in os.listdir(INSTANCES_DIR) if name.isdigit())
+
+    @staticmethod
+    def _body_path(port: str, body_file: str | None) -> str | None:
+        if not body_file:
+            return None
+        files_dir = os.path.abspath(f"{INSTANCES_DIR}/{port}/__files")
+        path = os.path.abspath(os.path.join(files_dir, body_file))
+        if os.path.commonpath([files_dir, path]) != files_dir:
+            return None
+        return path
+
+    @classmethod
+    def _body_mtime(cls, port: str, body_file: str | None) -> int | None:
+        # Blobs in the body store never change under their name, so they aren't re-stat'ed.
+        if not body_file or is_cas_name(body_file):
+            return None
+        try:
+            return os.stat(cls._body_path(port, body_file) or '').st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def _body_text(cls, port: str, response: dict) -> str:
+        parts = []
+        for key in ('body', 'jsonBody'):
+            if key in response:
+                value = response[key]
+                parts.append(value if isinstance(value, str) else json.dumps(value, ensure_ascii=False))
+        path = cls._body_path(port, response.get('bodyFileName'))
+        if path:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read(STUB_SEARCH_BODY_MAX_BYTES)
+            except OSError:
+                data = b''
+            headers = response.get('headers') or {}
+            content_type = next((value for name, value in headers.items()
+                                 if name.lower() == 'content-type' and isinstance(value, str)), None)
+            if data and is_text_type(content_type or detect_content_type(data[:512], path)):
+                parts.append(data.decode('utf-8', errors='ignore'))
+        return '\n'.join(parts)
+
+    @classmethod
+    def _document(cls, port: str, path: str) -> dict | None:
+        try:
+            with open(path) as f:
+                mapping = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(mapping, dict):
+            return None
+        request_data = mapping.get('request') or {}
+        response_data = mapping.get('response') or {}
+        url = request_data.get('urlPath', request_data.get('url', request_data.get('urlPattern',
+                                request_data.get('urlPathPattern', ''))))
+        return {
+            'method': request_data.get('method', 'ANY'),
+            'url': url,
+            'body_file': response_data.get('bodyFileName'),
+            'request': json.dumps(request_data, ensure_ascii=False),
+            'headers': json.dumps(response_data.get('headers') or {}, ensure_ascii=False),
+            'body': cls._body_text(port, response_data),
+        }
+
+    def _write(self, conn: sqlite3.Connection, port: str, filename: str, mtime_ns: int) -> None:
+        doc = self._document(port, os.path.join(self.mappings_dir(port), filename))
+        if doc is None:
+            self._delete(conn, port, filename)
+            return
+        row = conn.execute('SELECT id FROM stubs WHERE port = ? AND filename = ?', (port, filename)).fetchone()
+        values = (doc['method'], doc['url'], doc['body_file'], mtime_ns, self._body_mtime(port, doc['body_file']))
+        if row is None:
+            rowid = conn.execute(
+                'INSERT INTO stubs (port, filename, method, url, body_file, mtime_ns, body_mtime_ns) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', (port, filename) + values).lastrowid
+            self._indexed_ports.add(port)
+        else:
+            rowid = row['id']
+            conn.execute('UPDATE stubs SET method = ?, url = ?, body_file = ?, mtime_ns = ?, body_mtime_ns = ? '
+                         'WHERE id = ?', values + (rowid,))
+            conn.execute('DELETE FROM stub_text WHERE rowid = ?', (rowid,))
+        conn.execute(f"INSERT INTO stub_text (rowid, {', '.join(FIELDS)}) VALUES (?, ?, ?, ?, ?)",
+                     (rowid,) + tuple(doc[field] for field in FIELDS))
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, port: str, filename: str) -> None:
+        row = conn.execute('SELECT id FROM stubs WHERE port = ? AND filename = ?', (port, filename)).fetchone()
+        if row is not None:
+            conn.execute('DELETE FROM stub_text WHERE rowid = ?', (row['id'],))
+            conn.execute('DELETE FROM stubs WHERE id = ?', (row['id'],))
+
+    def _transaction(self, fn):
+        conn = self._connect()
+        with self._lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+            return result
+
+    def _mark_synced(self, port: str) -> None:
+        # The caller just indexed the change that touched the folder; skip the rescan it
+        # would trigger. A concurrent change is still caught by the periodic recheck.
+        if self._dir_mtimes.get(port) is not None:
+            try:
+                self._dir_mtimes[port] = os.stat(self.mappings_dir(port)).st_mtime_ns
+            except FileNotFoundError:
+                pass
+
+    def update(self, port: str | int, filename: str) -> None:
+        """
+        Re-indexes a single mapping after it has been written (or drops it if it is gone).
+
+        Args:
+            port: The port of the WireMock instance.
+            filename: The mapping filename.
+        """
+        port_str = str(port)
+        try:
+            mtime_ns = os.stat(os.path.join(self.mappings_dir(port_str), filename)).st_mtime_ns
+        except FileNotFoundError:
+            self.remove(port_str, filename)
+            return
+        self._transaction(lambda conn: self._write(conn, port_str, filename, mtime_ns))
+        self._mark_synced(port_str)
+
+    def remove(self, port: str | int, filename: str) -> None:
+        """
+        Drops a mapping from the index after its file has been deleted.
+
+        Args:
+            port: The port of the WireMock instance.
+            filename: The mapping filename.
+        """
+        self._transaction(lambda conn: self._delete(conn, str(port), filename))
+        self._mark_synced(str(port))
+
+    def _sync_port(self, port: str, force: bool) -> int:
+        mappings_dir = self.mappings_dir(port)
+        try:
+            dir_mtime = os.stat(mappings_dir).st_mtime_ns
+        except FileNotFoundError:
+            dir_mtime = None
+        if not force and port in self._dir_mtimes and dir_mtime == self._dir_mtimes[port]:
+            return 0
+
+        def sync(conn):
+            known = {row['filename']: row for row in conn.execute(
+                'SELECT filename, body_file, mtime_ns, body_mtime_ns FROM stubs WHERE port = ?', (port,))}
+            changed = 0
+            seen = set()
+            if dir_mtime is not None:
+                with os.scandir(mappings_dir) as it:
+                    for entry in it:
+                        if not STUB_FILENAME_RE.match(entry.name) or not entry.is_file():
+                            continue
+                        seen.add(entry.name)
+                        mtime_ns = entry.stat().st_mtime_ns
+                        row = known.get(entry.name)
+                        if (row is not None and row['mtime_ns'] == mtime_ns
+                                and row['body_mtime_ns'] == self._body_mtime(port, row['body_file'])):
+                            continue
+                        self._write(conn, port, entry.name, mtime_ns)
+                        changed += 1
+            for filename in known.keys() - seen:
+                self._delete(conn, port, filename)
+                changed += 1
+            return changed
+
+        changed = self._transaction(sync)
+        self._dir_mtimes[port] = dir_mtime
+        if dir_mtime is None:
+            self._indexed_ports.discard(port)
+        return changed
+
+    def sync(self, ports: list[str] | None = None, force: bool = False) -> int:
+        """
+        Brings the index up to date with the files on disk.
+
+        Without force, only ports whose mappings folder changed (files added,
+        removed or replaced) are rescanned; with force every mapping's mtime is
+        compared. Ports whose instance folder is gone are dropped.
+
+        Returns:
+            The number of mappings re-indexed or removed.
+        """
+        if ports is None:
+            ports = sorted(set(self.ports()) | self._indexed_ports)
+        return sum(self._sync_port(str(port), force) for port in ports)
+
+    def search(self, query: str, port: str | int | None = None, field: str | None = None,
+               limit: int = 50) -> list[dict]:
+        """
+        Finds the mappings whose URL, request matchers, headers or body contain every term.
+
+        Args:
+            query: Words and "quoted phrases"; a trailing * matches a prefix.
+            port: Only search this port.
+            field: Only search this column (one of FIELDS).
+            limit: The maximum number of results, best matches first. When more than
+                STUB_SEARCH_RANK_MAX_MATCHES mappings match, the ones most recently added
+                to the index come first (a rebuild re-adds them all in file order).
+
+        Returns:
+            The port, filename, method and URL of each match, with a snippet of the
+            matched text where FTS5 is available.
+
+        Raises:
+            ValueError: If the field is unknown.
+        """
+        if field and field not in FIELDS:
+            raise ValueError(f"Unknown field '{field}'; use one of {', '.join(FIELDS)}.")
+        self.sync([str(port)] if port is not None else None)
+
+        where, params = [], []
+        if port is not None:
+            where.append('s.port = ?')
+            params.append(str(port))
+        if self.fts:
+            match = _fts_query(query)
+            if not match:
+                return []
+            match = f"{{{field}}} : ({match})" if field else match
+            where.insert(0, 'stub_text MATCH ?')
+            params.insert(0, match)
+            # bm25 is computed for every match before sorting; a query that matches most of
+            # a large index is returned by rowid instead (most recently indexed first), which
+            # FTS5 does without a sort.
+            # The count uses the same filters, so a small port in a big index is still ranked.
+            try:
+                matches = self._connect().execute(
+                    f"SELECT COUNT(*) FROM (SELECT stub_text.rowid FROM stub_text "
+                    f"JOIN stubs s ON s.id = stub_text.rowid WHERE {' AND '.join(where)} LIMIT ?)",
+                    (*params, STUB_SEARCH_RANK_MAX_MATCHES + 1)).fetchone()[0]
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"Invalid search: {e}") from e
+            order = 'rank' if matches <= STUB_SEARCH_RANK_MAX_MATCHES else 'stub_text.rowid DESC'
+            snippet = f"snippet(stub_text, {FIELDS.index(field) if field else -1}, '[', ']', '…', 12)"
+            sql = (f"SELECT s.port, s.filename, s.method, s.url, {snippet} AS snippet "
+                   f"FROM stub_text JOIN stubs s ON s.id = stub_text.rowid "
+                   f"WHERE {' AND '.join(where)} ORDER BY {order} LIMIT ?")
+        else:
+            terms = [term.strip('"').rstrip('*') for term in re.findall(r'"[^"]*"|\S+', query)]
+            terms = [term for term in terms if term]
+            if not terms:
+                return []
+            columns = [field] if field else list(FIELDS)
+            for term in terms:
+                escaped = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                where.append('(' + ' OR '.join(f"t.{column} LIKE ? ESCAPE '\\'" for column in columns) + ')')
+                params += [escaped] * len(columns)
+            sql = (f"SELECT s.port, s.filename, s.method, s.url, NULL AS snippet "
+                   f"FROM stub_text t JOIN stubs s ON s.id = t.rowid "
+                   f"WHERE {' AND '.join(where)} ORDER BY s.mtime_ns DESC LIMIT ?")
+        params.append(limit)
+        try:
+            rows = self._connect().execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search: {e}") from e
+        return [dict(row) for row in rows]
+
+    def stats(self) -> dict:
+        """
+        Returns the number of indexed mappings per port and which search engine is in use.
+        """
+        rows = self._connect().execute('SELECT port, COUNT(*) AS stubs FROM stubs GROUP BY port')
+        return {'engine': 'fts5' if self.fts else 'like', 'ports': {row['port']: row['stubs'] for row in rows}}
+
+    def rebuild(self) -> int:
+        """
+        Throws the index away and indexes every mapping again.
+
+        Returns:
+            The number of mappings indexed.
+        """
+        def clear(conn):
+            conn.execute('DELETE FROM stub_text')
+            conn.execute('DELETE FROM stubs')
+        self._transaction(clear)
+        self._dir_mtimes.clear()
+        self._indexed_ports.clear()
+        return self.sync(force=True)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Full-text search over the mappings of every port.")
+    parser.add_argument('command', choices=('sync', 'rebuild', 'search'))
+    parser.add_argument('query', nargs='?', default='', help="search terms (search only)")
+    parser.add_argument('--port', help="only search this port")
+    parser.add_argument('--field', choices=FIELDS, help="only search this field")
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+
+    search = StubSearch(recheck_seconds=0)
+    if args.command == 'search':
+        started = time.perf_counter()
+        results = search.search(args.query, args.port, args.field, args.limit)
+        for result in results:
+            print(f"{result['port']}  {result['filename']}  {result['method']} {result['url']}"
+                  + (f"\n    {result['snippet']}" if result['snippet'] else ''))
+        print(f"{len(results)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
+    else:
+        started = time.perf_counter()
+        changed = search.rebuild() if args.command == 'rebuild' else search.sync(force=True)
+        print(f"{changed} mappings indexed in {time.perf_counter() - started:.1f}s; {json.dumps(search.stats())}")
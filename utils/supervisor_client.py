@@ -0,0 +1,172 @@
+import queue
+import ipaddress
+from multiprocessing.connection import Client
+
+from config import SUPERVISOR_AUTHKEY, DEFAULT_FLASK_SECRET_KEY, JOB_WORKERS, JOB_HISTORY, LOG_TAIL_POLL_SECONDS
+from utils.admin_client import AdminApiError, WiremockAdminClient
+from utils.jobs import JobRegistry
+
+# Manager calls the supervisor answers; anything else is refused.
+RPC_METHODS = frozenset({
+    'start_wiremock', 'stop_wiremock', 'start_wiremock_async', 'stop_wiremock_async', 'wait_until_ready',
+    'is_running', 'served_port', 'mapping_for_push', 'reload_mappings', 'get_profile', 'set_profile',
+    'read_log_chunk', 'get_log_output', 'streams_logs_locally', 'has_warm_pool', 'warm_pool_disabled_reason',
+    'restart_policy', 'jobs.get', 'status_monitor.snapshot', 'log_broadcaster.seq_for_cursor',
+    'log_broadcaster.wait', 'journal.collect', 'journal.summary', 'journal.reset', 'warm_pool.stats',
+})
+# Exceptions re-raised on the client side by name; everything else becomes a SupervisorError.
+_ERRORS = {'AdminApiError': AdminApiError, 'ValueError': ValueError, 'OSError': OSError}
+
+
+def parse_address(address: str):
+    """
+    Turns SUPERVISOR_ADDRESS into a multiprocessing.connection address.
+
+    "host:port" is a TCP address; anything else is a Unix socket path (or a
+    Windows named pipe such as \\\\.\\pipe\\mockwiz).
+    """
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and '/' not in address and '\\' not in address:
+        return host or '127.0.0.1', int(port)
+    return address
+
+
+class SupervisorError(RuntimeError):
+    """
+    Raised when the supervisor can't be reached or refuses a call.
+    """
+
+
+def _is_loopback(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host.strip('[]')).is_loopback
+    except ValueError:
+        return False
+
+
+def check_rpc_settings(address: str, authkey: bytes):
+    """
+    Validates the supervisor's address and key and returns the parsed address.
+
+    The RPC unpickles every message once the key is accepted, so a guessable key
+    or a reachable port would let anyone run code in the supervisor.
+
+    Raises:
+        SupervisorError: If the key is unset or the default, or a TCP address isn't loopback.
+    """
+    if not authkey or authkey == DEFAULT_FLASK_SECRET_KEY.encode():
+        raise SupervisorError("Set SUPERVISOR_AUTHKEY to a secret of its own before using the supervisor.")
+    parsed = parse_address(address)
+    if isinstance(parsed, tuple) and not _is_loopback(parsed[0]):
+        raise SupervisorError(f"Refusing supervisor address {address}: TCP addresses must be loopback "
+                              f"(127.0.0.1, ::1, localhost); use a Unix socket path for anything else.")
+    return parsed
+
+
+class _Namespace:
+    def __init__(self, client: 'SupervisorClient', name: str) -> None:
+        self._client = client
+        self._name = name
+
+    def __getattr__(self, method: str):
+        qualified = f"{self._name}.{method}"
+        return lambda *args, **kwargs: self._client.call(qualified, *args, **kwargs)
+
+
+class _LogBroadcaster(_Namespace):
+    """
+    The supervisor's log broadcaster. A wait holds a supervisor connection, so
+    long waits are cut into short polls and a log stream never pins one.
+    """
+
+    def wait(self, port, after_seq, timeout):
+        return self._client.call('log_broadcaster.wait', port, after_seq, min(timeout, LOG_TAIL_POLL_SECONDS))
+
+
+class _Jobs:
+    """
+    Jobs of the supervisor, plus local jobs (e.g. benchmarks) that run in this process.
+    """
+
+    def __init__(self, client: 'SupervisorClient') -> None:
+        self._client = client
+        self._local = JobRegistry(JOB_WORKERS, JOB_HISTORY)
+
+    def submit(self, kind, port, fn):
+        return self._local.submit(kind, port, fn)
+
+    def get(self, job_id: str) -> dict | None:
+        return self._local.get(job_id) or self._client.call('jobs.get', job_id)
+
+
+class SupervisorClient:
+    """
+    Stands in for WiremockManager when the JVMs are owned by the supervisor daemon
+    (supervisor.py). Calls are forwarded over an authenticated
+    multiprocessing.connection; connections are pooled and reused.
+
+    The admin API client stays local: WireMock's admin port is reached directly.
+    """
+
+    def __init__(self, address: str, authkey: bytes = SUPERVISOR_AUTHKEY, pool_size: int = 8) -> None:
+        self.address = check_rpc_settings(address, authkey)
+        self.authkey = authkey
+        self._pool: queue.LifoQueue = queue.LifoQueue(pool_size)
+        self.admin = WiremockAdminClient()
+        self.jobs = _Jobs(self)
+        self.status_monitor = _Namespace(self, 'status_monitor')
+        self.log_broadcaster = _LogBroadcaster(self, 'log_broadcaster')
+        self.journal = _Namespace(self, 'journal')
+        self._warm_pool = _Namespace(self, 'warm_pool')
+
+    def call(self, method: str, *args, **kwargs):
+        """
+        Invokes a manager method in the supervisor and returns its result.
+
+        Raises:
+            SupervisorError: If the supervisor is unreachable or the method isn't allowed.
+        """
+        for attempt in range(2):
+            try:
+                conn, reused = self._pool.get_nowait(), True
+            except queue.Empty:
+                try:
+                    conn, reused = Client(self.address, authkey=self.authkey), False
+                except (OSError, EOFError) as e:
+                    raise SupervisorError(f"Supervisor at {self.address} unreachable: {e}") from e
+            try:
+                conn.send((method, args, kwargs))
+                status, payload = conn.recv()
+            except (OSError, EOFError) as e:
+                conn.close()
+                if reused and attempt == 0:
+                    continue  # The supervisor restarted since this connection was pooled.
+                raise SupervisorError(f"Supervisor at {self.address} unreachable: {e}") from e
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+            break
+
+        if status == 'ok':
+            return payload
+        error_type, message, extra = payload
+        if error_type == 'AdminApiError':
+            raise AdminApiError(message, extra)
+        raise _ERRORS.get(error_type, SupervisorError)(message)
+
+    def __getattr__(self, method: str):
+        if method in RPC_METHODS:
+            return lambda *args, **kwargs: self.call(method, *args, **kwargs)
+        raise AttributeError(method)
+
+    @property
+    def warm_pool(self):
+        return self._warm_pool if self.call('has_warm_pool') else None
+
+    def streams_logs_locally(self, port: int | str) -> bool:
+        # log_broadcaster.wait is served by the supervisor, which pumps every instance;
+        # waits are polled briefly (see _LogBroadcaster).
+        return True
@@ -0,0 +1,283 @@
+import os
+import json
+import base64
+import socket
+import threading
+import time
+
+import psutil
+
+from config import (WARM_POOL_SIZE, WARM_POOL_PORT_START, WARM_POOL_PORT_END, WARM_POOL_IDLE_SECONDS,
+                    WARM_POOL_IMPORT_BATCH)
+from utils.admin_client import AdminApiError
+from utils.stub_index import STUB_FILENAME_RE
+
+POOL_DIR = 'wiremock_instances/.pool'
+# Idle pool JVMs are tracked in the PID registry under this prefix plus their pool port.
+POOL_KEY_PREFIX = '.pool/'
+
+
+def pool_key(port: int | str) -> str:
+    return f"{POOL_KEY_PREFIX}{port}"
+
+
+def is_pool_key(key: str) -> bool:
+    return key.startswith(POOL_KEY_PREFIX)
+
+
+def inline_body(mapping: dict, files_dir: str) -> dict:
+    """
+    Returns a copy of a mapping with its bodyFileName replaced by the body itself.
+
+    Pooled JVMs run with their own root dir, so they can't see the target port's
+    __files folder; the body has to travel with the mapping instead.
+
+    Args:
+        mapping: The WireMock mapping.
+        files_dir: The __files folder the bodyFileName is relative to.
+    """
+    response = mapping.get('response') or {}
+    body_file = response.get('bodyFileName')
+    if not body_file:
+        return mapping
+    path = os.path.abspath(os.path.join(files_dir, body_file))
+    if os.path.commonpath([os.path.abspath(files_dir), path]) != os.path.abspath(files_dir):
+        return mapping
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+    except OSError:
+        return mapping
+
+    response = {key: value for key, value in response.items() if key != 'bodyFileName'}
+    try:
+        response['body'] = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        response['base64Body'] = base64.b64encode(raw).decode()
+    return {**mapping, 'response': response}
+
+
+def _port_is_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind(('127.0.0.1', port))
+            return True
+        except OSError:
+            return False
+
+
+class WarmPool:
+    """
+    Keeps pre-started WireMock JVMs on spare ports so a start request doesn't pay
+    for JVM boot. Leasing a JVM resets it through the admin API and loads the
+    target port's mappings (with bodies inlined) into it.
+
+    The pool refills in the background and drains to zero after
+    WARM_POOL_IDLE_SECONDS without a lease; the next lease warms it up again.
+
+    Idle JVMs are recorded in the PID registry under pool keys (.pool/<port>)
+    until they are leased, so the ones a crashed or killed server left behind
+    are stopped when the next pool starts. Only the process that owns the
+    instances runs a pool (see WiremockManager.start_warm_pool).
+    """
+
+    def __init__(self, manager, size: int = WARM_POOL_SIZE,
+                 ports: range = range(WARM_POOL_PORT_START, WARM_POOL_PORT_END),
+                 idle_seconds: float = WARM_POOL_IDLE_SECONDS) -> None:
+        self.manager = manager
+        self.size = size
+        self.ports = ports
+        self.idle_seconds = idle_seconds
+        self._idle: list[dict] = []
+        self._starting: set[int] = set()
+        self._last_demand = time.monotonic()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self.metrics = {'hits': 0, 'misses': 0, 'evictions': 0, 'ready_count': 0,
+                        'ready_seconds_total': 0.0, 'ready_seconds_max': 0.0, 'ready_seconds_last': None}
+        self.reap_orphans()
+        threading.Thread(target=self._maintain, daemon=True).start()
+
+    def reap_orphans(self) -> int:
+        """
+        Stops the idle pool JVMs recorded by an earlier run and forgets them.
+
+        Returns:
+            The number of JVMs stopped.
+        """
+        registry = self.manager.pid_registry
+        entries = {key: entry for key, entry in registry.entries().items() if is_pool_key(key)}
+        stopped = 0
+        for entry in entries.values():
+            proc = registry.resolve(entry)
+            if proc is None:
+                continue
+            try:
+                self.manager._terminate(proc)
+                stopped += 1
+            except psutil.NoSuchProcess:
+                pass
+        if entries:
+            registry.remove(*entries)
+        return stopped
+
+    def _release(self, entry: dict) -> None:
+        # Stops an idle JVM and drops its registry entry.
+        try:
+            self.manager._terminate(entry['process'])
+        except psutil.NoSuchProcess:
+            pass
+        self.manager.pid_registry.remove(pool_key(entry['port']))
+
+    def _free_port(self) -> int | None:
+        in_use = {int(p) for p in self.manager.served_ports.values()}
+        in_use |= {entry['port'] for entry in self._idle} | self._starting
+        for port in self.ports:
+            if port not in in_use and _port_is_free(port):
+                return port
+        return None
+
+    def _warm_one(self) -> None:
+        with self._lock:
+            port = self._free_port()
+            if port is None:
+                return
+            self._starting.add(port)
+        try:
+            process = self.manager._launch(pool_key(port), port, os.path.join(POOL_DIR, str(port)))
+            self.manager.pid_registry.add(pool_key(port), psutil.Process(process.pid), process.args,
+                                          served_port=port)
+            ready, _ = self.manager.wait_until_ready(port, process=process)
+            entry = {'port': port, 'process': process, 'since': time.monotonic()}
+            if ready:
+                with self._lock:
+                    self._idle.append(entry)
+            else:
+                self._release(entry)
+        except (OSError, psutil.Error):
+            pass
+        finally:
+            with self._lock:
+                self._starting.discard(port)
+
+    def _maintain(self) -> None:
+        while True:
+            with self._lock:
+                exited = [entry for entry in self._idle if entry['process'].poll() is not None]
+                self._idle = [entry for entry in self._idle if entry not in exited]
+                drained = time.monotonic() - self._last_demand > self.idle_seconds
+                evicted = self._idle if drained else []
+                if drained:
+                    self._idle = []
+                    self.metrics['evictions'] += len(evicted)
+                missing = 0 if drained else self.size - len(self._idle) - len(self._starting)
+            for entry in exited + evicted:
+                self._release(entry)
+            for _ in range(max(missing, 0)):
+                self._warm_one()
+            self._wakeup.wait(1)
+            self._wakeup.clear()
+
+    def _load_mappings(self, served_port: int, port: str) -> None:
+        instance_dir = f"wiremock_instances/{port}"
+        mappings_dir = os.path.join(instance_dir, 'mappings')
+        files_dir = os.path.join(instance_dir, '__files')
+        self.manager.admin.request(served_port, 'POST', '/__admin/reset')
+
+        batch = []
+        names = sorted(os.listdir(mappings_dir)) if os.path.isdir(mappings_dir) else []
+        for name in names:
+            if not STUB_FILENAME_RE.match(name):
+                continue
+            try:
+                with open(os.path.join(mappings_dir, name)) as f:
+                    mapping = json.load(f)
+            except (OSError, ValueError):
+                continue
+            batch.append(inline_body(mapping, files_dir))
+            if len(batch) >= WARM_POOL_IMPORT_BATCH:
+                self._import(served_port, batch)
+                batch = []
+        if batch:
+            self._import(served_port, batch)
+
+    def _import(self, served_port: int, mappings: list[dict]) -> None:
+        self.manager.admin.request(served_port, 'POST', '/__admin/mappings/import', {
+            'mappings': mappings,
+            'importOptions': {'duplicatePolicy': 'OVERWRITE', 'deleteAllNotInImport': False},
+        })
+
+    def reload(self, served_port: int, port: str | int) -> None:
+        """
+        Replaces the mappings of a leased JVM with the current files of its port.
+        """
+        self._load_mappings(served_port, str(port))
+
+    def acquire(self, port: str | int) -> dict | None:
+        """
+        Leases a warm JVM for a port and loads the port's mappings into it.
+
+        Args:
+            port: The instance port the JVM will serve.
+
+        Returns:
+            A dictionary with the leased 'process' and its 'served_port', or None
+            if no warm JVM was available. The caller registers the process under
+            the port and then drops its pool key.
+        """
+        started = time.monotonic()
+        with self._lock:
+            self._last_demand = started
+            entry = self._idle.pop(0) if self._idle else None
+            if entry is None:
+                self.metrics['misses'] += 1
+        self._wakeup.set()
+        if entry is None:
+            return None
+
+        try:
+            self._load_mappings(entry['port'], str(port))
+        except (AdminApiError, OSError):
+            self._release(entry)
+            with self._lock:
+                self.metrics['misses'] += 1
+            return None
+
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self.metrics['hits'] += 1
+            self.metrics['ready_count'] += 1
+            self.metrics['ready_seconds_total'] += elapsed
+            self.metrics['ready_seconds_max'] = max(self.metrics['ready_seconds_max'], elapsed)
+            self.metrics['ready_seconds_last'] = elapsed
+        return {'process': entry['process'], 'served_port': entry['port'],
+                'log_key': f".pool/{entry['port']}"}
+
+    def stats(self) -> dict:
+        """
+        Returns pool size, hit rate and time-to-ready figures.
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+            idle = len(self._idle)
+            starting = len(self._starting)
+        leases = metrics['hits'] + metrics['misses']
+        return {
+            **metrics,
+            'size': self.size,
+            'idle': idle,
+            'starting': starting,
+            'hit_rate': metrics['hits'] / leases if leases else None,
+            'ready_seconds_avg': (metrics['ready_seconds_total'] / metrics['ready_count']
+                                  if metrics['ready_count'] else None),
+        }
+
+    def shutdown(self) -> None:
+        """
+        Stops every idle JVM; leased ones belong to their instance from then on.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.size = 0
+        for entry in idle:
+            self._release(entry)
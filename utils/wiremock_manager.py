@@ -1,14 +1,53 @@
 import os
+import json
+import atexit
 import subprocess
 import threading
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 import psutil
+from utils.admin_client import AdminApiError, WiremockAdminClient
+from utils.jobs import JobRegistry
+from utils.pid_registry import PidRegistry
+from utils.status_monitor import StatusMonitor
+from utils.warm_pool import WarmPool, inline_body, pool_key, is_pool_key
+from utils.journal_collector import JournalCollector
+from utils.state_store import SqliteState, SqlitePidRegistry, SqliteJobStore
+from utils.supervisor_client import SupervisorClient
+from utils.log_broadcaster import LogBroadcaster
+from utils.log_writer import LogWriter, log_segments, read_segment
 
 PID_TRACK_FILE = "wiremock_pids.json"
-from config import WIREMOCK_JAR_NAME
+from config import (WIREMOCK_JAR_NAME, LOG_READ_CHUNK_BYTES, READINESS_TIMEOUT_SECONDS,
+                    READINESS_POLL_INTERVAL_SECONDS, STOP_GRACE_SECONDS, RECOVERY_WORKERS,
+                    WARM_POOL_SIZE, JVM_PROFILES, DEFAULT_JVM_PROFILE, STATE_BACKEND, STATE_DB_PATH,
+                    JOB_HISTORY, SUPERVISOR_ADDRESS, PROXY_PORT)
 import signal
 
 WIREMOCK_JAR_PATH = f"static/wiremock/{WIREMOCK_JAR_NAME}"
+# Per-instance settings (currently the JVM profile), kept next to mappings/ and __files/.
+INSTANCE_SETTINGS_FILE = "instance.json"
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_wiremock_manager() -> 'WiremockManager':
+    """
+    Returns the process-wide WiremockManager, creating it on first use.
+
+    Creating the manager recovers running instances, so it is deferred until a
+    request needs it instead of happening while the blueprints are imported.
+    With SUPERVISOR_ADDRESS set, a SupervisorClient for the supervisor daemon
+    is returned instead.
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = SupervisorClient(SUPERVISOR_ADDRESS) if SUPERVISOR_ADDRESS else WiremockManager()
+    return _manager
+
 
 class WiremockManager:
     def __init__(self) -> None:
@@ -16,91 +55,220 @@ class WiremockManager:
         Initializes the WiremockManager, restoring any previously running processes.
         """
         self.processes: dict[str, subprocess.Popen | psutil.Process] = {}
+        if STATE_BACKEND == 'sqlite':
+            # Shared by all worker processes; see serve.py.
+            state = SqliteState(STATE_DB_PATH)
+            self.pid_registry = SqlitePidRegistry(state)
+            self.jobs = JobRegistry(store=SqliteJobStore(state, JOB_HISTORY))
+        else:
+            self.pid_registry = PidRegistry(PID_TRACK_FILE)
+            self.jobs = JobRegistry()
+        self.log_broadcaster = LogBroadcaster()
+        self._log_writers: dict[str, LogWriter] = {}
+        self.admin = WiremockAdminClient()
+        self.status_monitor = StatusMonitor(self)
+        # Instances leased from the warm pool listen on a spare port instead of their own.
+        self.served_ports: dict[str, int] = {}
+        self._log_redirects: dict[str, str] = {}
         self.restore_processes_on_startup()
+        self.journal = JournalCollector(self)
+        # Only the process that owns the instances runs a pool; see start_warm_pool().
+        self.warm_pool: WarmPool | None = None
 
-    def _save_pid(self, port: str | int, pid: int) -> None:
+    def _stream_logs(self, port: str | int, pipe) -> None:
         """
-        Saves the PID of a WireMock instance to the tracking file.
+        Streams the output of a WireMock instance to a batched, rotating log file
+        and to live subscribers.
 
         Args:
             port: The port of the WireMock instance.
-            pid: The PID of the WireMock process.
+            pipe: The stdout pipe of the WireMock process.
         """
-        pids = {}
-        if os.path.exists(PID_TRACK_FILE):
-            with open(PID_TRACK_FILE, 'r') as f:
-                pids = json.load(f)
-        pids[str(port)] = pid
-        with open(PID_TRACK_FILE, 'w') as f:
-            json.dump(pids, f)
+        port_str = str(port)
+        target = self._log_redirects.get(port_str, port_str)
+        writer = LogWriter(f'wiremock_instances/{target}/wiremock.log')
+        self._log_writers[target] = writer
+        try:
+            for line in iter(pipe.readline, b''):
+                routed = self._log_redirects.get(port_str, port_str)
+                if routed != target:
+                    # A pooled JVM was leased to a port; follow it to that port's log.
+                    writer.close()
+                    self._log_writers.pop(target, None)
+                    target = routed
+                    writer = LogWriter(f'wiremock_instances/{target}/wiremock.log')
+                    self._log_writers[target] = writer
+                decoded_line = line.decode(errors='replace').strip()
+                file_id, offset = writer.write(decoded_line)
+                self.log_broadcaster.publish(target, decoded_line, file_id, offset)
+        finally:
+            writer.close()
+            if self._log_writers.get(target) is writer:
+                del self._log_writers[target]
+            self._log_redirects.pop(port_str, None)
 
-    def _remove_pid(self, port: str | int) -> None:
+    def _build_command(self, listen_port: int | str, root_dir: str,
+                       profile: str = DEFAULT_JVM_PROFILE) -> list[str]:
         """
-        Removes the PID of a WireMock instance from the tracking file.
+        Builds the java command line for a WireMock process.
 
         Args:
-            port: The port of the WireMock instance to remove.
+            listen_port: The port WireMock listens on.
+            root_dir: The root dir holding mappings/ and __files/.
+            profile: The name of a JVM_PROFILES entry whose options are added.
+
+        Returns:
+            The command as a list of arguments.
+        """
+        options = JVM_PROFILES.get(profile) or JVM_PROFILES[DEFAULT_JVM_PROFILE]
+        return [
+            'java', *options['jvm_args'], '-jar', WIREMOCK_JAR_PATH,
+            '--port', str(listen_port), '--root-dir', root_dir,
+            *options['wiremock_args']
+        ]
+
+    @staticmethod
+    def get_profile(port: int | str) -> str:
+        """
+        Returns the JVM profile chosen for a port, or the default one.
         """
-        if not os.path.exists(PID_TRACK_FILE):
-            return
-        with open(PID_TRACK_FILE, 'r') as f:
-            pids = json.load(f)
-        if str(port) in pids:
-            del pids[str(port)]
-        with open(PID_TRACK_FILE, 'w') as f:
-            json.dump(pids, f)
+        try:
+            with open(f'wiremock_instances/{port}/{INSTANCE_SETTINGS_FILE}', 'r') as f:
+                profile = json.load(f).get('profile')
+        except (OSError, ValueError, AttributeError):
+            return DEFAULT_JVM_PROFILE
+        return profile if profile in JVM_PROFILES else DEFAULT_JVM_PROFILE
 
-    def _get_pids(self) -> dict[str, int]:
+    def set_profile(self, port: int | str, profile: str) -> tuple[bool, str]:
         """
-        Retrieves the PIDs of all tracked WireMock instances.
+        Stores the JVM profile for a port; it is applied on the next (re)start.
+
+        Args:
+            port: The port of the WireMock instance.
+            profile: The name of a JVM_PROFILES entry.
 
         Returns:
-            A dictionary mapping port numbers to PIDs.
+            A tuple containing a boolean indicating success and a message.
         """
-        if not os.path.exists(PID_TRACK_FILE):
-            return {}
-        with open(PID_TRACK_FILE, 'r') as f:
-            return json.load(f)
+        if profile not in JVM_PROFILES:
+            return False, f"Unknown profile '{profile}'."
+        wiremock_dir = f'wiremock_instances/{port}'
+        os.makedirs(wiremock_dir, exist_ok=True)
+        path = os.path.join(wiremock_dir, INSTANCE_SETTINGS_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'profile': profile}, f, indent=2)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            return False, f"Failed to save the profile for port {port}: {e}"
+        if self.is_running(port):
+            return True, f"Profile '{profile}' saved; restart WireMock on port {port} to apply it."
+        return True, f"Profile '{profile}' saved for port {port}."
 
-    def _cleanup_dead_pids(self) -> dict[str, int]:
+    def _launch(self, log_key: str, listen_port: int | str, root_dir: str,
+                cmd: list[str] | None = None) -> subprocess.Popen:
         """
-        Removes dead PIDs from the tracking file.
+        Spawns a WireMock JVM and starts pumping its output into the log of log_key.
+
+        Args:
+            log_key: The folder under wiremock_instances/ whose wiremock.log receives the output.
+            listen_port: The port WireMock listens on.
+            root_dir: The root dir holding mappings/ and __files/.
+            cmd: A prebuilt command line; built from listen_port and root_dir if omitted.
 
         Returns:
-            A dictionary of the remaining running process PIDs.
+            The started process.
         """
-        if not os.path.exists(PID_TRACK_FILE):
-            return {}
-        with open(PID_TRACK_FILE, 'r') as f:
-            pids = json.load(f)
-        updated = {}
-        for port, pid in pids.items():
-            try:
-                p = psutil.Process(pid)
-                # Check if the process is running and is a WireMock instance
-                if p.is_running() and any(WIREMOCK_JAR_PATH in s for s in p.cmdline()):
-                    updated[port] = pid
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass  # process dead or inaccessible
-        with open(PID_TRACK_FILE, 'w') as f:
-            json.dump(updated, f)
-        return updated
+        os.makedirs(root_dir, exist_ok=True)
+        process = subprocess.Popen(
+            cmd or self._build_command(listen_port, root_dir),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            # Windows only; elsewhere the process gets its own session instead.
+            creationflags=getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0),
+            start_new_session=os.name != 'nt'
+        )
+        threading.Thread(target=self._stream_logs, args=(log_key, process.stdout), daemon=True).start()
+        return process
 
-    def _stream_logs(self, port: str | int, pipe) -> None:
+    def _terminate(self, process: subprocess.Popen | psutil.Process) -> None:
         """
-        Streams the output of a WireMock instance to a log file.
+        Stops a process tree: SIGTERM first, SIGKILL for whatever outlives the grace period.
 
-        Args:
-            port: The port of the WireMock instance.
-            pipe: The stdout pipe of the WireMock process.
+        Raises:
+            psutil.NoSuchProcess: If the process is already gone.
         """
-        log_file_path = f'wiremock_instances/{port}/wiremock.log'
-        os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
-        with open(log_file_path, 'a') as f:
-            for line in iter(pipe.readline, b''):
-                decoded_line = line.decode().strip()
-                f.write(decoded_line + '\n')
-                f.flush()
+        parent = psutil.Process(process.pid)
+        procs = parent.children(recursive=True) + [parent]
+        for proc in procs:
+            proc.terminate()
+        _, alive = psutil.wait_procs(procs, timeout=STOP_GRACE_SECONDS)
+        # Escalate for anything that ignored SIGTERM.
+        for proc in alive:
+            proc.kill()
+        psutil.wait_procs(alive, timeout=STOP_GRACE_SECONDS)
+        if isinstance(process, subprocess.Popen):
+            process.poll()  # Reap the child so it doesn't linger as a zombie.
+
+    def start_warm_pool(self) -> WarmPool | None:
+        """
+        Starts the warm pool if it is configured; pool JVMs left by an earlier run are stopped first.
+
+        Call it only in the process that owns the instances (serve.py or
+        supervisor.py), so the workers of a multi-process server don't each
+        keep WARM_POOL_SIZE JVMs. A leased JVM keeps listening on its pool
+        port, so it is only reachable through the front proxy; without
+        PROXY_PORT every instance boots on its own port.
+
+        Returns:
+            The pool, or None if it is disabled.
+        """
+        if self.warm_pool is None and WARM_POOL_SIZE > 0 and PROXY_PORT:
+            self.warm_pool = WarmPool(self)
+            atexit.register(self.warm_pool.shutdown)
+        return self.warm_pool
+
+    def warm_pool_disabled_reason(self) -> str | None:
+        """
+        Returns why no warm pool runs here (shown by /warm_pool/metrics), or None if one does.
+        """
+        if self.warm_pool is not None:
+            return None
+        if WARM_POOL_SIZE <= 0:
+            return "WARM_POOL_SIZE is 0."
+        if not PROXY_PORT:
+            return "WARM_POOL_SIZE needs PROXY_PORT: leased instances are only reachable through the front proxy."
+        return "The warm pool runs in the process that owns the instances (serve.py or supervisor.py)."
+
+    def served_port(self, port: int | str) -> int:
+        """
+        Returns the port an instance actually listens on (differs for warm-pool leases).
+        """
+        return int(self.served_ports.get(str(port), port))
+
+    def mapping_for_push(self, port: int | str, mapping: dict) -> dict:
+        """
+        Adapts a mapping before pushing it to the admin API of a running instance.
+
+        Leased pool JVMs can't read the port's __files, so bodies are inlined for them.
+        """
+        if str(port) not in self.served_ports:
+            return mapping
+        return inline_body(mapping, f"wiremock_instances/{port}/__files")
+
+    def reload_mappings(self, port: int | str) -> None:
+        """
+        Makes a running instance reload the port's mappings from disk.
+
+        Raises:
+            AdminApiError: If the admin API call fails.
+        """
+        port_str = str(port)
+        if port_str in self.served_ports and self.warm_pool:
+            self.warm_pool.reload(self.served_ports[port_str], port_str)
+        else:
+            self.admin.reset_mappings(self.served_port(port_str))
 
     def start_wiremock(self, port: int) -> tuple[bool, str]:
         """
@@ -113,26 +281,32 @@ class WiremockManager:
             A tuple containing a boolean indicating success and a message.
         """
         port_str = str(port)
-        if port_str in self.processes and self.processes[port_str].poll() is None:
+        if self.is_running(port_str):
             return False, f"WireMock is already running on port {port}."
 
+        self.served_ports.pop(port_str, None)  # Left over if another worker stopped it.
+        profile = self.get_profile(port_str)
+        # Pool JVMs run with the default profile, so tuned instances always boot their own.
+        if self.warm_pool and profile == DEFAULT_JVM_PROFILE:
+            lease = self.warm_pool.acquire(port_str)
+            if lease:
+                process, served = lease['process'], lease['served_port']
+                self.processes[port_str] = process
+                self.served_ports[port_str] = served
+                self._log_redirects[lease['log_key']] = port_str
+                self.pid_registry.add(port_str, psutil.Process(process.pid), process.args, served_port=served)
+                self.pid_registry.remove(pool_key(served))  # Tracked under the port from now on.
+                return True, (f"Started Wiremock for port {port} from the warm pool. It listens on pool port "
+                              f"{served}, not {port}: reach it through the front proxy at :{PROXY_PORT}/{port}/.")
+
         wiremock_dir = f'wiremock_instances/{port}'
-        os.makedirs(wiremock_dir, exist_ok=True)
-        cmd = [
-            'java', '-jar', WIREMOCK_JAR_PATH,
-            '--port', port_str, '--root-dir', wiremock_dir
-        ]
+        cmd = self._build_command(port_str, wiremock_dir, profile)
         try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
-            )
+            process = self._launch(port_str, port_str, wiremock_dir, cmd)
             self.processes[port_str] = process
-            self._save_pid(port_str, process.pid)
-
-            threading.Thread(target=self._stream_logs, args=(port_str, process.stdout), daemon=True).start()
+            self.pid_registry.add(port_str, psutil.Process(process.pid), cmd)
+            if profile != DEFAULT_JVM_PROFILE:
+                return True, f"Started Wiremock on port {port} with profile '{profile}'."
             return True, f"Started Wiremock on port {port}."
         except Exception as e:
             return False, f"Failed to start Wiremock on port {port}: {e}"
@@ -148,28 +322,86 @@ class WiremockManager:
             A tuple containing a boolean indicating success and a message.
         """
         port_str = str(port)
-        process = self.processes.get(port_str)
+        process = self._process_for(port_str)
         if not process:
             return False, "No running instance found for this port."
 
         try:
-            parent = psutil.Process(process.pid)
-            children = parent.children(recursive=True)
-            for child in children:
-                child.kill()
-            parent.kill()
-            parent.wait(5)
+            self._terminate(process)
         except psutil.NoSuchProcess:
             # Process already killed.
             pass
         except Exception as e:
             return False, f"Error stopping WireMock on port {port}: {e}"
 
-        self._remove_pid(port_str)
+        self.pid_registry.remove(port_str)
+        self.admin.close(self.served_ports.pop(port_str, port_str))
         if port_str in self.processes:
             del self.processes[port_str]
         return True, f"Stopped WireMock on port {port}."
 
+    def wait_until_ready(self, port: int, timeout: float = READINESS_TIMEOUT_SECONDS,
+                         process: subprocess.Popen | None = None) -> tuple[bool, str]:
+        """
+        Waits until a started WireMock instance serves HTTP on its port.
+
+        Any HTTP answer from /__admin/health counts, since older WireMock versions
+        reply 404 there once they are up.
+
+        Args:
+            port: The port of the WireMock instance.
+            timeout: How long to wait, in seconds.
+            process: The process to watch, for JVMs not tracked under port (warm pool).
+
+        Returns:
+            A tuple containing a boolean indicating readiness and a message.
+        """
+        port_str = str(port)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            alive = process.poll() is None if process else self.is_running(port_str)
+            if not alive:
+                return False, f"WireMock on port {port} exited during startup; check its logs."
+            try:
+                self.admin.request(self.served_port(port_str) if not process else port_str,
+                                   'GET', '/__admin/health')
+                return True, f"Started Wiremock on port {port}."
+            except AdminApiError as e:
+                if e.status is not None:
+                    return True, f"Started Wiremock on port {port}."
+            time.sleep(READINESS_POLL_INTERVAL_SECONDS)
+        return False, f"WireMock on port {port} did not become ready within {timeout:.0f}s."
+
+    def start_wiremock_async(self, port: int) -> dict:
+        """
+        Starts a WireMock instance in the background and waits for it to become ready.
+
+        Args:
+            port: The port number to start WireMock on.
+
+        Returns:
+            A snapshot of the job; poll jobs.get(job['id']) for the outcome.
+        """
+        def start():
+            success, message = self.start_wiremock(port)
+            if not success:
+                return success, message
+            return self.wait_until_ready(port)
+
+        return self.jobs.submit('start', port, start)
+
+    def stop_wiremock_async(self, port: int) -> dict:
+        """
+        Stops a WireMock instance in the background (SIGTERM, then SIGKILL after a grace period).
+
+        Args:
+            port: The port number of the WireMock instance to stop.
+
+        Returns:
+            A snapshot of the job; poll jobs.get(job['id']) for the outcome.
+        """
+        return self.jobs.submit('stop', port, lambda: self.stop_wiremock(port))
+
     def is_running(self, port: int) -> bool:
         """
         Checks if a WireMock instance is currently running on the specified port.
@@ -180,32 +412,244 @@ class WiremockManager:
         Returns:
             True if an instance is running, False otherwise.
         """
-        port_str = str(port)
-        process = self.processes.get(port_str)
-        if not process:
-            return False
+        process = self._process_for(str(port))
+        return process is not None and self._alive(process)
 
+    @staticmethod
+    def _alive(process: subprocess.Popen | psutil.Process) -> bool:
         if isinstance(process, subprocess.Popen):
             return process.poll() is None
         elif isinstance(process, psutil.Process):
             return process.is_running()
         return False
 
+    def _process_for(self, port_str: str) -> subprocess.Popen | psutil.Process | None:
+        """
+        Returns the process of a port, picking up instances started by another worker.
+
+        The registry is shared by every worker process, so a port this worker doesn't
+        know about (or only knows a dead process for) is looked up there and adopted.
+        """
+        process = self.processes.get(port_str)
+        if process is not None and self._alive(process):
+            return process
+        entry = self.pid_registry.get(port_str)
+        if entry and (process is None or entry['pid'] != process.pid):
+            proc = PidRegistry.resolve(entry)
+            if proc is not None:
+                self.processes[port_str] = proc
+                if entry.get('served_port'):
+                    self.served_ports[port_str] = entry['served_port']
+                return proc
+        return process
+
+    def streams_logs_locally(self, port: int | str) -> bool:
+        """
+        Returns whether this worker pumps the port's output (and so can push live log lines).
+        """
+        return str(port) in self._log_writers
+
     def restore_processes_on_startup(self) -> None:
         """
         Restores the state of running WireMock processes on application startup.
+
+        Registry entries are validated by PID and create-time in parallel; entries
+        whose process has exited or whose PID was reused are dropped in one write.
+        Instance ports that are still unaccounted for are then matched against the
+        listening sockets, which adopts JVMs started outside the registry.
         """
-        pids = self._cleanup_dead_pids()
-        for port, pid in pids.items():
+        # Idle pool JVMs aren't instances; the warm pool reaps them when it starts.
+        entries = {port: entry for port, entry in self.pid_registry.entries().items() if not is_pool_key(port)}
+        with ThreadPoolExecutor(max_workers=RECOVERY_WORKERS) as pool:
+            resolved = dict(zip(entries, pool.map(PidRegistry.resolve, entries.values())))
+
+        dead = [port for port, proc in resolved.items() if proc is None]
+        for port, proc in resolved.items():
+            if proc is not None:
+                self.processes[port] = proc
+                if entries[port].get('served_port'):
+                    self.served_ports[port] = entries[port]['served_port']
+
+        adopted = self._adopt_listening_instances(set(dead))
+        dead = [port for port in dead if port not in adopted]
+        if dead:
+            self.pid_registry.remove(*dead)
+
+    def _adopt_listening_instances(self, candidates: set[str]) -> dict[str, psutil.Process]:
+        """
+        Adopts JVMs listening on instance ports that have no live registry entry.
+
+        A listener is only adopted if its command line runs the WireMock jar with
+        --port set to that port, so an unrelated JVM on an instance port (an app
+        server, an IDE) is never taken over and later killed by stop_wiremock.
+
+        Args:
+            candidates: Extra ports to check besides the wiremock_instances folders.
+
+        Returns:
+            The adopted processes, keyed by port.
+        """
+        if os.path.isdir('wiremock_instances'):
+            candidates |= {p for p in os.listdir('wiremock_instances') if p.isdigit()}
+        candidates -= set(self.processes)
+        if not candidates:
+            return {}
+        try:
+            listeners = {
+                str(conn.laddr.port): conn.pid
+                for conn in psutil.net_connections(kind='tcp')
+                if conn.status == psutil.CONN_LISTEN and conn.pid and str(conn.laddr.port) in candidates
+            }
+        except (psutil.AccessDenied, OSError):
+            return {}  # Socket owners aren't visible without privileges on some platforms.
+
+        def check(port: str, pid: int) -> psutil.Process | None:
             try:
                 proc = psutil.Process(pid)
-                self.processes[port] = proc
+                if 'java' not in proc.name().lower():
+                    return None
+                cmdline = proc.cmdline()
             except (psutil.NoSuchProcess, psutil.AccessDenied):
-                self._remove_pid(port)
+                return None
+            runs_jar = any(os.path.basename(arg) == WIREMOCK_JAR_NAME for arg in cmdline)
+            ports = [value for option, value in zip(cmdline, cmdline[1:]) if option == '--port']
+            return proc if runs_jar and ports == [port] else None
+
+        with ThreadPoolExecutor(max_workers=RECOVERY_WORKERS) as pool:
+            procs = dict(zip(listeners, pool.map(check, listeners, listeners.values())))
+
+        adopted = {}
+        for port, proc in procs.items():
+            if proc is None:
+                continue
+            self.processes[port] = proc
+            # Record the create-time so later restarts validate this PID cheaply.
+            self.pid_registry.add(port, proc)
+            adopted[port] = proc
+        return adopted
+
+    def _parse_log_cursor(self, cursor: str | None) -> tuple[int, int] | None:
+        """
+        Parses a cursor token returned by read_log_chunk.
+
+        Args:
+            cursor: A token of the form "<file_id>:<offset>", or None.
+
+        Returns:
+            A (file_id, offset) tuple, or None if the cursor is missing or malformed.
+        """
+        if not cursor:
+            return None
+        try:
+            file_id, offset = cursor.split(':', 1)
+            return int(file_id), max(int(offset), 0)
+        except ValueError:
+            return None
+
+    def read_log_chunk(self, port: int, cursor: str | None = None) -> dict:
+        """
+        Reads the log bytes appended since the given cursor.
+
+        Without a cursor the tail of the log is returned. If the log was truncated
+        or replaced (rotated) since the cursor was issued, reading restarts from the
+        beginning of the current file. At most LOG_READ_CHUNK_BYTES are read per call.
+
+        Args:
+            port: The port of the WireMock instance.
+            cursor: The cursor returned by a previous call, or None.
+
+        Returns:
+            A dictionary with the new 'logs' text, the 'cursor' to pass on the next
+            call, and 'reset' set when the client should discard what it has shown.
+        """
+        port_str = str(port)
+        log_file_path = f'wiremock_instances/{port_str}/wiremock.log'
+        writer = self._log_writers.get(port_str)
+        if writer:
+            writer.flush()
+
+        parsed = self._parse_log_cursor(cursor)
+        if parsed is not None:
+            rotated = self._read_rotated_remainder(log_file_path, *parsed)
+            if rotated is not None:
+                return rotated
+
+        try:
+            f = open(log_file_path, 'rb')
+        except FileNotFoundError:
+            return {'logs': f"Log file not found for port {port_str}.\n", 'cursor': None, 'reset': True}
+
+        with f:
+            st = os.fstat(f.fileno())
+            size = st.st_size
+            reset = False
+            if parsed is None:
+                # First read: only send the tail, starting on a line boundary.
+                offset = max(size - LOG_READ_CHUNK_BYTES, 0)
+                reset = True
+            elif parsed[0] != st.st_ino:
+                # The file was rotated or recreated; continue from its start.
+                offset = 0
+            elif parsed[1] > size:
+                # The file was truncated underneath us.
+                offset = 0
+                reset = True
+            else:
+                offset = parsed[1]
+
+            f.seek(offset)
+            data = f.read(min(size - offset, LOG_READ_CHUNK_BYTES))
+            if parsed is None and offset > 0:
+                newline = data.find(b'\n')
+                data = data[newline + 1:] if newline != -1 else b''
+                offset = size - len(data)
+            elif offset + len(data) < size:
+                # Bounded read stopped mid-file; don't hand out a partial line.
+                newline = data.rfind(b'\n')
+                if newline != -1:
+                    data = data[:newline + 1]
+
+        return {
+            'logs': data.decode('utf-8', errors='replace'),
+            'cursor': f"{st.st_ino}:{offset + len(data)}",
+            'reset': reset,
+        }
+
+    def _read_rotated_remainder(self, log_file_path: str, file_id: int, offset: int) -> dict | None:
+        """
+        Reads what is left of a rotated, not yet compressed log segment.
+
+        Args:
+            log_file_path: The path of the active log file.
+            file_id: The file id from the client's cursor.
+            offset: The byte offset from the client's cursor.
+
+        Returns:
+            A read_log_chunk result, or None if the cursor doesn't point into an
+            unread part of a rotated segment.
+        """
+        for segment in log_segments(log_file_path):
+            if segment.endswith('.gz'):
+                continue
+            try:
+                with open(segment, 'rb') as f:
+                    st = os.fstat(f.fileno())
+                    if st.st_ino != file_id or offset >= st.st_size:
+                        continue
+                    f.seek(offset)
+                    data = f.read(min(st.st_size - offset, LOG_READ_CHUNK_BYTES))
+            except OSError:
+                continue
+            return {
+                'logs': data.decode('utf-8', errors='replace'),
+                'cursor': f"{file_id}:{offset + len(data)}",
+                'reset': False,
+            }
+        return None
 
     def get_log_output(self, port: int) -> str:
         """
-        Retrieves the log output for a WireMock instance from its log file.
+        Retrieves the full log output for a WireMock instance, including rotated segments.
 
         Args:
             port: The port of the WireMock instance.
@@ -215,7 +659,20 @@ class WiremockManager:
         """
         port_str = str(port)
         log_file_path = f'wiremock_instances/{port_str}/wiremock.log'
+        writer = self._log_writers.get(port_str)
+        if writer:
+            writer.flush()
+        segments = log_segments(log_file_path)
         if os.path.exists(log_file_path):
-            with open(log_file_path, 'r') as f:
-                return f.read()
-        return f"Log file not found for port {port_str}."
+            segments.append(log_file_path)
+        if not segments:
+            return f"Log file not found for port {port_str}."
+
+        chunks = []
+        for segment in segments:
+            try:
+                chunks.append(read_segment(segment))
+            except OSError:
+                # The segment was compressed or pruned while we were listing.
+                continue
+        return b''.join(chunks).decode('utf-8', errors='replace')
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from config import ZIP_CACHE_MAX_BYTES, ZIP_CACHE_ENTRY_MAX_BYTES
+
+_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+_DATA_DESCRIPTOR = struct.Struct('<IIII')
+_CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+_END_RECORD = struct.Struct('<IHHHHIIH')
+
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_DEFLATED = 8
+_VERSION = 20
+_CHUNK_SIZE = 64 * 1024
+_ZIP32_LIMIT = 0xFFFFFFFF
+_MAX_STAT_KEYS = 200_000
+
+
+def _dos_datetime(mtime: float) -> tuple[int, int]:
+    t = time.localtime(max(mtime, 315532800))  # ZIP can't represent dates before 1980
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+def _deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+class ZipStreamer:
+    """
+    Writes ZIP archives as a stream of byte chunks, without a temp file.
+
+    Compressed entries are cached by content hash (and looked up by path, size
+    and mtime first, so unchanged files aren't even re-read). Re-exporting an
+    unchanged stub set only costs the header bookkeeping.
+    """
+
+    def __init__(self, max_bytes: int = ZIP_CACHE_MAX_BYTES,
+                 entry_max_bytes: int = ZIP_CACHE_ENTRY_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.entry_max_bytes = entry_max_bytes
+        self._by_hash: OrderedDict[str, tuple[int, int, bytes]] = OrderedDict()
+        self._by_stat: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def _compressed(self, path: str, st: os.stat_result) -> tuple[int, int, bytes]:
+        stat_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._by_stat.get(stat_key)
+            if digest in self._by_hash:
+                self._by_hash.move_to_end(digest)
+                return self._by_hash[digest]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            entry = self._by_hash.get(digest)
+            if entry is None:
+                entry = (zlib.crc32(data), len(data), _deflate(data))
+                self._by_hash[digest] = entry
+                self._cached_bytes += len(entry[2])
+                while self._cached_bytes > self.max_bytes and len(self._by_hash) > 1:
+                    _, evicted = self._by_hash.popitem(last=False)
+                    self._cached_bytes -= len(evicted[2])
+            self._by_hash.move_to_end(digest)
+            self._by_stat[stat_key] = digest
+            if len(self._by_stat) > _MAX_STAT_KEYS:
+                self._by_stat.popitem(last=False)
+            return entry
+
+    def iter_zip(self, files: list[tuple[str, str]]):
+        """
+        Yields the bytes of a ZIP archive containing the given files.
+
+        Args:
+            files: (path on disk, name inside the archive) pairs.
+
+        Raises:
+            ValueError: If the archive would need ZIP64 (entries or offsets over 4 GiB).
+        """
+        central = []
+        offset = 0
+        for path, arcname in files:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue  # Removed while exporting.
+            name = arcname.replace(os.sep, '/').encode('utf-8')
+            dos_time, dos_date = _dos_datetime(st.st_mtime)
+
+            if st.st_size <= self.entry_max_bytes:
+                crc, size, data = self._compressed(path, st)
+                compressed_size = len(data)
+                flags = _FLAG_UTF8
+                header = _LOCAL_HEADER.pack(0x04034b50, _VERSION, flags, _DEFLATED, dos_time, dos_date,
+                                            crc, compressed_size, size, len(name), 0)
+                yield header + name
+                yield data
+                written = len(header) + len(name) + compressed_size
+            else:
+                # Too big to hold in memory: compress on the fly and trail the sizes.
+                flags = _FLAG_UTF8 | _FLAG_DATA_DESCRIPTOR
+                header = _LOCAL_HEADER.pack(0x04034b50, _VERSION, flags, _DEFLATED, dos_time, dos_date,
+                                            0, 0, 0, len(name), 0)
+                yield header + name
+                written = len(header) + len(name)
+                crc, size, compressed_size = 0, 0, 0
+                compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                        crc = zlib.crc32(chunk, crc)
+                        size += len(chunk)
+                        out = compressor.compress(chunk)
+                        if out:
+                            compressed_size += len(out)
+                            yield out
+                out = compressor.flush()
+                compressed_size += len(out)
+                descriptor = _DATA_DESCRIPTOR.pack(0x08074b50, crc, compressed_size, size)
+                yield out + descriptor
+                written += compressed_size + len(descriptor)
+                if size > _ZIP32_LIMIT or compressed_size > _ZIP32_LIMIT:
+                    raise ValueError(f"{arcname} is too large for a ZIP32 archive")
+
+            central.append(_CENTRAL_HEADER.pack(0x02014b50, _VERSION, _VERSION, flags, _DEFLATED, dos_time, dos_date,
+                                                crc, compressed_size, size, len(name), 0, 0, 0, 0, 0, offset) + name)
+            offset += written
+            if offset > _ZIP32_LIMIT:
+                raise ValueError("Archive is too large for ZIP32")
+
+        directory = b''.join(central)
+        yield directory + _END_RECORD.pack(0x06054b50, 0, 0, len(central), len(central),
+                                           len(directory), offset, 0)